@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+
+from model import (
+    LLM_CONCURRENCY, MISSING_KEY_MESSAGE, format_responses, run_soca_analysis_async,
+    prompt_cache_version,
+)
+from resilience import upstream_error_status
+from grading import subject_performance_many
+from cache import analysis_cache_key, get_analysis_cache
+from singleflight import get_single_flight
+from instant_report import INSTANT_FALLBACK, instant_response
+
+# How many sheets of one batch may wait on the LLM at the same time
+BATCH_CONCURRENCY = max(1, int(os.getenv("SOCA_BATCH_CONCURRENCY", str(LLM_CONCURRENCY))))
+BATCH_MAX_SHEETS = int(os.getenv("SOCA_BATCH_MAX_SHEETS", "5000"))
+
+def grade_sheets(sheets, answer_key):
+    """
+    Grades every sheet of a batch in one vectorized pass, before any LLM call is made.
+    sheets is a list of (sheet_id, user_answers, prompt_variant, mode) tuples.
+    """
+    return subject_performance_many([user_answers for _, user_answers, _, _ in sheets], answer_key)
+
+async def analyze_sheets(llm_model, sheets, answer_key, bank_version, concurrency=BATCH_CONCURRENCY):
+    """
+    Generates SOCA analyses for a batch of sheets.
+    Yields one result dict per sheet in completion order, each tagged with its sheet_id,
+    the bank version it was graded against and an HTTP-style status. Sheets whose
+    report could not be generated carry an "error" instead of an "analysis".
+    """
+    performances = grade_sheets(sheets, answer_key)
+    semaphore = asyncio.Semaphore(concurrency)
+    analysis_cache = get_analysis_cache()
+
+    async def analyze_one(sheet_id, user_answers, prompt_variant, mode, subject_performance):
+        result = {
+            "sheet_id": sheet_id,
+            "status": 200,
+            "subject_performance": subject_performance,
+            "bank_version": bank_version,
+        }
+        if mode == "instant":
+            return {**result, **instant_response(user_answers, answer_key, subject_performance)}
+        cache_key = analysis_cache_key(user_answers, bank_version, prompt_cache_version(prompt_variant))
+        analysis = await analysis_cache.get_async(cache_key)
+        if analysis is None and not llm_model:
+            if INSTANT_FALLBACK:
+                return {**result, **instant_response(user_answers, answer_key, subject_performance, "no_model")}
+            return {**result, "status": 503, "error": MISSING_KEY_MESSAGE}
+        elif analysis is None:
+            async def generate():
+                async with semaphore:
+                    formatted_text = format_responses(user_answers, answer_key, prompt_variant)
+                    report = await run_soca_analysis_async(llm_model, formatted_text, subject_performance, prompt_variant)
+                await analysis_cache.set_async(cache_key, report)
+                return report
+
+            try:
+                # Shares the call with identical sheets in flight here or in /api/analyze
+                analysis = await get_single_flight().run(cache_key, generate)
+            except Exception as e:
+                print(f"Error generating analysis with Gemini: {str(e)}")
+                if INSTANT_FALLBACK:
+                    return {**result, **instant_response(user_answers, answer_key, subject_performance, "llm_error")}
+                # Same statuses /api/analyze answers with; the other sheets carry on
+                status, _ = upstream_error_status(e)
+                return {
+                    **result,
+                    "status": status,
+                    "error": f"Error generating analysis. Please try again. Details: {str(e)}",
+                }
+        return {**result, "analysis": analysis, "source": "llm"}
+
+    tasks = [
+        asyncio.ensure_future(analyze_one(sheet_id, user_answers, prompt_variant, mode, performance))
+        for (sheet_id, user_answers, prompt_variant, mode), performance in zip(sheets, performances)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The client went away or a sheet failed; don't leave work queued behind it
+        for task in tasks:
+            task.cancel()
+
+async def ndjson_lines(results):
+    """
+    Encodes batch results as newline-delimited JSON.
+    """
+    async for result in results:
+        yield json.dumps(result) + "\n"
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Seconds between purges of expired rows from the SQLite tier
+PURGE_INTERVAL = float(os.getenv("SOCA_CACHE_PURGE_INTERVAL", "300"))
+
+def analysis_cache_key(user_answers: Dict[str, Dict[str, str]], bank_version: str, prompt_version: str) -> str:
+    """
+    Build a content-addressed key for a SOCA analysis.
+
+    Args:
+        user_answers (Dict[str, Dict[str, str]]): Answers keyed by subject and question number
+        bank_version (str): Content hash of the question bank
+        prompt_version (str): Version of the prompt template
+
+    Returns:
+        str: SHA-256 hex digest of the canonical JSON form of the inputs
+    """
+    # Sorting keys makes the hash independent of the order answers were submitted in
+    payload = json.dumps(
+        {"answers": user_answers, "bank": bank_version, "prompt": prompt_version},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """
+    Two-tier cache for generated analyses.
+
+    The first tier is an in-memory LRU with a TTL. The optional second tier is a
+    SQLite file, so reports survive serverless cold starts when the file lives on
+    a persistent path. Async callers use get_async()/set_async(), which answer
+    memory hits inline and run disk I/O on the event loop's executor.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 86400.0, db_path: Optional[str] = None,
+                 purge_interval: float = PURGE_INTERVAL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Disk I/O has its own lock, so memory hits never wait behind a read or commit
+        self._db_lock = threading.Lock()
+        self._db = None
+        self._last_purge = 0.0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis_cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                # Lets the expiry purge find old rows without scanning the table
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS analysis_cache_created_at ON analysis_cache (created_at)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: analysis cache database unavailable: {e}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached analysis, promoting disk hits into memory.
+
+        Returns:
+            Optional[str]: The cached analysis, or None on a miss
+        """
+        value = self._get_memory(key)
+        if value is not None or self._db is None:
+            return value
+        return self._get_disk(key)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """
+        get() for async callers; a disk lookup runs on the event loop's executor.
+        """
+        value = self._get_memory(key)
+        if value is not None or self._db is None:
+            return value
+        # Imported here: the question bank imports this module via metrics, and has no event loop
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(None, self._get_disk, key)
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store an analysis in every configured tier.
+        """
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            self._set_disk(key, value, now)
+
+    async def set_async(self, key: str, value: str) -> None:
+        """
+        set() for async callers; the disk write runs on the event loop's executor.
+        """
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            import asyncio
+
+            await asyncio.get_running_loop().run_in_executor(None, self._set_disk, key, value, now)
+
+    def _get_memory(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._entries[key]
+            if self._db is None:
+                self.stats["misses"] += 1
+        return None
+
+    def _get_disk(self, key):
+        now = time.time()
+        with self._db_lock:
+            try:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Warning: analysis cache read failed: {e}")
+                row = None
+        with self._lock:
+            if row is not None and now - row[1] < self.ttl:
+                self._remember(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return row[0]
+            self.stats["misses"] += 1
+        return None
+
+    def _set_memory(self, key, value, now):
+        with self._lock:
+            self._remember(key, value, now)
+            self.stats["sets"] += 1
+
+    def _set_disk(self, key, value, now):
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                # Expired rows are purged every purge_interval seconds, not on every write
+                if now - self._last_purge >= self.purge_interval:
+                    self._db.execute(
+                        "DELETE FROM analysis_cache WHERE created_at < ?", (now - self.ttl,)
+                    )
+                    self._last_purge = now
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: analysis cache write failed: {e}")
+
+    def _remember(self, key, value, created_at):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get hit/miss counters for the cache.
+
+        Returns:
+            Dict[str, float]: Counters plus the current size and overall hit ratio
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+_analysis_cache = None
+
+def get_analysis_cache() -> AnalysisCache:
+    """
+    Get the process-wide analysis cache, configured from the environment.
+
+    SOCA_CACHE_SIZE sets the in-memory entry limit, SOCA_CACHE_TTL the lifetime
+    in seconds and SOCA_CACHE_DB the optional SQLite file.
+    """
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = AnalysisCache(
+            max_entries=int(os.getenv("SOCA_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("SOCA_CACHE_TTL", "86400")),
+            db_path=os.getenv("SOCA_CACHE_DB") or None,
+        )
+    return _analysis_cache
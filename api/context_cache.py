@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Context caching of the static prompt prefix: on/off, and how long a cached
+# prefix lives upstream before it is registered again. Off by default: the
+# SOCA prefixes are far below Gemini's minimum cacheable size.
+PREFIX_CACHE_ENABLED = os.getenv("SOCA_PREFIX_CACHE", "0") == "1"
+PREFIX_CACHE_TTL = float(os.getenv("SOCA_PREFIX_CACHE_TTL", "3600"))
+# Prefixes estimated below this many tokens are never registered, since the
+# API would reject them anyway
+PREFIX_CACHE_MIN_TOKENS = int(os.getenv("SOCA_PREFIX_CACHE_MIN_TOKENS", "4096"))
+# Seconds a registration may take before the whole prompt is sent instead
+PREFIX_CACHE_TIMEOUT = float(os.getenv("SOCA_PREFIX_CACHE_TIMEOUT", "10"))
+# Handles are replaced this long before they expire, so no call races the expiry
+REFRESH_MARGIN = 60.0
+
+class PrefixCache:
+    """
+    Handles to prompt prefixes registered with the LLM backend's context cache.
+
+    `create(key, prefix, ttl)` registers a prefix upstream and returns a handle
+    (for Gemini, a GenerativeModel bound to the cached content). Handles are
+    reused until shortly before they expire. Prefixes shorter than `min_tokens`
+    are never registered. When registering fails, e.g. because the backend has
+    no context caching, callers send the whole prompt and the key is not tried
+    again for another TTL. Registration runs outside the lock; calls that
+    arrive meanwhile send the whole prompt rather than wait for it.
+    """
+
+    def __init__(self, create: Callable[[Hashable, str, float], Any], ttl: float = PREFIX_CACHE_TTL,
+                 enabled: bool = PREFIX_CACHE_ENABLED, min_tokens: int = PREFIX_CACHE_MIN_TOKENS,
+                 count_tokens: Callable[[str], int] = lambda text: len(text) // 4):
+        self.create = create
+        self.ttl = ttl
+        self.enabled = enabled
+        self.min_tokens = min_tokens
+        self.count_tokens = count_tokens
+        self._entries = {}
+        self._creating = set()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "created": 0, "failures": 0, "unsupported": 0, "too_small": 0}
+
+    def get(self, key: Hashable, prefix: str) -> Optional[Any]:
+        """
+        Get a live handle for a prefix, registering it on first use or expiry.
+
+        Args:
+            key (Hashable): Identifies the model and prefix, e.g. (model name, prompt version)
+            prefix (str): The static prompt prefix
+
+        Returns:
+            Optional[Any]: The handle, or None when the whole prompt must be sent
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if self.count_tokens(prefix) < self.min_tokens:
+                self.stats["too_small"] += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[1]:
+                handle = entry[0]
+                self.stats["hits" if handle is not None else "unsupported"] += 1
+                return handle
+            if key in self._creating:
+                # Another thread is registering this prefix
+                return None
+            self._creating.add(key)
+        try:
+            handle = self.create(key, prefix, self.ttl)
+            entry = (handle, now + max(0.0, self.ttl - REFRESH_MARGIN))
+            outcome = "created"
+        except Exception as e:
+            print(f"Warning: context caching unavailable for {key}; sending full prompts: {e}")
+            handle = None
+            entry = (None, now + self.ttl)
+            outcome = "failures"
+        with self._lock:
+            self._creating.discard(key)
+            self._entries[key] = entry
+            self.stats[outcome] += 1
+        return handle
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Forget a handle the backend no longer accepts.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["live"] = sum(1 for handle, _ in self._entries.values() if handle is not None)
+        stats["enabled"] = self.enabled
+        stats["ttl"] = self.ttl
+        stats["min_tokens"] = self.min_tokens
+        return stats
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Prefix cache counters in the Prometheus text format.
+        """
+        stats = self.get_stats()
+        return [
+            "# HELP soca_prefix_cache_hits_total LLM calls that sent only the per-student prompt suffix.",
+            "# TYPE soca_prefix_cache_hits_total counter",
+            f"soca_prefix_cache_hits_total {stats['hits']}",
+            "# HELP soca_prefix_cache_created_total Prompt prefixes registered with the context cache.",
+            "# TYPE soca_prefix_cache_created_total counter",
+            f"soca_prefix_cache_created_total {stats['created']}",
+            "# HELP soca_prefix_cache_failures_total Failed prefix registrations.",
+            "# TYPE soca_prefix_cache_failures_total counter",
+            f"soca_prefix_cache_failures_total {stats['failures']}",
+        ]
@@ -0,0 +1,323 @@
+"""
+API routes shared by the Vercel app (api/index.py) and the FastAPI backend
+(backend/main.py); both mount the router under /api.
+"""
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+import json
+import time
+
+from questions import get_all_subjects, canonicalize_answers, changed_answers, bank_snapshot, get_bank_loader
+from model import (
+    load_model, format_responses, run_soca_analysis_async,
+    calculate_subject_performance, stream_soca_analysis_async, MISSING_KEY_MESSAGE,
+    prompt_cache_version, get_http_pool_stats, get_llm_caller, get_prefix_cache, DEFAULT_PROMPT_VARIANT,
+)
+from cache import analysis_cache_key, get_analysis_cache
+from batch import analyze_sheets, ndjson_lines, BATCH_MAX_SHEETS
+from jobs import BACKGROUND_JOBS, get_job_queue, run_analysis_job
+from llm_stats import get_llm_stats
+from resilience import upstream_error_status
+from instant_report import DEFAULT_REPORT_MODE, INSTANT_FALLBACK, instant_response, within_budget
+from singleflight import get_single_flight
+from payloads import get_subject_payload, get_seeded_paper_payload, payload_response, get_paper_payload
+
+router = APIRouter()
+
+# Data Models
+class AnalysisRequest(BaseModel):
+    user_answers: Dict[str, Dict[str, str]]
+    # Seed of the paper from /api/paper?seed=...; answers are then keyed by question ID
+    seed: Optional[int] = None
+    # "full" or "compact" prompt; defaults to SOCA_PROMPT_VARIANT
+    prompt_variant: Optional[Literal["full", "compact"]] = None
+    # "llm", or "instant" for the rule-based report; defaults to SOCA_REPORT_MODE
+    mode: Optional[Literal["llm", "instant"]] = None
+    # bank_version of the paper the answers are for; that version is graded against while still loaded
+    bank_version: Optional[str] = None
+    # "rev" of each answered question on a seeded paper, checked when grading against another version
+    revisions: Optional[Dict[str, str]] = None
+
+class BatchSheet(AnalysisRequest):
+    sheet_id: str
+
+class BatchAnalysisRequest(BaseModel):
+    sheets: List[BatchSheet]
+
+# Global model state
+ml_model = None
+tokenizer = None
+device = None
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def require_background_jobs():
+    # See jobs.BACKGROUND_JOBS: the queue only works in a long-lived server process
+    if not BACKGROUND_JOBS:
+        raise HTTPException(
+            status_code=501,
+            detail="Background analysis needs a long-lived server process; it is disabled on this deployment",
+        )
+
+def check_seeded_answers(request, bank):
+    # Seeded option order depends only on the seed and question ID, so answers from a paper of
+    # another version still grade as long as the questions they answer are there, unchanged
+    if request.seed is None or request.bank_version == bank.version:
+        return
+    changed = changed_answers(request.user_answers, request.revisions or {}, bank)
+    if changed:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Questions changed since the paper was fetched: {', '.join(changed)}",
+        )
+
+@router.get("/subjects")
+async def get_subjects():
+    try:
+        subjects = get_all_subjects()
+        return {"subjects": subjects}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+# Payloads are built from the bank on their first request, so these run on the
+# threadpool rather than the event loop
+@router.get("/questions/{subject}")
+def get_subject_questions(subject: str, request: Request):
+    try:
+        # Sanitized JSON is serialized once, on the first request for the subject
+        return payload_response(get_subject_payload(subject), request.headers.get("if-none-match"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/paper")
+def get_paper(request: Request, seed: Optional[int] = None):
+    # All subjects and questions in one response, compressed once on first request.
+    # With a seed, questions and options are shuffled deterministically.
+    payload = get_paper_payload() if seed is None else get_seeded_paper_payload(seed)
+    return payload_response(
+        payload,
+        request.headers.get("if-none-match"),
+        request.headers.get("accept-encoding"),
+    )
+
+def process_analysis_job(queue, job):
+    global ml_model, tokenizer, device
+    if not ml_model:
+        ml_model, tokenizer, device = load_model()
+    # Graded against the version the job was submitted with, while it is still loaded
+    with bank_snapshot(job.get("bank_version")) as bank:
+        run_analysis_job(queue, job, ml_model, bank.answer_key, bank.version)
+
+@router.post("/analyze")
+async def analyze_performance(request: AnalysisRequest, background: bool = False):
+    try:
+        # Hold one bank version for the whole request, even if a new one is swapped in meanwhile
+        with bank_snapshot(request.bank_version) as bank:
+            check_seeded_answers(request, bank)
+            return await analyze_with_bank(request, bank, background)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+async def analyze_with_bank(request: AnalysisRequest, bank, background: bool):
+    global ml_model, tokenizer, device
+
+    user_answers = canonicalize_answers(request.user_answers, request.seed, bank)
+    prompt_variant = request.prompt_variant or DEFAULT_PROMPT_VARIANT
+    answer_key = bank.answer_key
+    if (request.mode or DEFAULT_REPORT_MODE) == "instant":
+        # Rule-based report from the graded answers; no LLM call and no queue
+        return {**instant_response(user_answers, answer_key), "bank_version": bank.version}
+    if background:
+        require_background_jobs()
+        # Queue the report and return at once; poll GET /api/analyze/{job_id}
+        job_queue = get_job_queue()
+        job_queue.start(process_analysis_job)
+        job_id = job_queue.submit(user_answers, prompt_variant, bank.version)
+        return JSONResponse(
+            status_code=202, content={"job_id": job_id, "status": "queued", "bank_version": bank.version}
+        )
+
+    if not ml_model:
+        ml_model, tokenizer, device = load_model()
+
+    analysis_cache = get_analysis_cache()
+    cache_key = analysis_cache_key(user_answers, bank.version, prompt_cache_version(prompt_variant))
+    analysis = await analysis_cache.get_async(cache_key)
+    if analysis is None:
+        if not ml_model:
+            if INSTANT_FALLBACK:
+                return {**instant_response(user_answers, answer_key, reason="no_model"), "bank_version": bank.version}
+            return {"analysis": MISSING_KEY_MESSAGE, "bank_version": bank.version}
+
+        async def generate():
+            formatted_text = format_responses(user_answers, answer_key, prompt_variant)
+            subject_performance = calculate_subject_performance(user_answers, answer_key)
+            report = await run_soca_analysis_async(ml_model, formatted_text, subject_performance, prompt_variant)
+            await analysis_cache.set_async(cache_key, report)
+            return report
+
+        try:
+            # Identical sheets submitted together share one Gemini call
+            analysis = await within_budget(get_single_flight().run(cache_key, generate))
+        except Exception as e:
+            print(f"Error generating analysis with Gemini: {str(e)}")
+            if INSTANT_FALLBACK:
+                return {**instant_response(user_answers, answer_key, reason="llm_error"), "bank_version": bank.version}
+            # Upstream failures are errors, not reports: 502/503/504 rather than a 200
+            status_code, headers = upstream_error_status(e)
+            raise HTTPException(
+                status_code=status_code,
+                detail=f"Error generating analysis. Please try again. Details: {str(e)}",
+                headers=headers,
+            )
+        if analysis is None:
+            # Past SOCA_REPORT_BUDGET; the call keeps running and caches its report for next time
+            return {**instant_response(user_answers, answer_key, reason="over_budget"), "bank_version": bank.version}
+    return {"analysis": analysis, "source": "llm", "bank_version": bank.version}
+
+@router.post("/analyze/stream")
+async def analyze_performance_stream(request: AnalysisRequest):
+    global ml_model, tokenizer, device
+    
+    # The bank version is leased until the stream ends
+    bank_loader = get_bank_loader()
+    bank = bank_loader.acquire(request.bank_version)
+    try:
+        check_seeded_answers(request, bank)
+        if not ml_model:
+            ml_model, tokenizer, device = load_model()
+        
+        user_answers = canonicalize_answers(request.user_answers, request.seed, bank)
+        prompt_variant = request.prompt_variant or DEFAULT_PROMPT_VARIANT
+        mode = request.mode or DEFAULT_REPORT_MODE
+        answer_key = bank.answer_key
+        formatted_text = format_responses(user_answers, answer_key, prompt_variant)
+        subject_performance = calculate_subject_performance(user_answers, answer_key)
+        analysis_cache = get_analysis_cache()
+        cache_key = analysis_cache_key(user_answers, bank.version, prompt_cache_version(prompt_variant))
+        cached = await analysis_cache.get_async(cache_key)
+    except HTTPException:
+        bank_loader.release(bank)
+        raise
+    except Exception as e:
+        bank_loader.release(bank)
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+    async def events():
+        try:
+            async for event in report_events():
+                yield event
+        finally:
+            bank_loader.release(bank)
+
+    async def report_events():
+        start = time.perf_counter()
+        done = {"subject_performance": subject_performance, "source": "llm", "bank_version": bank.version}
+        instant_reason = None
+        if mode == "instant":
+            instant_reason = "requested"
+        elif cached is not None:
+            yield sse_event("chunk", {"text": cached})
+        elif not ml_model and INSTANT_FALLBACK:
+            instant_reason = "no_model"
+        else:
+            parts = []
+            try:
+                async for text in stream_soca_analysis_async(ml_model, formatted_text, subject_performance, prompt_variant):
+                    parts.append(text)
+                    yield sse_event("chunk", {"text": text})
+                await analysis_cache.set_async(cache_key, "".join(parts))
+            except Exception as e:
+                print(f"Error streaming analysis with Gemini: {str(e)}")
+                # Once chunks have been sent the report can only end in an error
+                if parts or not INSTANT_FALLBACK:
+                    yield sse_event("error", {"detail": str(e)})
+                else:
+                    instant_reason = "llm_error"
+        if instant_reason:
+            report = instant_response(user_answers, answer_key, subject_performance, instant_reason)
+            yield sse_event("chunk", {"text": report.pop("analysis")})
+            done.update(report)
+        done["generation_time"] = time.perf_counter() - start
+        yield sse_event("done", done)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    global ml_model, tokenizer, device
+    
+    if len(request.sheets) > BATCH_MAX_SHEETS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: at most {BATCH_MAX_SHEETS} sheets")
+    # The whole batch is graded against one bank version, leased until the last line is sent
+    bank_loader = get_bank_loader()
+    bank = bank_loader.acquire(next((sheet.bank_version for sheet in request.sheets if sheet.bank_version), None))
+    try:
+        for sheet in request.sheets:
+            check_seeded_answers(sheet, bank)
+        if not ml_model:
+            ml_model, tokenizer, device = load_model()
+        
+        sheets = [
+            (
+                sheet.sheet_id,
+                canonicalize_answers(sheet.user_answers, sheet.seed, bank),
+                sheet.prompt_variant or DEFAULT_PROMPT_VARIANT,
+                sheet.mode or DEFAULT_REPORT_MODE,
+            )
+            for sheet in request.sheets
+        ]
+    except HTTPException:
+        bank_loader.release(bank)
+        raise
+    except Exception as e:
+        bank_loader.release(bank)
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+    async def lines():
+        try:
+            async for line in ndjson_lines(analyze_sheets(ml_model, sheets, bank.answer_key, bank.version)):
+                yield line
+        finally:
+            bank_loader.release(bank)
+
+    # Results are streamed as NDJSON in completion order, one line per sheet
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/analyze/{job_id}")
+async def get_analysis_job(job_id: str):
+    require_background_jobs()
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return get_analysis_cache().get_stats()
+
+@router.get("/llm/stats")
+async def get_llm_call_stats(windows: str = "60,900,3600"):
+    # Comma-separated window lengths in seconds
+    try:
+        window_list = [float(w) for w in windows.split(",") if w.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="windows must be comma-separated seconds")
+    stats = get_llm_stats()
+    return {
+        "windows": [stats.summary(window) for window in window_list],
+        "http_pool": get_http_pool_stats(),
+        "resilience": get_llm_caller().get_stats(),
+        "single_flight": get_single_flight().get_stats(),
+        "prefix_cache": get_prefix_cache().get_stats(),
+        "question_bank": get_bank_loader().get_stats(),
+    }
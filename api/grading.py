@@ -0,0 +1,185 @@
+from typing import Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from question_bank import positional_index
+
+# Options are graded as small ints so a whole class can be compared at once;
+# any single-letter option label "a" to "z" is supported
+OPTION_CODES = {chr(ord("a") + i): i for i in range(26)}
+UNANSWERED = -1
+INVALID = -2
+
+class CompiledKey(NamedTuple):
+    """Answer key compiled into arrays; columns are grouped by subject."""
+    subjects: Tuple[str, ...]
+    key: np.ndarray
+    subject_matrix: np.ndarray
+    columns: Mapping[str, Mapping[str, int]]
+    totals: np.ndarray
+
+class GradeResult(NamedTuple):
+    """Per-sheet, per-subject counts; every array has shape (sheets, subjects)."""
+    subjects: Tuple[str, ...]
+    correct: np.ndarray
+    attempted: np.ndarray
+    accuracy: np.ndarray
+
+def answer_code(q_id: str, entry: Mapping[str, str]) -> int:
+    """
+    Option code of a key entry's correct answer.
+
+    Raises:
+        ValueError: If the correct answer is not an option letter, or not one of the entry's options
+    """
+    answer = entry.get("correct_answer")
+    options = entry.get("options")
+    if answer not in OPTION_CODES or (options is not None and answer not in options):
+        raise ValueError(f"{q_id}: correct answer {answer!r} is not one of its options")
+    return OPTION_CODES[answer]
+
+def compile_answer_key(answer_key: Mapping[str, Mapping[str, Mapping[str, str]]]) -> CompiledKey:
+    """
+    Compile an answer_key[subject][question_id] mapping into arrays.
+
+    Every stable question ID gets its own column, in the key's order. A
+    positional "Qn" key is an alias of the n-th stable ID and shares its
+    column; in a key with no stable IDs, the "Qn" keys are the questions.
+
+    Args:
+        answer_key (Mapping): answer_key[subject][question_id] = {"correct_answer": ..., ...}
+
+    Returns:
+        CompiledKey: Option codes per column and the column of every question ID
+
+    Raises:
+        ValueError: If a correct answer can never be matched by a response
+    """
+    subjects = tuple(answer_key)
+    key = []
+    subject_of = []
+    columns = {}
+    totals = []
+    for s, subject in enumerate(subjects):
+        entries = list(answer_key[subject].items())
+        stable_ids = [q_id for q_id, _ in entries if positional_index(q_id) is None]
+        subject_columns = {}
+        for q_id, entry in entries:
+            position = positional_index(q_id)
+            if position is not None and position < len(stable_ids):
+                continue
+            subject_columns[q_id] = len(key)
+            key.append(answer_code(q_id, entry))
+            subject_of.append(s)
+        for q_id, _ in entries:
+            if q_id not in subject_columns:
+                subject_columns[q_id] = subject_columns[stable_ids[positional_index(q_id)]]
+        columns[subject] = subject_columns
+        totals.append(len(set(subject_columns.values())))
+    subject_of = np.asarray(subject_of, dtype=np.intp)
+    subject_matrix = np.zeros((len(key), len(subjects)), dtype=np.float32)
+    subject_matrix[np.arange(len(key)), subject_of] = 1.0
+    return CompiledKey(
+        subjects=subjects,
+        key=np.asarray(key, dtype=np.int8),
+        subject_matrix=subject_matrix,
+        columns=columns,
+        totals=np.asarray(totals, dtype=np.int32),
+    )
+
+_last_compiled = (None, None)
+
+def get_compiled_key(answer_key) -> CompiledKey:
+    """
+    Compile an answer key, reusing the last result while the same key object is passed in.
+    Keys that carry a precompiled `compiled_key` (question bank versions) use it as is.
+    """
+    global _last_compiled
+    precompiled = getattr(answer_key, "compiled_key", None)
+    if precompiled is not None:
+        return precompiled
+    source, compiled = _last_compiled
+    if source is not answer_key:
+        compiled = compile_answer_key(answer_key)
+        _last_compiled = (answer_key, compiled)
+    return compiled
+
+def encode_responses(sheets: Sequence[Mapping[str, Mapping[str, str]]], compiled: CompiledKey) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode answer sheets into a sheets x questions matrix of option codes.
+
+    Args:
+        sheets (Sequence[Mapping]): One user_answers dict per sheet
+        compiled (CompiledKey): Compiled answer key
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The int8 response matrix (UNANSWERED where
+        blank) and a (sheets, subjects) count of answers to question IDs not in the key
+    """
+    matrix = np.full((len(sheets), len(compiled.key)), UNANSWERED, dtype=np.int8)
+    unmatched = np.zeros((len(sheets), len(compiled.subjects)), dtype=np.int32)
+    subject_index = {subject: s for s, subject in enumerate(compiled.subjects)}
+    for i, sheet in enumerate(sheets):
+        for subject, answers in sheet.items():
+            s = subject_index.get(subject)
+            if s is None:
+                continue
+            subject_columns = compiled.columns[subject]
+            for q_id, ans in answers.items():
+                col = subject_columns.get(q_id)
+                if col is None:
+                    unmatched[i, s] += 1
+                else:
+                    matrix[i, col] = OPTION_CODES.get(ans, INVALID)
+    return matrix, unmatched
+
+def grade_matrix(matrix: np.ndarray, compiled: CompiledKey, unmatched: np.ndarray = None) -> GradeResult:
+    """
+    Grade a whole response matrix at once.
+
+    Args:
+        matrix (np.ndarray): sheets x questions option codes from encode_responses
+        compiled (CompiledKey): Compiled answer key
+        unmatched (np.ndarray): Optional extra attempted-but-wrong counts per sheet and subject
+
+    Returns:
+        GradeResult: Correct and attempted counts and accuracy (% of attempted) per subject
+    """
+    answered = matrix != UNANSWERED
+    hits = (matrix == compiled.key) & answered
+    correct = (hits.astype(np.float32) @ compiled.subject_matrix).astype(np.int32)
+    attempted = (answered.astype(np.float32) @ compiled.subject_matrix).astype(np.int32)
+    if unmatched is not None:
+        attempted += unmatched
+    accuracy = np.divide(
+        correct, attempted,
+        out=np.zeros(attempted.shape, dtype=np.float64),
+        where=attempted > 0,
+    ) * 100
+    return GradeResult(compiled.subjects, correct, attempted, accuracy)
+
+def grade_sheets(sheets: Sequence[Mapping[str, Mapping[str, str]]], answer_key) -> GradeResult:
+    """
+    Encode and grade a batch of user_answers dicts against an answer key.
+    """
+    compiled = get_compiled_key(answer_key)
+    matrix, unmatched = encode_responses(sheets, compiled)
+    return grade_matrix(matrix, compiled, unmatched)
+
+def subject_performance_many(sheets: Sequence[Mapping[str, Mapping[str, str]]], answer_key) -> List[Dict[str, float]]:
+    """
+    Percentage of correct answers per subject for every sheet.
+
+    Each dict lists the subjects the sheet answered, in the order it answered
+    them; subjects missing from the key score 0.
+    """
+    result = grade_sheets(sheets, answer_key)
+    subject_index = {subject: s for s, subject in enumerate(result.subjects)}
+    accuracy = result.accuracy.tolist()
+    performances = []
+    for i, sheet in enumerate(sheets):
+        performances.append({
+            subject: accuracy[i][subject_index[subject]] if subject in subject_index else 0.0
+            for subject in sheet
+        })
+    return performances
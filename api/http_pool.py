@@ -0,0 +1,125 @@
+import os
+import socket
+from typing import Any, Dict, List
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+# One pool slot per thread that can be calling Gemini at once: the attempt
+# threads of model.get_llm_caller() (2 x SOCA_LLM_CONCURRENCY, room for a hedge
+# per call), streams read on the LLM thread pool (SOCA_LLM_CONCURRENCY) and the
+# background job workers. With fewer slots a hedge waits for a connection
+# behind the very attempt it was sent to overtake.
+LLM_CONCURRENCY = max(1, int(os.getenv("SOCA_LLM_CONCURRENCY", "8")))
+JOB_WORKERS = max(1, int(os.getenv("SOCA_JOB_WORKERS", "2")))
+POOL_SIZE = max(1, int(os.getenv("SOCA_HTTP_POOL_SIZE", str(3 * LLM_CONCURRENCY + JOB_WORKERS))))
+CONNECT_TIMEOUT = float(os.getenv("SOCA_HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SOCA_HTTP_READ_TIMEOUT", "120"))
+
+class PooledAdapter(HTTPAdapter):
+    """
+    Keep-alive connection pool with explicit connect and read timeouts.
+
+    Threads wait for a free connection instead of opening throwaway ones, so
+    every connection (and its TLS handshake) is reused.
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        super().__init__(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+
+    def init_poolmanager(self, *args, **kwargs):
+        # TCP keep-alive stops idle pooled connections being dropped silently
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        # Callers pass a single overall timeout (or none); split it so connecting
+        # fails fast and reads never wait longer than read_timeout
+        if not isinstance(timeout, tuple):
+            read = self.read_timeout if timeout is None else min(timeout, self.read_timeout)
+            timeout = (self.connect_timeout, read)
+        return super().send(request, timeout=timeout, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-host pool utilisation.
+
+        Returns:
+            Dict[str, Any]: Pool size and timeouts, plus connections in use, idle,
+            opened so far and requests served for every host
+        """
+        pools = []
+        manager = self.poolmanager
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            queue = pool.pool
+            with queue.mutex:
+                # Slots hold either an idle connection or None (not yet opened)
+                idle = sum(1 for conn in queue.queue if conn is not None)
+                free_slots = len(queue.queue)
+            pools.append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                "in_use": queue.maxsize - free_slots,
+                "idle": idle,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+            })
+        in_use = sum(p["in_use"] for p in pools)
+        return {
+            "pool_size": self.pool_size,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "in_use": in_use,
+            "utilisation": in_use / self.pool_size,
+            "pools": pools,
+        }
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Pool utilisation in the Prometheus text format, for metrics.register_collector.
+        """
+        stats = self.get_stats()
+        lines = [
+            "# HELP soca_llm_http_pool_size Connections per host in the Gemini HTTP pool.",
+            "# TYPE soca_llm_http_pool_size gauge",
+            f"soca_llm_http_pool_size {stats['pool_size']}",
+        ]
+        series = (
+            ("in_use", "gauge", "Pooled connections currently checked out."),
+            ("idle", "gauge", "Open pooled connections waiting for a request."),
+            ("connections_opened", "counter", "Connections opened, each costing a TCP and TLS handshake."),
+            ("requests", "counter", "Requests sent through the pool."),
+        )
+        for field, kind, help_text in series:
+            name = f"soca_llm_http_pool_{field}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for pool in stats["pools"]:
+                lines.append(f'{name}{{host="{pool["host"]}"}} {pool[field]}')
+        return lines
+
+_adapter = None
+
+def get_pooled_adapter() -> PooledAdapter:
+    """
+    Get the process-wide adapter; SOCA_HTTP_POOL_SIZE, SOCA_HTTP_CONNECT_TIMEOUT
+    and SOCA_HTTP_READ_TIMEOUT configure it.
+    """
+    global _adapter
+    if _adapter is None:
+        _adapter = PooledAdapter()
+    return _adapter
+
+def mount_pooled_adapter(session) -> PooledAdapter:
+    """
+    Route all of a requests.Session's traffic through the shared adapter.
+    """
+    adapter = get_pooled_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
@@ -0,0 +1,251 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from grading import subject_performance_many
+from metrics import INSTANT_REPORTS
+
+# "llm" (default) or "instant" for requests that don't choose a report mode
+DEFAULT_REPORT_MODE = os.getenv("SOCA_REPORT_MODE", "llm")
+# Serve the instant report instead of an error when the LLM is missing or fails
+INSTANT_FALLBACK = os.getenv("SOCA_INSTANT_FALLBACK", "1") == "1"
+# Seconds /api/analyze waits for the LLM before answering with the instant
+# report; the LLM call keeps running and caches its report. 0 = wait for the deadline.
+REPORT_BUDGET = float(os.getenv("SOCA_REPORT_BUDGET", "0"))
+
+CORE_SUBJECTS = [("Physics", "⚛️"), ("Chemistry", "🧪"), ("Mathematics", "📐")]
+HABIT_SECTIONS = ["Well-being Assessment", "Time Management"]
+
+# Advice for a well-being or time-management answer that differs from the ideal habit
+HABIT_ADVICE = {
+    "Stress": "Schedule short daily decompression (a walk, breathing exercises) and talk to someone when pressure builds.",
+    "Sleep": "Keep a fixed sleep window of 6-8 hours; late-night study costs more recall than it adds.",
+    "Exercise": "Add 20-30 minutes of physical activity on most days to improve focus and mood.",
+    "Coping with Pressure": "Turn pressure into a routine: break goals into daily targets and review them calmly.",
+    "Confidence": "Track small wins such as topics finished and scores improving, to build confidence on evidence.",
+    "Planning": "Plan weekly targets and break them into daily lists you can tick off.",
+    "Breaks": "Use timed breaks, for example 50 minutes of study and 10 minutes off, instead of random ones.",
+    "Prioritization": "Rank topics by exam weightage and by your own difficulty, and start with high-weight weak topics.",
+    "Handling Disruptions": "Keep a buffer slot each week to absorb disruptions instead of skipping topics.",
+    "Review": "Review the plan every evening and adjust tomorrow's targets.",
+}
+DEFAULT_HABIT_ADVICE = "Move this habit one step closer to the ideal over the next two weeks."
+
+def band(score: float) -> str:
+    """
+    Describes a subject score.
+    """
+    if score >= 80:
+        return "strong"
+    if score >= 50:
+        return "developing"
+    return "needs attention"
+
+def topic_tallies(answers: Mapping[str, str], subject_key: Mapping[str, Mapping[str, str]]) -> Dict[str, List[int]]:
+    """
+    [correct, attempted] per topic for one subject, in order of first appearance.
+    """
+    topics = {}
+    for q_no, user_ans in answers.items():
+        q_data = subject_key.get(q_no)
+        if q_data is None:
+            continue
+        tally = topics.setdefault(q_data.get("topic") or "General", [0, 0])
+        tally[1] += 1
+        if user_ans == q_data.get("correct_answer"):
+            tally[0] += 1
+    return topics
+
+def split_topics(topics: Dict[str, List[int]]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Topics answered fully correctly, partly correctly and not at all.
+    """
+    strong = [topic for topic, (correct, attempted) in topics.items() if correct == attempted]
+    partial = [f"{topic} ({correct}/{attempted})" for topic, (correct, attempted) in topics.items() if 0 < correct < attempted]
+    weak = [topic for topic, (correct, _) in topics.items() if correct == 0]
+    return strong, partial, weak
+
+def option_text(q_data: Mapping, option: str) -> str:
+    return q_data.get("options", {}).get(option) or f"({option})"
+
+def subject_soca(subject: str, score: float, topics: Dict[str, List[int]]) -> List[str]:
+    strong, partial, weak = split_topics(topics)
+    if strong:
+        strengths = f"Secure in {', '.join(strong)}."
+    else:
+        strengths = "You attempted the section; no topic is fully secure yet, which makes the next steps clear."
+    if partial:
+        opportunities = f"Close to mastering {', '.join(partial)}; a few targeted problem sets should convert these."
+    elif strong:
+        opportunities = f"Move from textbook problems to previous-year JEE questions in {', '.join(strong)}."
+    else:
+        opportunities = "Every topic has room to grow; early gains come quickly from the fundamentals."
+    if weak:
+        challenges = f"No correct answers in {', '.join(weak)}."
+    else:
+        challenges = "No topic was missed entirely; the risk is careless errors under time pressure."
+    if score >= 80:
+        plan = f"Keep {subject} warm with timed mixed practice twice a week, and spend most of your time elsewhere."
+    elif score >= 50:
+        focus = ", ".join(weak or [topic.split(" (")[0] for topic in partial]) or subject
+        plan = f"Revise the theory of {focus}, then solve 15-20 graded problems per topic this week."
+    else:
+        focus = ", ".join(weak) or subject
+        plan = f"Rebuild the basics of {focus} from NCERT before attempting JEE-level problems."
+    return [
+        f"*   **Strengths**: {strengths}",
+        f"*   **Opportunities**: {opportunities}",
+        f"*   **Challenges**: {challenges}",
+        f"*   **Action Plan**: {plan}",
+    ]
+
+def habit_review(user_answers, answer_key) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """
+    One line per well-being / time-management answer, compared with the ideal habit,
+    plus the (gap, topic) of every answer that differs from it.
+    """
+    lines = []
+    gaps = []
+    for section in HABIT_SECTIONS:
+        answers = user_answers.get(section) or {}
+        section_key = answer_key.get(section, {})
+        for q_no, user_ans in answers.items():
+            q_data = section_key.get(q_no)
+            if q_data is None:
+                continue
+            topic = q_data.get("topic") or section
+            ideal = q_data.get("correct_answer")
+            if user_ans == ideal:
+                lines.append(f"*   ✅ **{topic}**: {option_text(q_data, user_ans)}, which matches the ideal habit.")
+                continue
+            # Options run from the least to the most helpful habit, so distance from the ideal ranks concerns
+            gap = abs(ord(user_ans[:1] or "a") - ord(ideal[:1] or "a"))
+            gaps.append((gap, topic))
+            advice = HABIT_ADVICE.get(topic, DEFAULT_HABIT_ADVICE)
+            lines.append(
+                f"*   ⚠️ **{topic}**: {option_text(q_data, user_ans)} (ideal: {option_text(q_data, ideal)}). {advice}"
+            )
+    if not lines:
+        lines.append("*   No well-being or time-management answers were submitted.")
+    return lines, gaps
+
+def build_instant_report(user_answers: Mapping[str, Mapping[str, str]], answer_key,
+                         subject_performance: Optional[Dict[str, float]] = None) -> str:
+    """
+    Build a SOCA report from the graded answers alone, without an LLM.
+
+    It has the same Markdown sections as the Gemini prompt asks for and takes
+    milliseconds, so it is served as the "instant" report mode and in place of
+    an error when the LLM is unavailable.
+
+    Args:
+        user_answers (Mapping[str, Mapping[str, str]]): Canonical answers keyed by subject and question ID
+        answer_key (Mapping): answer_key[subject][question_id] = {"correct_answer": ..., "topic": ..., ...}
+        subject_performance (Optional[Dict[str, float]]): Scores, if the sheet has already been graded
+
+    Returns:
+        str: The report in Markdown
+    """
+    if subject_performance is None:
+        subject_performance = subject_performance_many([user_answers], answer_key)[0]
+
+    lines = [
+        "# 📊 Comprehensive JEE Preparation Analysis",
+        "",
+        "_Instant report, generated from your scores and answers._",
+        "",
+        "## 1. 📚 Subject-wise Performance Distribution",
+    ]
+    soca = []
+    attempted = []
+    for subject, icon in CORE_SUBJECTS:
+        answers = user_answers.get(subject) or {}
+        topics = topic_tallies(answers, answer_key.get(subject, {}))
+        soca += ["", f"### {icon} {subject}"]
+        if not topics:
+            lines.append(f"*   **{subject}**: not attempted.")
+            soca.append("*   No answers were submitted for this section; attempt it to get a SOCA breakdown.")
+            continue
+        score = subject_performance.get(subject, 0.0)
+        correct = sum(c for c, _ in topics.values())
+        total = sum(n for _, n in topics.values())
+        strong, _, weak = split_topics(topics)
+        detail = []
+        if strong:
+            detail.append(f"strongest in {', '.join(strong)}")
+        if weak:
+            detail.append(f"weakest in {', '.join(weak)}")
+        lines.append(
+            f"*   **{subject}**: {score:.1f}% ({correct}/{total} correct), {band(score)}"
+            + (f"; {'; '.join(detail)}." if detail else ".")
+        )
+        soca += subject_soca(subject, score, topics)
+        attempted.append((score, subject, weak))
+
+    lines += ["", "## 2. 🧠 Subject-wise SOCA Analysis"] + soca
+    habit_lines, gaps = habit_review(user_answers, answer_key)
+    lines += ["", "## 3. 🧘 Well-being & Time Management Review"] + habit_lines
+
+    if attempted:
+        score, weakest, weak_topics = min(attempted)
+        focus = f"{weakest} ({score:.1f}%)" + (f", starting with {', '.join(weak_topics[:2])}" if weak_topics else "")
+        resource = (
+            f"NCERT theory plus previous-year JEE questions on {', '.join(weak_topics[:2])}"
+            if weak_topics else f"previous-year JEE papers in {weakest}, timed"
+        )
+    else:
+        focus = "Attempt the Physics, Chemistry and Mathematics sections to get a baseline"
+        resource = "a full-length mock test to find your weak topics"
+    if gaps:
+        _, habit = max(gaps)
+        advice = HABIT_ADVICE.get(habit, DEFAULT_HABIT_ADVICE)
+        strategy = f"Fix {habit.lower()} first: {advice[0].lower()}{advice[1:]}"
+    elif not any(user_answers.get(section) for section in HABIT_SECTIONS):
+        strategy = "Complete the Well-being and Time Management sections so your study plan can account for them."
+    else:
+        strategy = "Your habits match the ideal; keep the routine and add one timed mock test per week."
+    lines += [
+        "",
+        "## 4. 📝 Final Personalized Action Plan",
+        f"1. **Immediate Focus**: {focus}.",
+        f"2. **Study Strategy**: {strategy}",
+        f"3. **Resource Usage**: Use {resource}.",
+        "",
+    ]
+    return "\n".join(lines)
+
+def instant_response(user_answers, answer_key, subject_performance=None, reason: str = "requested") -> Dict[str, Any]:
+    """
+    Build an /api/analyze response holding the instant report.
+
+    Args:
+        user_answers (Mapping[str, Mapping[str, str]]): Canonical answers keyed by subject and question ID
+        answer_key (Mapping): The bank's answer key
+        subject_performance (Optional[Dict[str, float]]): Scores, if the sheet has already been graded
+        reason (str): "requested", or why the LLM report was not used: "no_model", "llm_error" or "over_budget"
+
+    Returns:
+        Dict[str, Any]: {"analysis", "source": "instant"}, plus "fallback_reason" for fallbacks
+    """
+    INSTANT_REPORTS.inc(reason)
+    response = {"analysis": build_instant_report(user_answers, answer_key, subject_performance), "source": "instant"}
+    if reason != "requested":
+        response["fallback_reason"] = reason
+    return response
+
+async def within_budget(awaitable, budget: float = REPORT_BUDGET):
+    """
+    Await an LLM report, giving up after `budget` seconds (0 = no budget).
+
+    Returns:
+        The report, or None when the budget ran out; a shielded call such as a
+        SingleFlight flight keeps running in the background
+    """
+    if budget <= 0:
+        return await awaitable
+    task = asyncio.ensure_future(awaitable)
+    done, _ = await asyncio.wait({task}, timeout=budget)
+    if not done:
+        task.cancel()
+        return None
+    return task.result()
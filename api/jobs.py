@@ -0,0 +1,241 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from model import (
+    MISSING_KEY_MESSAGE, calculate_subject_performance, format_responses,
+    prompt_cache_version, stream_soca_analysis,
+)
+from cache import analysis_cache_key, get_analysis_cache
+from instant_report import INSTANT_FALLBACK, instant_response
+
+# Partial output is written back at most this often while a report streams in
+PARTIAL_FLUSH_INTERVAL = 0.5
+
+# Jobs run on worker threads of the web process and are kept in a local SQLite
+# file, so they need a long-lived server. Serverless hosts such as Vercel
+# freeze an instance once it has answered, and a poll may land on another
+# instance, so background jobs are off there unless SOCA_BACKGROUND_JOBS=1.
+BACKGROUND_JOBS = os.getenv("SOCA_BACKGROUND_JOBS", "0" if os.getenv("VERCEL") else "1") == "1"
+
+class JobQueue:
+    """
+    Persistent queue of analysis jobs backed by SQLite.
+
+    Jobs go queued -> running -> done/failed. A worker's claim on a running job
+    expires after `lease` seconds, so jobs left behind by a frozen or killed
+    process are picked up again.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, lease: float = 300.0):
+        self.db_path = db_path
+        self.workers = workers
+        self.lease = lease
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+                "subject_performance TEXT, partial TEXT NOT NULL DEFAULT '', "
+                "analysis TEXT, error TEXT, created_at REAL NOT NULL, "
+                "claimed_at REAL, finished_at REAL, bank_version TEXT)"
+            )
+            # Queues created before jobs recorded their bank version
+            columns = {row[1] for row in db.execute("PRAGMA table_info(analysis_jobs)")}
+            if "bank_version" not in columns:
+                db.execute("ALTER TABLE analysis_jobs ADD COLUMN bank_version TEXT")
+            db.execute("CREATE INDEX IF NOT EXISTS analysis_jobs_status ON analysis_jobs (status, created_at)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def submit(self, user_answers: Dict[str, Dict[str, str]], prompt_variant: str = "full",
+               bank_version: Optional[str] = None) -> str:
+        """
+        Queue an analysis and wake a worker.
+
+        Args:
+            bank_version (Optional[str]): Question bank version the answers were canonicalized against
+
+        Returns:
+            str: The new job's ID
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO analysis_jobs (id, status, request, created_at, bank_version) VALUES (?, 'queued', ?, ?, ?)",
+                (
+                    job_id, json.dumps({"user_answers": user_answers, "prompt_variant": prompt_variant}),
+                    time.time(), bank_version,
+                ),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status, partial output and final report.
+
+        Returns:
+            Optional[Dict[str, Any]]: The job, or None if the ID is unknown
+        """
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT id, status, subject_performance, partial, analysis, error, created_at, finished_at, bank_version "
+                "FROM analysis_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "subject_performance": json.loads(row[2]) if row[2] else None,
+            "partial": row[3],
+            "analysis": row[4],
+            "error": row[5],
+            "created_at": row[6],
+            "finished_at": row[7],
+            "bank_version": row[8],
+        }
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued job, or a running job whose lease expired.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT id, request, bank_version FROM analysis_jobs "
+                "WHERE status = 'queued' OR (status = 'running' AND claimed_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now - self.lease,),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE analysis_jobs SET status = 'running', claimed_at = ?, partial = '' WHERE id = ?",
+                (now, row[0]),
+            )
+        return {"job_id": row[0], **json.loads(row[1]), "bank_version": row[2]}
+
+    def update(self, job_id: str, **fields) -> None:
+        """
+        Write status, partial output or results back to a job.
+        """
+        if "subject_performance" in fields:
+            fields["subject_performance"] = json.dumps(fields["subject_performance"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(f"UPDATE analysis_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def start(self, process: Callable[["JobQueue", Dict[str, Any]], None]) -> None:
+        """
+        Start the worker threads once per process.
+
+        Args:
+            process (Callable): Runs one claimed job and records its outcome
+        """
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(process,), name=f"soca-job-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self, process):
+        while True:
+            try:
+                job = self.claim()
+            except sqlite3.Error as e:
+                print(f"Warning: could not claim analysis job: {e}")
+                job = None
+            if job is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            try:
+                process(self, job)
+            except Exception as e:
+                print(f"Error running analysis job {job['job_id']}: {str(e)}")
+                self.update(job["job_id"], status="failed", error=str(e), finished_at=time.time())
+
+def run_analysis_job(queue: JobQueue, job: Dict[str, Any], llm_model, answer_key, bank_version: str) -> None:
+    """
+    Generate the report for one job with the format_responses / Gemini
+    streaming pipeline, flushing partial output as it arrives.
+    """
+    job_id = job["job_id"]
+    user_answers = job["user_answers"]
+    prompt_variant = job.get("prompt_variant", "full")
+    subject_performance = calculate_subject_performance(user_answers, answer_key)
+    # The version actually graded against; the submitted one may have been replaced since
+    queue.update(job_id, subject_performance=subject_performance, bank_version=bank_version)
+
+    analysis_cache = get_analysis_cache()
+    cache_key = analysis_cache_key(user_answers, bank_version, prompt_cache_version(prompt_variant))
+    analysis = analysis_cache.get(cache_key)
+    if analysis is None:
+        if not llm_model:
+            if INSTANT_FALLBACK:
+                analysis = instant_response(user_answers, answer_key, subject_performance, "no_model")["analysis"]
+                queue.update(job_id, status="done", partial=analysis, analysis=analysis, finished_at=time.time())
+                return
+            queue.update(job_id, status="failed", error=MISSING_KEY_MESSAGE, finished_at=time.time())
+            return
+        formatted_text = format_responses(user_answers, answer_key, prompt_variant)
+        parts = []
+        last_flush = time.monotonic()
+        try:
+            for text in stream_soca_analysis(llm_model, formatted_text, subject_performance, prompt_variant):
+                parts.append(text)
+                if time.monotonic() - last_flush >= PARTIAL_FLUSH_INTERVAL:
+                    queue.update(job_id, partial="".join(parts))
+                    last_flush = time.monotonic()
+        except Exception as e:
+            # Partial output already handed out can't be swapped for another report
+            if parts or not INSTANT_FALLBACK:
+                raise
+            print(f"Error running analysis job {job_id}: {str(e)}")
+            analysis = instant_response(user_answers, answer_key, subject_performance, "llm_error")["analysis"]
+            queue.update(job_id, status="done", partial=analysis, analysis=analysis, finished_at=time.time())
+            return
+        analysis = "".join(parts)
+        analysis_cache.set(cache_key, analysis)
+    queue.update(job_id, status="done", partial=analysis, analysis=analysis, finished_at=time.time())
+
+_job_queue = None
+
+def get_job_queue() -> JobQueue:
+    """
+    Get the process-wide job queue, configured from the environment.
+
+    SOCA_JOB_DB sets the SQLite file, SOCA_JOB_WORKERS the number of worker
+    threads and SOCA_JOB_LEASE how long a claimed job may run before it is retried.
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            db_path=os.getenv("SOCA_JOB_DB", "/tmp/soca_jobs.db"),
+            workers=max(1, int(os.getenv("SOCA_JOB_WORKERS", "2"))),
+            lease=float(os.getenv("SOCA_JOB_LEASE", "300")),
+        )
+    return _job_queue
@@ -0,0 +1,96 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+class LLMCall(NamedTuple):
+    """One LLM call as seen by the model layer."""
+    timestamp: float
+    model_name: str
+    prompt_variant: str
+    prompt_tokens: int
+    output_tokens: int
+    wall_time: float
+    ttft: Optional[float]
+    ok: bool
+
+def percentile(sorted_values: Sequence[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of an already sorted sequence.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """
+    p50/p95/p99 and mean of a list of measurements.
+    """
+    values = sorted(v for v in values if v is not None)
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else None,
+    }
+
+class LLMStats:
+    """
+    Rolling in-process store of the most recent LLM calls.
+    """
+
+    def __init__(self, max_records: int = 10000):
+        self._calls = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, call: LLMCall) -> None:
+        with self._lock:
+            self._calls.append(call)
+
+    def summary(self, window: float) -> Dict[str, Any]:
+        """
+        Latency and token percentiles over the last `window` seconds.
+
+        Args:
+            window (float): Window length in seconds
+
+        Returns:
+            Dict[str, Any]: One group per (model_name, prompt_variant) pair
+        """
+        since = time.time() - window
+        with self._lock:
+            calls = [call for call in self._calls if call.timestamp >= since]
+        groups = {}
+        for call in calls:
+            groups.setdefault((call.model_name, call.prompt_variant), []).append(call)
+        return {
+            "window_seconds": window,
+            "calls": len(calls),
+            "groups": [
+                {
+                    "model_name": model_name,
+                    "prompt_variant": prompt_variant,
+                    "calls": len(group),
+                    "errors": sum(1 for call in group if not call.ok),
+                    "latency": summarize([call.wall_time for call in group]),
+                    "ttft": summarize([call.ttft for call in group]),
+                    "prompt_tokens": summarize([call.prompt_tokens for call in group if call.ok]),
+                    "output_tokens": summarize([call.output_tokens for call in group if call.ok]),
+                }
+                for (model_name, prompt_variant), group in sorted(groups.items())
+            ],
+        }
+
+_llm_stats = None
+
+def get_llm_stats() -> LLMStats:
+    """
+    Get the process-wide LLM call store; SOCA_LLM_STATS_SIZE caps how many calls it keeps.
+    """
+    global _llm_stats
+    if _llm_stats is None:
+        _llm_stats = LLMStats(max_records=int(os.getenv("SOCA_LLM_STATS_SIZE", "10000")))
+    return _llm_stats
@@ -0,0 +1,188 @@
+import os
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import register_collector
+from microbatch import BATCH_WINDOW, MAX_BATCH, MicroBatcher
+
+# Offline seq2seq backend (SOCA_LLM_BACKEND=local). torch and transformers are
+# large optional dependencies, so they are only imported by load_local_model().
+LOCAL_MODEL_NAME = os.getenv("SOCA_LOCAL_MODEL", "google/flan-t5-large")
+# Dynamic int8 quantization of the Linear layers; CPU only
+LOCAL_QUANTIZE = os.getenv("SOCA_LOCAL_QUANTIZE", "1") == "1"
+# torch intra-op threads; 0 keeps torch's default (one per core)
+LOCAL_THREADS = int(os.getenv("SOCA_LOCAL_THREADS", "0"))
+# "cpu", or "auto" to use CUDA / Apple MPS when available and not quantizing
+LOCAL_DEVICE = os.getenv("SOCA_LOCAL_DEVICE", "cpu")
+# Generation-length caps: longer prompts are truncated from the end, with a warning
+LOCAL_MAX_INPUT_TOKENS = int(os.getenv("SOCA_LOCAL_MAX_INPUT_TOKENS", "512"))
+LOCAL_MAX_NEW_TOKENS = int(os.getenv("SOCA_LOCAL_MAX_NEW_TOKENS", "512"))
+
+# Sent instead of the Gemini prompt's format instructions, which alone would
+# fill most of the input window and leave no room for the student's data
+LOCAL_PROMPT_PREFIX = (
+    "Write a SOCA analysis (Strengths, Opportunities, Challenges, Action Plan) "
+    "for a JEE student, with advice per subject, from these results.\n\n"
+)
+
+torch = None
+transformers = None
+
+def import_torch():
+    """
+    Imports torch and transformers on first use; returns None if either is not installed.
+    """
+    global torch, transformers
+    if torch is None:
+        try:
+            import torch as _torch
+            import transformers as _transformers
+        except ImportError:
+            print("Warning: torch / transformers not available; the local backend is disabled")
+            return None
+        torch, transformers = _torch, _transformers
+    return torch
+
+def pick_device(quantize: bool, device: str = LOCAL_DEVICE) -> str:
+    """
+    Resolves SOCA_LOCAL_DEVICE; quantized models always run on the CPU.
+    """
+    if quantize or device != "auto":
+        return "cpu" if quantize else device
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+class LocalSeq2SeqModel:
+    """
+    A local seq2seq checkpoint (flan-t5 by default) behind the same
+    generate_content() interface as genai.GenerativeModel, so run_soca_analysis
+    and stream_soca_analysis work unchanged.
+
+    Generation is serialized: torch already spreads one call over all its
+    threads, and concurrent calls would only fight over them. Instead, calls
+    arriving within SOCA_LOCAL_BATCH_WINDOW_MS of each other are padded and run
+    as one batched generate(), which keeps the matmuls busy.
+    """
+
+    # Hedging a CPU-bound call only halves the throughput of both copies
+    hedge_percentile = 0
+    # Used by model.prepare_prompt in place of the full instructions
+    prompt_prefix = LOCAL_PROMPT_PREFIX
+
+    def __init__(self, model, tokenizer, device: str, model_name: str, quantized: bool = False,
+                 max_input_tokens: int = LOCAL_MAX_INPUT_TOKENS, max_new_tokens: int = LOCAL_MAX_NEW_TOKENS,
+                 batch_window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.model_name = f"local:{model_name}" + ("-int8" if quantized else "")
+        self.quantized = quantized
+        self.max_input_tokens = max_input_tokens
+        self.max_new_tokens = max_new_tokens
+        self._lock = threading.Lock()
+        self.batcher = None
+        if batch_window > 0 and max_batch > 1:
+            self.batcher = MicroBatcher(self._run_batch, window=batch_window, max_batch=max_batch)
+
+    def generate_batch(self, prompts: List[str], **generate_kwargs) -> List[Tuple[str, int, int]]:
+        """
+        Run one padded, batched generation.
+
+        Args:
+            prompts (List[str]): Full prompt texts
+            **generate_kwargs: Extra arguments for transformers' generate(), e.g. min_new_tokens
+
+        Returns:
+            List[Tuple[str, int, int]]: Decoded text, prompt tokens and generated tokens per prompt
+        """
+        over = [n for n in map(len, self.tokenizer(prompts)["input_ids"]) if n > self.max_input_tokens]
+        if over:
+            print(f"Warning: {len(over)} local prompt(s) of up to {max(over)} tokens truncated to "
+                  f"{self.max_input_tokens}; raise SOCA_LOCAL_MAX_INPUT_TOKENS or use the compact variant")
+        inputs = self.tokenizer(
+            prompts, return_tensors="pt", padding=True, truncation=True, max_length=self.max_input_tokens
+        ).to(self.device)
+        generate_kwargs.setdefault("max_new_tokens", self.max_new_tokens)
+        with self._lock, torch.inference_mode():
+            output = self.model.generate(**inputs, **generate_kwargs)
+        texts = self.tokenizer.batch_decode(output, skip_special_tokens=True)
+        prompt_tokens = inputs["attention_mask"].sum(dim=1).tolist()
+        # Rows start with the decoder start token and shorter ones are padded at the end
+        output_tokens = (output[:, 1:] != self.tokenizer.pad_token_id).sum(dim=1).tolist()
+        return list(zip(texts, prompt_tokens, output_tokens))
+
+    def _run_batch(self, group, prompts):
+        return self.generate_batch(prompts, **dict(group))
+
+    def generate(self, prompt: str, **generate_kwargs) -> Tuple[str, int, int]:
+        """
+        Run one generation, batched with concurrent ones when micro-batching is on.
+
+        Args:
+            prompt (str): Full prompt text
+            **generate_kwargs: Extra arguments for transformers' generate(); only
+                calls with equal arguments share a batch
+
+        Returns:
+            Tuple[str, int, int]: The decoded text, prompt tokens and generated tokens
+        """
+        if self.batcher is None:
+            return self.generate_batch([prompt], **generate_kwargs)[0]
+        return self.batcher.submit(prompt, group=tuple(sorted(generate_kwargs.items())))
+
+    def generate_content(self, prompt: str, stream: bool = False, **generate_kwargs) -> Any:
+        """
+        genai-style call: returns a response with .text and .usage_metadata, or
+        an iterator of one such chunk when stream is set (the report is only
+        decoded once generation finishes).
+        """
+        text, prompt_tokens, output_tokens = self.generate(prompt, **generate_kwargs)
+        response = SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens),
+        )
+        return iter([response]) if stream else response
+
+# Loaded models by (name, quantize, device); loading flan-t5-large takes seconds
+_local_models: Dict[Tuple[str, bool, str], LocalSeq2SeqModel] = {}
+_load_lock = threading.Lock()
+
+def load_local_model(model_name: str = LOCAL_MODEL_NAME, quantize: bool = LOCAL_QUANTIZE,
+                     threads: int = LOCAL_THREADS, device: Optional[str] = None):
+    """
+    Load a local seq2seq model for SOCA reports, once per process.
+
+    Args:
+        model_name (str): Hugging Face model ID or path of a saved checkpoint
+        quantize (bool): Apply dynamic int8 quantization to the Linear layers
+        threads (int): torch intra-op threads; 0 leaves torch's default
+        device (Optional[str]): Overrides SOCA_LOCAL_DEVICE
+
+    Returns:
+        Tuple: (model, tokenizer, device) like model.load_model(); (None, None, None)
+        when torch or transformers is not installed
+    """
+    if import_torch() is None:
+        return None, None, None
+    device = pick_device(quantize, device or LOCAL_DEVICE)
+    key = (model_name, quantize, device)
+    with _load_lock:
+        local_model = _local_models.get(key)
+        if local_model is None:
+            if threads > 0:
+                torch.set_num_threads(threads)
+            tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+            model = transformers.AutoModelForSeq2SeqLM.from_pretrained(model_name)
+            model.eval()
+            if quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.to(device)
+            local_model = LocalSeq2SeqModel(model, tokenizer, device, model_name, quantized=quantize)
+            if local_model.batcher is not None:
+                register_collector(local_model.batcher.metrics_lines)
+            _local_models[key] = local_model
+    return local_model, local_model.tokenizer, local_model.device
@@ -0,0 +1,242 @@
+import bisect
+import threading
+import time
+from typing import Callable, Iterable, List, Sequence
+
+from cache import get_analysis_cache
+
+# Prometheus text exposition, kept dependency-free so it can stay on in production.
+# Request paths are labelled with their route template to keep cardinality bounded.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Render a {name="value",...} label set, or "" when there are no labels.
+    """
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)) + "}"
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+        return lines
+
+class Gauge:
+    """Gauge that can go up and down, with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # Per-bucket counts are stored; they are made cumulative when rendered
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(label_values, list(counts), total) for label_values, (counts, total) in self._series.items()]
+        for label_values, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = format_labels(self.labels + ("le",), label_values + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+REQUEST_SECONDS = Histogram(
+    "soca_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+REQUESTS_TOTAL = Counter(
+    "soca_http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "soca_http_requests_in_flight", "HTTP requests currently being served."
+)
+LLM_CALL_SECONDS = Histogram(
+    "soca_llm_call_duration_seconds", "LLM call wall time.", ("model", "prompt_variant")
+)
+LLM_CALL_ERRORS = Counter(
+    "soca_llm_call_errors_total", "Failed LLM calls.", ("model", "prompt_variant")
+)
+INSTANT_REPORTS = Counter(
+    "soca_instant_reports_total", "Rule-based reports served, by why the LLM was not used.", ("reason",)
+)
+
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    """
+    Register a callable producing extra exposition lines at scrape time.
+    """
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+def observe_llm_call(model_name: str, prompt_variant: str, wall_time: float, ok: bool) -> None:
+    """
+    Record one LLM call's duration and outcome.
+    """
+    LLM_CALL_SECONDS.observe(wall_time, model_name, prompt_variant)
+    if not ok:
+        LLM_CALL_ERRORS.inc(model_name, prompt_variant)
+
+def render_metrics() -> str:
+    """
+    Render every metric in the Prometheus text format.
+    """
+    lines = []
+    for metric in (REQUEST_SECONDS, REQUESTS_TOTAL, REQUESTS_IN_FLIGHT, LLM_CALL_SECONDS, LLM_CALL_ERRORS, INSTANT_REPORTS):
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            print(f"Warning: metrics collector failed: {e}")
+    return "\n".join(lines) + "\n"
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that served a request, e.g. "/api/questions/{subject}".
+    """
+    # FastAPI versions that include routers lazily keep the route's own path in
+    # scope["route"] and the prefixed path in the effective route context
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and in-flight requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            # The router records the matched route in the scope on the way in
+            route = route_template(scope)
+            method = scope.get("method", "")
+            REQUEST_SECONDS.observe(elapsed, method, route)
+            REQUESTS_TOTAL.inc(method, route, str(status[0]))
+
+def analysis_cache_collector() -> List[str]:
+    """
+    Expose the analysis cache's hit/miss counters and hit ratio.
+    """
+    stats = get_analysis_cache().get_stats()
+    return [
+        "# HELP soca_analysis_cache_hits_total Analysis cache hits by tier.",
+        "# TYPE soca_analysis_cache_hits_total counter",
+        f'soca_analysis_cache_hits_total{{tier="memory"}} {stats["memory_hits"]}',
+        f'soca_analysis_cache_hits_total{{tier="disk"}} {stats["disk_hits"]}',
+        "# HELP soca_analysis_cache_misses_total Analysis cache misses.",
+        "# TYPE soca_analysis_cache_misses_total counter",
+        f"soca_analysis_cache_misses_total {stats['misses']}",
+        "# HELP soca_analysis_cache_hit_ratio Share of lookups served from the cache.",
+        "# TYPE soca_analysis_cache_hit_ratio gauge",
+        f"soca_analysis_cache_hit_ratio {stats['hit_ratio']}",
+        "# HELP soca_analysis_cache_entries Entries held in memory.",
+        "# TYPE soca_analysis_cache_entries gauge",
+        f"soca_analysis_cache_entries {stats['size']}",
+    ]
+
+def install_metrics(app, path: str = "/metrics") -> None:
+    """
+    Add the metrics middleware and a scrape endpoint to an app.
+
+    Args:
+        app (FastAPI): The application to instrument
+        path (str): Where to serve the Prometheus text format
+    """
+    # Imported here so the model layer can record LLM calls without pulling in FastAPI
+    from fastapi import Response
+
+    app.add_middleware(MetricsMiddleware)
+    register_collector(analysis_cache_collector)
+
+    @app.get(path, include_in_schema=False)
+    async def metrics():
+        return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,115 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Sequence
+
+# How long the first request of a batch waits for company, and the batch cap.
+# A window of 0 turns micro-batching off.
+BATCH_WINDOW = float(os.getenv("SOCA_LOCAL_BATCH_WINDOW_MS", "10")) / 1000
+MAX_BATCH = max(1, int(os.getenv("SOCA_LOCAL_MAX_BATCH", "8")))
+
+class MicroBatcher:
+    """
+    Collects concurrent blocking calls into batches for one worker thread.
+
+    The first call to arrive opens a batch; calls arriving within `window`
+    seconds join it until `max_batch` is reached. Calls only share a batch when
+    their group keys are equal (e.g. the same generation settings). Every
+    caller blocks until its own result is ready.
+    """
+
+    def __init__(self, run_batch: Callable[[Hashable, List[Any]], Sequence[Any]],
+                 window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH, name: str = "soca-batch"):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.stats = {"calls": 0, "batches": 0, "max_batch_seen": 0}
+
+    def submit(self, item: Any, group: Hashable = None) -> Any:
+        """
+        Run item in the next batch of its group and wait for its result.
+
+        Args:
+            item (Any): One input for run_batch
+            group (Hashable): Items are only batched with items of the same group
+
+        Returns:
+            Any: run_batch's output for this item; its exception is re-raised here
+        """
+        self._start()
+        future = Future()
+        self._queue.put((group, item, future))
+        return future.result()
+
+    def _start(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        closes_at = time.monotonic() + self.window
+        while len(pending) < self.max_batch:
+            remaining = closes_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _work(self):
+        while True:
+            groups = {}
+            for group, item, future in self._collect():
+                groups.setdefault(group, []).append((item, future))
+            for group, entries in groups.items():
+                self._run(group, entries)
+
+    def _run(self, group, entries):
+        with self._lock:
+            self.stats["calls"] += len(entries)
+            self.stats["batches"] += 1
+            self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(entries))
+        try:
+            results = self.run_batch(group, [item for item, _ in entries])
+        except Exception as e:
+            for _, future in entries:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(entries, results):
+            future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["window_ms"] = self.window * 1000
+        stats["max_batch"] = self.max_batch
+        stats["queued"] = self._queue.qsize()
+        stats["mean_batch_size"] = stats["calls"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Batch counters in the Prometheus text format.
+        """
+        stats = self.get_stats()
+        return [
+            "# HELP soca_local_batches_total Batched generate calls run by the local model.",
+            "# TYPE soca_local_batches_total counter",
+            f"soca_local_batches_total {stats['batches']}",
+            "# HELP soca_local_batched_requests_total Requests served through batched generate calls.",
+            "# TYPE soca_local_batched_requests_total counter",
+            f"soca_local_batched_requests_total {stats['calls']}",
+            "# HELP soca_local_batch_queue Requests waiting for the next batch.",
+            "# TYPE soca_local_batch_queue gauge",
+            f"soca_local_batch_queue {stats['queued']}",
+        ]
@@ -1,158 +1,604 @@
 import os
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Try to import optional dependencies
-try:
-    import google.generativeai as genai
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
-    print("Warning: google-generativeai not available")
+from context_cache import PREFIX_CACHE_TIMEOUT, PrefixCache
+from grading import subject_performance_many
+from llm_stats import LLMCall, get_llm_stats
+from metrics import observe_llm_call, register_collector
+from resilience import (
+    HEDGE_PERCENTILE, LLM_DEADLINE, LLM_RETRIES, DeadlineExceeded, backoff_delay,
+    get_resilient_caller, is_retryable,
+)
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    print("Warning: python-dotenv not available")
+# google-generativeai takes most of a cold start to import, so it is only
+# imported by load_model(), on the first analysis request
+genai = None
+GENAI_AVAILABLE = None
+
+def import_genai():
+    """
+    Imports google.generativeai on first use; returns None if it is not installed.
+    """
+    global genai, GENAI_AVAILABLE
+    if GENAI_AVAILABLE is None:
+        try:
+            import google.generativeai
+            genai = google.generativeai
+            GENAI_AVAILABLE = True
+        except ImportError:
+            GENAI_AVAILABLE = False
+            print("Warning: google-generativeai not available")
+    return genai
+
+def find_env_file():
+    """
+    Returns the nearest .env file in this directory or its parents, as load_dotenv() would find it.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+# Settings below are read at import time, so a local .env is still loaded
+# eagerly; deployments without one skip importing python-dotenv
+_env_file = find_env_file()
+if _env_file:
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(_env_file)
+    except ImportError:
+        print("Warning: python-dotenv not available")
+
+# Gemini calls are blocking, so they run on a bounded thread pool instead of
+# the event loop. SOCA_LLM_CONCURRENCY caps how many run at once per process.
+LLM_CONCURRENCY = max(1, int(os.getenv("SOCA_LLM_CONCURRENCY", "8")))
+_llm_executor = None
+
+def get_llm_executor():
+    """
+    Returns the shared thread pool used for blocking LLM calls, creating it on first use.
+    """
+    global _llm_executor
+    if _llm_executor is None:
+        _llm_executor = ThreadPoolExecutor(
+            max_workers=LLM_CONCURRENCY, thread_name_prefix="soca-llm"
+        )
+    return _llm_executor
+
+# "gemini", or "local" for the offline flan-t5 backend in local_model.py
+LLM_BACKEND = os.getenv("SOCA_LLM_BACKEND", "gemini")
+
+MISSING_KEY_MESSAGE = "Error: Google API Key not configured. Please add GOOGLE_API_KEY to .env file."
+
+# Bump whenever a prompt builder changes, so cached reports are not reused
+PROMPT_VERSION = "2"
+
+# "full" sends every answered question; "compact" sends per-subject aggregates,
+# topic tags and only the incorrect items. The local backend's input window is
+# short, so it defaults to compact.
+DEFAULT_PROMPT_VARIANT = os.getenv("SOCA_PROMPT_VARIANT", "compact" if LLM_BACKEND == "local" else "full")
+
+def prompt_cache_version(prompt_variant):
+    """
+    Version tag for cache keys; reports from different prompt variants are cached separately.
+    """
+    return f"{PROMPT_VERSION}-{prompt_variant}"
+
+# (api_key, endpoint, model) from the last load_model() call
+_loaded_model = (None, None, None)
 
 def load_model():
     """
     Configures the Gemini API.
     Returns the configured genai module (acting as the 'model' object).
+    The SDK is imported and configured on the first call and reused while
+    the key and endpoint stay the same.
+    With SOCA_LLM_BACKEND=local, loads the offline model from local_model.py instead.
     """
-    if not GENAI_AVAILABLE:
-        print("Warning: google-generativeai not available")
-        return None, None, None
-        
+    global _loaded_model
+    if LLM_BACKEND == "local":
+        # Imported here so torch stays out of Gemini deployments
+        from local_model import load_local_model
+        return load_local_model()
+
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         print("Warning: GOOGLE_API_KEY not found in environment variables.")
         return None, None, None
-    
+
+    # GEMINI_API_ENDPOINT points the client elsewhere, e.g. at the local
+    # stand-in in benchmarks/gemini_standin.py ("http://127.0.0.1:8765").
+    endpoint = os.getenv("GEMINI_API_ENDPOINT")
+    loaded_key, loaded_endpoint, model = _loaded_model
+    if model is not None and (loaded_key, loaded_endpoint) == (api_key, endpoint):
+        return model, None, None
+
+    if import_genai() is None:
+        return None, None, None
+
     # Configure with REST transport to avoid gRPC/DNS issues
-    genai.configure(api_key=api_key, transport="rest")
+    client_options = {"api_endpoint": endpoint} if endpoint else None
+    genai.configure(api_key=api_key, transport="rest", client_options=client_options)
+    use_http_pool()
     model = genai.GenerativeModel('gemini-2.0-flash')
+    _loaded_model = (api_key, endpoint, model)
     return model, None, None
 
+_http_pool = None
+
+def use_http_pool():
+    """
+    Sends the SDK's REST calls through the shared keep-alive pool in http_pool.py.
+    genai.configure() builds a new client, so this runs after every configure.
+    """
+    global _http_pool
+    # Imported here, like the SDK, to keep requests out of the cold start
+    import http_pool
+    from google.generativeai import client as genai_client
+
+    # The REST transport has no public hook for its requests.Session
+    session = genai_client.get_default_generative_client()._transport._session
+    _http_pool = http_pool.mount_pooled_adapter(session)
+    register_collector(_http_pool.metrics_lines)
+
+def get_http_pool_stats():
+    """
+    Utilisation of the Gemini HTTP pool, or None before the first analysis.
+    """
+    return _http_pool.get_stats() if _http_pool is not None else None
+
+CORE_SUBJECTS = ["Physics", "Chemistry", "Mathematics"]
+NON_CORE_SUBJECTS = ["Well-being Assessment", "Time Management"]
+
+def iter_responses(user_answers, answer_key):
+    """
+    Yields the full-prompt response text a line at a time, section by section.
+    Joining the pieces gives preprocess_responses(); they can also be written
+    straight to a file or prompt buffer as they are produced.
+    """
+    yield "Student Response Analysis:\n\n"
+
+    # Process Core Subjects
+    yield "--- ACADEMIC PERFORMANCE ---\n"
+    for subject in CORE_SUBJECTS:
+        if subject in user_answers:
+            yield f"\nSubject: {subject}\n"
+            subject_key = answer_key.get(subject, {})
+            for q_no, user_ans in user_answers[subject].items():
+                q_data = subject_key.get(q_no, {})
+                correct_ans = q_data.get("correct_answer", "Unknown")
+                status = "Correct ✅" if user_ans == correct_ans else "Incorrect ❌"
+                yield f"{q_no}. {q_data.get('question', '')}\n   Your Answer: ({user_ans}), Correct Answer: ({correct_ans}) - {status}\n"
+
+    # Process Non-Core Subjects
+    yield "\n--- WELL-BEING & TIME MANAGEMENT ---\n"
+    for subject in NON_CORE_SUBJECTS:
+        if subject in user_answers:
+            yield f"\nSection: {subject}\n"
+            subject_key = answer_key.get(subject, {})
+            for q_no, user_ans in user_answers[subject].items():
+                q_data = subject_key.get(q_no, {})
+                # For well-being, "correct_answer" is treated as the "Ideal Habit"
+                ideal_ans = q_data.get("correct_answer", "Unknown")
+                yield f"{q_no}. {q_data.get('question', '')}\n   Your Answer: ({user_ans}), Ideal Habit: ({ideal_ans})\n"
+
 def preprocess_responses(user_answers, answer_key):
     try:
-        core_subjects = ["Physics", "Chemistry", "Mathematics"]
-        non_core_subjects = ["Well-being Assessment", "Time Management"]
-        
-        formatted_responses = """Student Response Analysis:\n\n"""
-        
-        # Process Core Subjects
-        formatted_responses += "--- ACADEMIC PERFORMANCE ---\n"
-        for subject in core_subjects:
-            if subject in user_answers:
-                formatted_responses += f"\nSubject: {subject}\n"
-                questions = user_answers[subject]
-                for q_no, user_ans in questions.items():
-                    subject_key = answer_key.get(subject, {})
-                    q_data = subject_key.get(q_no, {})
-                    
-                    correct_ans = q_data.get("correct_answer", "Unknown")
-                    question_text = q_data.get("question", "")
-                    
-                    status = "Correct ✅" if user_ans == correct_ans else "Incorrect ❌"
-                    formatted_responses += f"{q_no}. {question_text}\n   Your Answer: ({user_ans}), Correct Answer: ({correct_ans}) - {status}\n"
-
-        # Process Non-Core Subjects
-        formatted_responses += "\n--- WELL-BEING & TIME MANAGEMENT ---\n"
-        for subject in non_core_subjects:
-            if subject in user_answers:
-                formatted_responses += f"\nSection: {subject}\n"
-                questions = user_answers[subject]
-                for q_no, user_ans in questions.items():
-                    subject_key = answer_key.get(subject, {})
-                    q_data = subject_key.get(q_no, {})
-                    
-                    # For well-being, "correct_answer" is treated as the "Ideal Habit"
-                    ideal_ans = q_data.get("correct_answer", "Unknown")
-                    question_text = q_data.get("question", "")
-                    
-                    formatted_responses += f"{q_no}. {question_text}\n   Your Answer: ({user_ans}), Ideal Habit: ({ideal_ans})\n"
-
-        return formatted_responses
+        return "".join(iter_responses(user_answers, answer_key))
     except Exception as e:
         print(f"Error preprocessing responses: {str(e)}")
         raise
 
-def generate_soca_analysis(model, tokenizer, device, user_text, user_answers, answer_key):
+def write_responses(user_answers, answer_key, file):
+    """
+    Writes the full-prompt response text to an open text file without building it in memory.
+    """
+    file.writelines(iter_responses(user_answers, answer_key))
+
+def abbreviate(text, limit=48):
+    """
+    Shortens question text for the compact prompt.
+    """
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+def preprocess_responses_compact(user_answers, answer_key):
+    """
+    Compact counterpart of preprocess_responses.
+    Sends per-subject scores, per-topic tallies and only the incorrect items,
+    with questions referenced by ID and abbreviated text.
+    """
+    lines = ["Responses (ID \"question\" ans=student key=correct; only incorrect items listed)"]
+
+    for subject in CORE_SUBJECTS + NON_CORE_SUBJECTS:
+        if subject not in user_answers:
+            continue
+        subject_key = answer_key.get(subject, {})
+        is_core = subject in CORE_SUBJECTS
+        correct = 0
+        topics = {}
+        misses = []
+        for q_no, user_ans in user_answers[subject].items():
+            q_data = subject_key.get(q_no, {})
+            key_ans = q_data.get("correct_answer", "?")
+            topic = q_data.get("topic") or "General"
+            tally = topics.setdefault(topic, [0, 0])
+            tally[1] += 1
+            if user_ans == key_ans:
+                correct += 1
+                tally[0] += 1
+            else:
+                label = "key" if is_core else "ideal"
+                misses.append(f"  {q_no} \"{abbreviate(q_data.get('question', ''))}\" ans={user_ans} {label}={key_ans}")
+        attempted = len(user_answers[subject])
+        topic_text = ", ".join(f"{topic} {c}/{n}" for topic, (c, n) in topics.items())
+        lines.append(f"{subject}: {correct}/{attempted} [{topic_text}]")
+        lines.extend(misses)
+
+    return "\n".join(lines) + "\n"
+
+def calculate_subject_performance(user_answers, answer_key):
+    """
+    Returns the percentage of correct answers per subject in user_answers.
+    """
+    return subject_performance_many([user_answers], answer_key)[0]
+
+# The prompt is a static, versioned prefix (role, report format and tone) and a
+# per-student suffix. The prefix is built once at import, sent first so the
+# backend can reuse it, and held in a context cache where the API supports it.
+SOCA_PROMPT_PREFIX = """You are an expert JEE exam counselor. Analyze the student responses below and provide a detailed SOCA (Strengths, Opportunities, Challenges, Action Plan) analysis.
+
+Provide a detailed analysis in the following Markdown format:
+
+# 📊 Comprehensive JEE Preparation Analysis
+
+## 1. 📚 Subject-wise Performance Distribution
+[Provide a detailed breakdown of performance in Physics, Chemistry, and Mathematics. Highlight specific weak and strong topics based on the questions answered.]
+
+## 2. 🧠 Subject-wise SOCA Analysis
+
+### ⚛️ Physics
+*   **Strengths**: ...
+*   **Opportunities**: ...
+*   **Challenges**: ...
+*   **Action Plan**: ...
+
+### 🧪 Chemistry
+*   **Strengths**: ...
+*   **Opportunities**: ...
+*   **Challenges**: ...
+*   **Action Plan**: ...
+
+### 📐 Mathematics
+*   **Strengths**: ...
+*   **Opportunities**: ...
+*   **Challenges**: ...
+*   **Action Plan**: ...
+
+## 3. 🧘 Well-being & Time Management Review
+[Analyze the student's responses to the Well-being and Time Management sections. Provide specific advice on stress management, sleep, and study scheduling based on their answers.]
+
+## 4. 📝 Final Personalized Action Plan
+1. **Immediate Focus**: [Action item]
+2. **Study Strategy**: [Action item]
+3. **Resource Usage**: [Action item]
+
+Keep the tone encouraging but realistic. Focus on actionable advice for JEE preparation.
+
+"""
+
+SOCA_PROMPT_PREFIX_COMPACT = """You are an expert JEE exam counselor. Write a SOCA (Strengths, Opportunities, Challenges, Action Plan) report in Markdown for the student below.
+Use exactly these sections: "# 📊 Comprehensive JEE Preparation Analysis"; "## 1. 📚 Subject-wise Performance Distribution" (weak and strong topics); "## 2. 🧠 Subject-wise SOCA Analysis" with "### ⚛️ Physics", "### 🧪 Chemistry", "### 📐 Mathematics", each a bullet list of **Strengths**, **Opportunities**, **Challenges**, **Action Plan**; "## 3. 🧘 Well-being & Time Management Review" (stress, sleep, scheduling); "## 4. 📝 Final Personalized Action Plan" numbered **Immediate Focus**, **Study Strategy**, **Resource Usage**.
+Be encouraging but realistic, with actionable JEE advice.
+"""
+
+def format_scores(subject_performance):
+    return ', '.join(f'{subject}: {score:.1f}%' for subject, score in subject_performance.items())
+
+def build_soca_prompt_suffix(user_text, subject_performance):
+    """
+    The per-student part of the full prompt.
+    """
+    return "Performance Summary:\n" + format_scores(subject_performance) + "\n\nDetailed Responses:\n" + user_text
+
+def build_soca_prompt_suffix_compact(user_text, subject_performance):
+    """
+    The per-student part of the compact prompt.
+    """
+    return "Scores: " + format_scores(subject_performance) + "\n" + user_text
+
+def build_soca_prompt(user_text, subject_performance):
+    """
+    Builds the Gemini prompt for a SOCA report.
+    """
+    return SOCA_PROMPT_PREFIX + build_soca_prompt_suffix(user_text, subject_performance)
+
+def build_soca_prompt_compact(user_text, subject_performance):
+    """
+    Builds a shorter Gemini prompt for the same SOCA report format.
+    """
+    return SOCA_PROMPT_PREFIX_COMPACT + build_soca_prompt_suffix_compact(user_text, subject_performance)
+
+PROMPT_VARIANTS = {
+    "full": (preprocess_responses, build_soca_prompt),
+    "compact": (preprocess_responses_compact, build_soca_prompt_compact),
+}
+
+# Static prefix and suffix builder of every prompt variant
+PROMPT_PARTS = {
+    "full": (SOCA_PROMPT_PREFIX, build_soca_prompt_suffix),
+    "compact": (SOCA_PROMPT_PREFIX_COMPACT, build_soca_prompt_suffix_compact),
+}
+
+def format_responses(user_answers, answer_key, prompt_variant="full"):
+    """
+    Formats the student's responses for the given prompt variant.
+    """
+    preprocess, _ = PROMPT_VARIANTS[prompt_variant]
+    return preprocess(user_answers, answer_key)
+
+def estimate_tokens(text):
+    """
+    Rough token count (~4 characters per token) for when the API doesn't report usage.
+    """
+    return max(1, len(text) // 4)
+
+def model_name_of(model):
+    """
+    Name to report a model under in the LLM call stats.
+    """
+    return getattr(model, "model_name", None) or type(model).__name__
+
+def record_llm_call(model, prompt_variant, prompt, response, output_text, start, first_token_at, ok):
+    """
+    Records tokens, wall time and time-to-first-token of one LLM call.
+    Token counts come from the response's usage metadata when present.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if output_tokens is None:
+        output_tokens = estimate_tokens(output_text) if output_text else 0
+    wall_time = time.perf_counter() - start
+    model_name = model_name_of(model)
+    get_llm_stats().record(LLMCall(
+        timestamp=time.time(),
+        model_name=model_name,
+        prompt_variant=prompt_variant,
+        prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens,
+        wall_time=wall_time,
+        ttft=first_token_at - start if first_token_at is not None else None,
+        ok=ok,
+    ))
+    observe_llm_call(model_name, prompt_variant, wall_time, ok)
+
+def get_llm_caller():
+    """
+    Returns the shared deadline / retry / hedging / circuit-breaker wrapper for LLM calls.
+    Attempts get their own threads, with room for one hedge per LLM worker.
+    """
+    caller = get_resilient_caller(max_workers=2 * LLM_CONCURRENCY)
+    register_collector(caller.metrics_lines)
+    return caller
+
+def is_gemini_model(model):
+    return genai is not None and isinstance(model, genai.GenerativeModel)
+
+def request_options(model, timeout):
+    """
+    Per-call SDK options: the remaining deadline as HTTP timeout, and no SDK
+    retries since get_llm_caller() retries itself. Other models get none.
+    """
+    if is_gemini_model(model):
+        return {"request_options": {"timeout": timeout, "retry": None}}
+    return {}
+
+def create_cached_prefix(key, prefix, ttl, timeout=PREFIX_CACHE_TIMEOUT):
+    """
+    Registers a static prompt prefix with Gemini's context cache.
+    Returns a GenerativeModel bound to it, which is then sent only the suffix.
+    """
+    import datetime
+    from google.generativeai import caching
+    from google.generativeai.client import get_default_cache_client
+
+    model_name, prompt_variant, version = key
+    # CachedContent.create() has no timeout or retry options; send the request it builds ourselves
+    request = caching.CachedContent._prepare_create_request(
+        model=model_name,
+        display_name=f"soca-{prompt_variant}-v{version}",
+        contents=[prefix],
+        ttl=datetime.timedelta(seconds=ttl),
+    )
+    response = get_default_cache_client().create_cached_content(request, timeout=timeout, retry=None)
+    return genai.GenerativeModel.from_cached_content(caching.CachedContent._from_obj(response))
+
+_prefix_cache = None
+
+def get_prefix_cache():
+    """
+    Returns the shared handles to cached prompt prefixes, creating them on first use.
+    """
+    global _prefix_cache
+    if _prefix_cache is None:
+        _prefix_cache = PrefixCache(create_cached_prefix, count_tokens=estimate_tokens)
+        register_collector(_prefix_cache.metrics_lines)
+    return _prefix_cache
+
+def prepare_prompt(model, user_text, subject_performance, prompt_variant):
+    """
+    Picks the model to call and the prompt to send it.
+    Gemini models whose static prefix is in the context cache get only the
+    per-student suffix; everything else gets the whole prompt.
+    Returns (model, prompt, prefix cache key or None).
+    """
+    prefix, build_suffix = PROMPT_PARTS[prompt_variant]
+    suffix = build_suffix(user_text, subject_performance)
+    # Local models swap the long format instructions for a short one of their own,
+    # so the student's scores and responses fit in their input window
+    prefix = getattr(model, "prompt_prefix", prefix)
+    if is_gemini_model(model):
+        key = (model.model_name, prompt_variant, PROMPT_VERSION)
+        cached_model = get_prefix_cache().get(key, prefix)
+        if cached_model is not None:
+            return cached_model, suffix, key
+    return model, prefix + suffix, None
+
+def drop_stale_prefix(key, error):
+    """
+    Forgets a cached prefix the API rejected (expired or deleted early), so it is registered again.
+    Returns True when the call should be resent at once.
+    """
+    if key is not None and getattr(error, "code", None) in (400, 403, 404):
+        get_prefix_cache().invalidate(key)
+        return True
+    return False
+
+def run_soca_analysis(model, user_text, subject_performance, prompt_variant="full"):
+    """
+    Generates SOCA analysis using Google Gemini API, raising on failure.
+    The call is bounded by SOCA_LLM_DEADLINE, retried on transient errors,
+    hedged when slow and rejected while the circuit breaker is open.
+    """
+    if not model:
+        raise RuntimeError(MISSING_KEY_MESSAGE)
+
+    def attempt(timeout, resend_stale=True):
+        call_model, prompt, prefix_key = prepare_prompt(model, user_text, subject_performance, prompt_variant)
+        start = time.perf_counter()
+        try:
+            response = call_model.generate_content(prompt, **request_options(call_model, timeout))
+            text = response.text
+        except Exception as e:
+            record_llm_call(model, prompt_variant, prompt, None, None, start, None, ok=False)
+            if drop_stale_prefix(prefix_key, e) and resend_stale:
+                return attempt(timeout - (time.perf_counter() - start), resend_stale=False)
+            raise
+        # Without streaming the first token arrives with the whole response
+        record_llm_call(model, prompt_variant, prompt, response, text, start, time.perf_counter(), ok=True)
+        return text
+
+    return get_llm_caller().call(
+        attempt,
+        key=(model_name_of(model), prompt_variant),
+        hedge_percentile=getattr(model, "hedge_percentile", HEDGE_PERCENTILE),
+    )
+
+def generate_soca_analysis(model, tokenizer, device, user_text, user_answers, answer_key, subject_performance=None, prompt_variant="full"):
     """
     Generates SOCA analysis using Google Gemini API.
+    subject_performance can be passed in when the sheet has already been graded.
+    user_text must come from the preprocessing step of the same prompt_variant.
+    Failures are returned as an error message; see run_soca_analysis to get the exception.
     """
     try:
         if not model:
-            return "Error: Google API Key not configured. Please add GOOGLE_API_KEY to .env file."
+            return MISSING_KEY_MESSAGE
 
-        # Calculate performance metrics
-        subject_performance = {}
-        for subject, questions in user_answers.items():
-            subject_key = answer_key.get(subject, {})
-            correct_count = 0
-            total = 0
-            
-            for q_no, ans in questions.items():
-                total += 1
-                if ans == subject_key.get(q_no, {}).get("correct_answer"):
-                    correct_count += 1
-            
-            if total > 0:
-                subject_performance[subject] = (correct_count / total) * 100
-            else:
-                subject_performance[subject] = 0
-
-        # Create prompt
-        prompt = f"""
-        You are an expert JEE exam counselor. Analyze these student responses and provide a detailed SOCA (Strengths, Opportunities, Challenges, Action Plan) analysis.
-        
-        Performance Summary:
-        {', '.join(f'{subject}: {score:.1f}%' for subject, score in subject_performance.items())}
-
-        Detailed Responses:
-        {user_text}
-
-        Provide a detailed analysis in the following Markdown format:
-        
-        # 📊 Comprehensive JEE Preparation Analysis
-
-        ## 1. 📚 Subject-wise Performance Distribution
-        [Provide a detailed breakdown of performance in Physics, Chemistry, and Mathematics. Highlight specific weak and strong topics based on the questions answered.]
-
-        ## 2. 🧠 Subject-wise SOCA Analysis
-        
-        ### ⚛️ Physics
-        *   **Strengths**: ...
-        *   **Opportunities**: ...
-        *   **Challenges**: ...
-        *   **Action Plan**: ...
-
-        ### 🧪 Chemistry
-        *   **Strengths**: ...
-        *   **Opportunities**: ...
-        *   **Challenges**: ...
-        *   **Action Plan**: ...
-
-        ### 📐 Mathematics
-        *   **Strengths**: ...
-        *   **Opportunities**: ...
-        *   **Challenges**: ...
-        *   **Action Plan**: ...
-
-        ## 3. 🧘 Well-being & Time Management Review
-        [Analyze the student's responses to the Well-being and Time Management sections. Provide specific advice on stress management, sleep, and study scheduling based on their answers.]
-
-        ## 4. 📝 Final Personalized Action Plan
-        1. **Immediate Focus**: [Action item]
-        2. **Study Strategy**: [Action item]
-        3. **Resource Usage**: [Action item]
-        
-        Keep the tone encouraging but realistic. Focus on actionable advice for JEE preparation.
-        """
-
-        response = model.generate_content(prompt)
-        return response.text
+        if subject_performance is None:
+            subject_performance = calculate_subject_performance(user_answers, answer_key)
+        return run_soca_analysis(model, user_text, subject_performance, prompt_variant)
 
     except Exception as e:
         print(f"Error generating analysis with Gemini: {str(e)}")
-        return f"Error generating analysis. Please try again. Details: {str(e)}"
\ No newline at end of file
+        return f"Error generating analysis. Please try again. Details: {str(e)}"
+
+def stream_soca_analysis(model, user_text, subject_performance, prompt_variant="full"):
+    """
+    Generates SOCA analysis with Gemini streaming enabled.
+    Yields markdown chunks as they arrive from the API.
+    Transient failures are retried until the first chunk has been yielded;
+    the stream is cut off at SOCA_LLM_DEADLINE.
+    """
+    if not model:
+        raise RuntimeError(MISSING_KEY_MESSAGE)
+
+    caller = get_llm_caller()
+    deadline = time.monotonic() + LLM_DEADLINE
+    attempt = 0
+    resend_stale = True
+    while True:
+        ticket = caller.breaker.allow()
+        call_model, prompt, prefix_key = prepare_prompt(model, user_text, subject_performance, prompt_variant)
+        start = time.perf_counter()
+        first_token_at = None
+        parts = []
+        response = None
+        try:
+            response = call_model.generate_content(prompt, stream=True, **request_options(call_model, deadline - time.monotonic()))
+            for chunk in response:
+                text = chunk.text
+                if text:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(text)
+                    yield text
+                if time.monotonic() > deadline:
+                    caller.count("deadline_exceeded")
+                    raise DeadlineExceeded(f"Report not finished within {LLM_DEADLINE:.0f}s")
+        except Exception as e:
+            caller.breaker.record(not is_retryable(e), ticket)
+            record_llm_call(model, prompt_variant, prompt, None, "".join(parts), start, first_token_at, ok=False)
+            if drop_stale_prefix(prefix_key, e) and resend_stale and not parts:
+                resend_stale = False
+                continue
+            # Chunks already sent can't be taken back, so only retry before the first one
+            if parts or attempt >= LLM_RETRIES or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                raise
+            caller.count("retries")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        caller.breaker.record(True, ticket)
+        # Usage metadata is complete once the stream has been consumed
+        record_llm_call(model, prompt_variant, prompt, response, "".join(parts), start, first_token_at, ok=True)
+        return
+
+async def run_soca_analysis_async(model, user_text, subject_performance, prompt_variant="full"):
+    """
+    Async counterpart of run_soca_analysis, run on the LLM thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_llm_executor(),
+        functools.partial(run_soca_analysis, model, user_text, subject_performance, prompt_variant),
+    )
+
+async def stream_soca_analysis_async(model, user_text, subject_performance, prompt_variant="full"):
+    """
+    Async counterpart of stream_soca_analysis.
+    The blocking stream is consumed on the LLM thread pool and its chunks are
+    handed back to the event loop through a queue.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    def produce():
+        try:
+            for text in stream_soca_analysis(model, user_text, subject_performance, prompt_variant):
+                loop.call_soon_threadsafe(queue.put_nowait, text)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    loop.run_in_executor(get_llm_executor(), produce)
+    while True:
+        item = await queue.get()
+        if item is done:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
@@ -0,0 +1,236 @@
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+import gzip
+import hashlib
+import json
+import os
+
+from fastapi import Response
+
+from question_bank import BANK_POLL, QuestionBank, VersionCache, get_bank_loader
+from questions import bank_snapshot, get_seeded_paper, paper_variant
+
+# Try to import optional dependencies
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    print("Warning: brotli not available, /api/paper will only be served with gzip")
+
+# Browsers revalidate every time; the ETag changes with the bank version, so a
+# matching one makes that a bodiless 304. The CDN may answer for one reload
+# poll interval, and with a stale copy while it revalidates, so most fetches
+# never reach the function. Without reloading the bank only changes on deploy.
+CDN_MAX_AGE = max(1, round(BANK_POLL)) if BANK_POLL > 0 else 3600
+CDN_STALE_WHILE_REVALIDATE = 60 if BANK_POLL > 0 else 86400
+CACHE_CONTROL = f"public, max-age=0, s-maxage={CDN_MAX_AGE}, stale-while-revalidate={CDN_STALE_WHILE_REVALIDATE}"
+
+# Brotli's top qualities are about 100x slower than 9 for ~20% smaller output:
+# milliseconds on the usual paper, but half a minute on a 15 MB one
+BROTLI_MAX_QUALITY_BYTES = 1 << 20
+# Compressed seeded papers kept in memory, in MB across all of them
+SEEDED_PAPER_CACHE_BYTES = int(float(os.getenv("SOCA_SEEDED_PAPER_CACHE_MB", "32")) * 2**20)
+
+class Payload(NamedTuple):
+    """Pre-serialized JSON response body and its strong ETag."""
+    body: bytes
+    etag: str
+    # Pre-compressed bodies keyed by Content-Encoding
+    encoded: Mapping[str, bytes] = MappingProxyType({})
+
+def serialize(content: Any) -> bytes:
+    """
+    Serialize a response body the same way FastAPI's JSONResponse does.
+    """
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def sanitize_questions(qs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Strip correct answers from a list of questions.
+
+    Args:
+        qs (List[Dict[str, Any]]): Questions as stored in the bank
+
+    Returns:
+        List[Dict[str, Any]]: Copies of the questions without "correct_answer"
+    """
+    return [{k: v for k, v in q.items() if k != "correct_answer"} for q in qs]
+
+def make_payload(content: Any, bank_version: str, name: str) -> Payload:
+    """
+    Serialize content and derive a strong ETag from the bank version and payload name.
+    """
+    digest = hashlib.sha256(f"{bank_version}:{name}".encode("utf-8")).hexdigest()[:16]
+    return Payload(body=serialize(content), etag=f'"{digest}"')
+
+def build_subject_payload(bank: QuestionBank, subject: str) -> Payload:
+    """
+    Build the sanitized /api/questions/{subject} response for a subject of a bank version.
+
+    Unknown subjects get an empty question list, as get_questions() does.
+    """
+    questions = sanitize_questions(bank.questions(subject)) if subject in bank.subjects() else []
+    return make_payload({"questions": questions}, bank.version, f"questions/{subject}")
+
+def compress_payload(payload: Payload, level: int = 9) -> Payload:
+    """
+    Add gzip and, when available, brotli encodings of a payload body.
+
+    Args:
+        payload (Payload): Payload to compress
+        level (int): gzip level 1-9; brotli quality scales with it
+    """
+    encoded = {"gzip": gzip.compress(payload.body, compresslevel=level, mtime=0)}
+    if BROTLI_AVAILABLE:
+        quality = min(11, level + 2)
+        if len(payload.body) > BROTLI_MAX_QUALITY_BYTES:
+            quality = min(quality, 9)
+        encoded["br"] = brotli.compress(payload.body, quality=quality)
+    return payload._replace(encoded=MappingProxyType(encoded))
+
+def build_paper_payload(bank: QuestionBank) -> Payload:
+    """
+    Build the compressed /api/paper response: every subject and its sanitized questions.
+
+    Args:
+        bank (QuestionBank): The bank version
+
+    Returns:
+        Payload: Identity body plus gzip/brotli encodings
+    """
+    subject_order = list(bank.subjects())
+    content = {
+        "subjects": subject_order,
+        "bank_version": bank.version,
+        "questions": {subject: sanitize_questions(bank.questions(subject)) for subject in subject_order},
+    }
+    return compress_payload(make_payload(content, bank.version, "paper"))
+
+def get_seeded_paper_payload(seed: int) -> Payload:
+    """
+    Get the compressed /api/paper?seed=... response for a seed, from the live bank version.
+
+    The version is leased while the paper is built, so a reload can't close it
+    mid-build or evict its cached papers before this one is stored.
+    """
+    with bank_snapshot() as bank:
+        return seeded_paper_payloads.get(bank, paper_variant(seed))
+
+def build_seeded_paper_payload(bank: QuestionBank, seed: int) -> Payload:
+    """
+    Build the compressed /api/paper?seed=... response for a bank version and paper variant.
+
+    Built on the first request for the variant and cached per version; the
+    "seed" it reports is the variant, which the client sends back with its answers.
+    """
+    paper = get_seeded_paper(seed, bank)
+    content = {
+        "seed": seed,
+        "subjects": list(paper.questions),
+        "bank_version": paper.bank_version,
+        "questions": {subject: list(qs) for subject, qs in paper.questions.items()},
+    }
+    return compress_payload(make_payload(content, bank.version, f"paper/{seed}"))
+
+def payload_size(payload: Payload) -> int:
+    return len(payload.body) + sum(len(body) for body in payload.encoded.values())
+
+# Each seeded paper holds the whole bank, so the cache is bounded by bytes as well as entries
+seeded_paper_payloads = VersionCache(
+    build_seeded_paper_payload, max_entries=256, max_size=SEEDED_PAPER_CACHE_BYTES, size=payload_size,
+)
+get_bank_loader().add_cache(seeded_paper_payloads)
+
+def get_paper_payload() -> Payload:
+    """
+    Get the compressed /api/paper response of the live bank version.
+
+    Built on first request and kept for as long as the version is loaded.
+    """
+    with bank_snapshot() as bank:
+        return bank.derive("paper", build_paper_payload)
+
+def get_subject_payload(subject: str) -> Payload:
+    """
+    Get the serialized question list for a subject of the live bank version.
+
+    Built on first request for the subject and kept for as long as the version is loaded.
+    """
+    with bank_snapshot() as bank:
+        if subject not in bank.subjects():
+            subject = ""
+        return bank.derive(f"questions/{subject}", lambda bank: build_subject_payload(bank, subject))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Args:
+        if_none_match (Optional[str]): Raw header value, possibly a list or "*"
+        etag (str): Quoted strong ETag of the current payload
+
+    Returns:
+        bool: True if the client's cached copy is still current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def choose_encoding(accept_encoding: Optional[str], available: Mapping[str, bytes]) -> Optional[str]:
+    """
+    Pick the best pre-computed encoding the client accepts.
+
+    Args:
+        accept_encoding (Optional[str]): Raw Accept-Encoding header
+        available (Mapping[str, bytes]): Encoded bodies keyed by encoding name
+
+    Returns:
+        Optional[str]: "br" or "gzip", or None to send the identity body
+    """
+    if not accept_encoding or not available:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in available and q > 0:
+            return encoding
+    return None
+
+def payload_response(payload: Payload, if_none_match: Optional[str], accept_encoding: Optional[str] = None) -> Response:
+    """
+    Serve a pre-serialized payload, answering a matching If-None-Match with 304.
+
+    Compressed payloads are sent in the best encoding the client accepts. Each
+    encoding gets its own strong ETag, since the bytes differ.
+    """
+    encoding = choose_encoding(accept_encoding, payload.encoded)
+    etag = payload.etag if encoding is None else f'{payload.etag[:-1]}-{encoding}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if payload.encoded:
+        headers["Vary"] = "Accept-Encoding"
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=payload.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=payload.encoded[encoding], media_type="application/json", headers=headers)
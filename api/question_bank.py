@@ -0,0 +1,680 @@
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The bank's source: one JSON question per line, in bank order, with "subject",
+# "id", "topic", optional "difficulty", "question", "options" and "correct_answer".
+# A directory is read as all of its *.jsonl files in name order.
+BANK_SOURCE = os.getenv("SOCA_QUESTION_BANK", os.path.join(API_DIR, "data", "questions.jsonl"))
+# Seconds between checks of the source for changes, which are then loaded in
+# the background and swapped in; 0 disables reloading
+BANK_POLL = float(os.getenv("SOCA_QUESTION_BANK_POLL", "5"))
+# Where the indexed SQLite copy of each bank version is built; any writable
+# directory works, and processes sharing it build each version only once
+BANK_DB_DIR = os.getenv("SOCA_QUESTION_DB_DIR", tempfile.gettempdir())
+# Answer-key entries kept decoded in memory, per bank version
+HOT_ITEMS = int(os.getenv("SOCA_QUESTION_CACHE_SIZE", "1024"))
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE subjects (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    question_count INTEGER NOT NULL
+);
+CREATE TABLE questions (
+    subject TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    topic TEXT,
+    difficulty TEXT,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    PRIMARY KEY (subject, position)
+) WITHOUT ROWID;
+"""
+
+# Built after the rows are loaded, which is faster than maintaining them row by row
+INDEXES = """
+CREATE UNIQUE INDEX questions_id ON questions (id);
+CREATE INDEX questions_topic ON questions (subject, topic, difficulty, position);
+CREATE INDEX questions_difficulty ON questions (subject, difficulty, position);
+"""
+
+QUESTION_COLUMNS = "id, topic, difficulty, question, options, correct_answer"
+
+def source_files(path: str) -> List[str]:
+    """
+    The JSON-lines files of a source: the file itself, or a directory's *.jsonl files in name order.
+    """
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".jsonl")]
+    return [path]
+
+def source_signature(path: str) -> Tuple:
+    """
+    Cheap change marker of a source: name, size and mtime of each of its files.
+    """
+    signature = []
+    for file in source_files(path):
+        stat = os.stat(file)
+        signature.append((file, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+def source_version(path: str) -> str:
+    """
+    Compute a content hash of a bank source without loading it.
+
+    Args:
+        path (str): Path of the JSON-lines source file or directory
+
+    Returns:
+        str: Short hex digest that changes whenever the source changes
+    """
+    digest = hashlib.sha256()
+    for file in source_files(path):
+        digest.update(os.path.basename(file).encode("utf-8") + b"\0")
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+def read_source(path: str, digest=None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream questions from a JSON-lines source, skipping blank lines.
+
+    Args:
+        path (str): Path of the JSON-lines source file or directory
+        digest: Optional hashlib object fed the bytes as read, as source_version() hashes them
+    """
+    for file in source_files(path):
+        if digest is not None:
+            digest.update(os.path.basename(file).encode("utf-8") + b"\0")
+        with open(file, "rb") as f:
+            for line_no, raw in enumerate(f, 1):
+                if digest is not None:
+                    digest.update(raw)
+                line = raw.decode("utf-8")
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{file}:{line_no}: invalid question: {e}") from e
+
+def bank_db_path(db_dir: str, version: str) -> str:
+    return os.path.join(db_dir, f"soca-questions-{version}.sqlite3")
+
+def build_bank_db(source: str, db_dir: str) -> str:
+    """
+    Build the indexed SQLite copy of a bank source.
+
+    Rows are streamed in, so building needs memory for one batch rather than
+    the whole bank. The database is named after the content hash of the bytes
+    actually read, so a source edited mid-build can't be stored under the
+    wrong version. It is written under a temporary name and moved into place,
+    so readers only ever see a complete database.
+
+    Args:
+        source (str): Path of the JSON-lines source file or directory
+        db_dir (str): Directory holding the built databases
+
+    Returns:
+        str: Path of the database
+    """
+    tmp_path = os.path.join(db_dir, f"soca-questions.{os.getpid()}.{threading.get_ident()}.tmp")
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA)
+        subjects = {}
+        batch = []
+        digest = hashlib.sha256()
+        for q in read_source(source, digest):
+            subject = q["subject"]
+            position = subjects.setdefault(subject, 0)
+            subjects[subject] = position + 1
+            batch.append((
+                subject, position, q["id"], q.get("topic"), q.get("difficulty"), q["question"],
+                json.dumps(q["options"], ensure_ascii=False), q["correct_answer"],
+            ))
+            if len(batch) >= 1000:
+                conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        # Subjects are listed in order of first appearance in the source
+        conn.executemany(
+            "INSERT INTO subjects VALUES (?, ?, ?)",
+            [(subject, i, count) for i, (subject, count) in enumerate(subjects.items())],
+        )
+        version = digest.hexdigest()[:16]
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        conn.executescript(INDEXES)
+        conn.commit()
+        conn.close()
+        db_path = bank_db_path(db_dir, version)
+        os.replace(tmp_path, db_path)
+        return db_path
+    except BaseException:
+        conn.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def question_from_row(row: Tuple) -> Dict[str, Any]:
+    """
+    Decode a questions row into the bank's question dict.
+
+    Keys are in the source's order; "difficulty" is only present when set.
+    """
+    q_id, topic, difficulty, text, options, correct_answer = row
+    question = {"id": q_id}
+    if topic is not None:
+        question["topic"] = topic
+    if difficulty is not None:
+        question["difficulty"] = difficulty
+    question["question"] = text
+    question["options"] = json.loads(options)
+    question["correct_answer"] = correct_answer
+    return question
+
+def key_entry(question: Dict[str, Any]) -> Mapping[str, Any]:
+    """
+    Build the read-only answer key entry of a question.
+    """
+    return MappingProxyType({
+        "correct_answer": question["correct_answer"],
+        "question": question["question"],
+        "topic": question.get("topic", ""),
+        "options": MappingProxyType(question["options"]),
+    })
+
+def positional_index(q_id: str) -> Optional[int]:
+    """
+    Bank position of a legacy positional key ("Q1" is 0), or None for other IDs.
+    """
+    if q_id[:1] == "Q" and q_id[1:].isdigit():
+        return int(q_id[1:]) - 1
+    return None
+
+class SubjectKey(Mapping):
+    """
+    Read-only answer_key[subject] backed by the bank database.
+
+    Looks like the old in-memory dict: every question is reachable by its
+    stable ID and by its legacy positional key ("Q1", "Q2", ... in bank
+    order). Lookups go through the bank's hot-item cache; iterating reads the
+    subject in bank order.
+    """
+
+    def __init__(self, bank: "QuestionBank", subject: str):
+        self.bank = bank
+        self.subject = subject
+
+    def __getitem__(self, q_id: str) -> Mapping[str, Any]:
+        entry = self.bank.key_entry(self.subject, q_id)
+        if entry is None:
+            raise KeyError(q_id)
+        return entry
+
+    def __iter__(self) -> Iterator[str]:
+        for q_id, _ in self.items():
+            yield q_id
+
+    def __len__(self) -> int:
+        # Each question is listed under its ID and its positional key
+        return 2 * self.bank.count(self.subject)
+
+    def items(self):
+        # The positional key of each question comes right before its stable ID
+        for i, question in enumerate(self.bank.iter_questions(self.subject)):
+            entry = key_entry(question)
+            yield f"Q{i+1}", entry
+            yield question["id"], entry
+
+class AnswerKey(Mapping):
+    """
+    Read-only answer_key[subject][question_id] for a whole bank.
+    """
+
+    def __init__(self, bank: "QuestionBank"):
+        self.bank = bank
+        self._subjects = {}
+
+    def __getitem__(self, subject: str) -> SubjectKey:
+        key = self._subjects.get(subject)
+        if key is None:
+            if subject not in self.bank.subjects():
+                raise KeyError(subject)
+            key = self._subjects.setdefault(subject, SubjectKey(self.bank, subject))
+        return key
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.bank.subjects())
+
+    def __len__(self) -> int:
+        return len(self.bank.subjects())
+
+    @property
+    def compiled_key(self):
+        """
+        The grading.CompiledKey of this version, compiled on first use.
+        """
+        from grading import compile_answer_key
+
+        return self.bank.derive("compiled_key", lambda bank: compile_answer_key(bank.answer_key))
+
+class QuestionBank:
+    """
+    One immutable version of the question bank, read from its SQLite database.
+
+    The database is opened read-only and never changes, so every thread gets
+    its own connection with no locking. Answer-key entries looked up one at a
+    time are kept in an LRU cache of SOCA_QUESTION_CACHE_SIZE items;
+    whole-subject reads stream from the database and are not cached. Data
+    derived from the bank (the compiled grading key, serialized payloads) is
+    built on first use by derive() and lives as long as the version does.
+    """
+
+    def __init__(self, db_path: str, hot_items: int = HOT_ITEMS):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Bumped by close(), so threads holding a closed connection open a new one
+        self._generation = 0
+        self.derived = {}
+        self._derive_lock = threading.Lock()
+        self._derive_locks = {}
+        self.version = self._query("SELECT value FROM meta WHERE key = 'version'")[0][0]
+        self._subjects = tuple(row[0] for row in self._query("SELECT name FROM subjects ORDER BY position"))
+        self._counts = dict(self._query("SELECT name, question_count FROM subjects"))
+        self.answer_key = AnswerKey(self)
+        self.key_entry = functools.lru_cache(maxsize=hot_items)(self._key_entry)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            uri = f"file:{self.db_path}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.conn, self._local.generation = conn, self._generation
+        return conn
+
+    def derive(self, name: str, build: Callable[["QuestionBank"], Any]) -> Any:
+        """
+        Get data derived from this version, building it on first use.
+
+        Each name is built once, even when concurrent requests ask for it at
+        the same time; different names build independently.
+
+        Args:
+            name (str): Key in `derived`
+            build (Callable[[QuestionBank], Any]): Builds the value from the bank
+        """
+        value = self.derived.get(name)
+        if value is None:
+            with self._derive_lock:
+                lock = self._derive_locks.setdefault(name, threading.Lock())
+            with lock:
+                value = self.derived.get(name)
+                if value is None:
+                    value = self.derived[name] = build(self)
+        return value
+
+    def close(self) -> None:
+        """
+        Release the connections and hot-item cache of a version no longer in use.
+        """
+        with self._connections_lock:
+            self._generation += 1
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self.key_entry.cache_clear()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def subjects(self) -> Tuple[str, ...]:
+        """
+        Subject names in bank order.
+        """
+        return self._subjects
+
+    def count(self, subject: str, topic: Optional[str] = None, difficulty: Optional[str] = None) -> int:
+        """
+        Number of questions in a subject, optionally of one topic and/or difficulty.
+        """
+        if topic is None and difficulty is None:
+            return self._counts.get(subject, 0)
+        where, params = self._filter(subject, topic, difficulty)
+        return self._query(f"SELECT COUNT(*) FROM questions WHERE {where}", params)[0][0]
+
+    def _filter(self, subject, topic, difficulty):
+        clauses = ["subject = ?"]
+        params = [subject]
+        if topic is not None:
+            clauses.append("topic = ?")
+            params.append(topic)
+        if difficulty is not None:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+        return " AND ".join(clauses), tuple(params)
+
+    def iter_questions(self, subject: str, topic: Optional[str] = None,
+                       difficulty: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a subject's questions in bank order, optionally filtered by topic and difficulty.
+        """
+        where, params = self._filter(subject, topic, difficulty)
+        cursor = self._connection().execute(
+            f"SELECT {QUESTION_COLUMNS} FROM questions WHERE {where} ORDER BY position", params
+        )
+        for row in cursor:
+            yield question_from_row(row)
+
+    def questions(self, subject: str, topic: Optional[str] = None,
+                  difficulty: Optional[str] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_questions(subject, topic, difficulty))
+
+    def _key_entry(self, subject: str, q_id: str) -> Optional[Mapping[str, Any]]:
+        position = positional_index(q_id)
+        if position is not None:
+            sql, params = "subject = ? AND position = ?", (subject, position)
+        else:
+            sql, params = "subject = ? AND id = ?", (subject, q_id)
+        rows = self._query(f"SELECT {QUESTION_COLUMNS} FROM questions WHERE {sql}", params)
+        return key_entry(question_from_row(rows[0])) if rows else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = self.key_entry.cache_info()
+        return {
+            "version": self.version,
+            "questions": sum(self._counts.values()),
+            "hot_items": entries.currsize,
+            "hot_hits": entries.hits,
+            "hot_misses": entries.misses,
+        }
+
+def open_bank(source: str = BANK_SOURCE, db_dir: str = BANK_DB_DIR) -> QuestionBank:
+    """
+    Open the bank built from a source, building its database if needed.
+
+    Databases are named after the source's content hash, so an edited source
+    gets a new database and an unchanged one is reused across processes.
+
+    Args:
+        source (str): Path of the JSON-lines source file or directory
+        db_dir (str): Directory holding the built databases
+
+    Returns:
+        QuestionBank: The bank for the source's current content
+    """
+    db_path = bank_db_path(db_dir, source_version(source))
+    if not os.path.exists(db_path):
+        db_path = build_bank_db(source, db_dir)
+    return QuestionBank(db_path)
+
+class VersionCache:
+    """
+    Bounded LRU of values built from one bank version and a key.
+
+    Entries are keyed by the version string rather than the QuestionBank, so a
+    replaced version is never kept alive by its cached values; BankLoader
+    evicts a version's entries when it closes that version. With `size`, the
+    cache is also bounded by the total size of its values.
+    """
+
+    def __init__(self, build: Callable[[QuestionBank, Hashable], Any], max_entries: int = 256,
+                 max_size: Optional[int] = None, size: Optional[Callable[[Any], int]] = None):
+        self.build = build
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = size
+        self._entries = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    def get(self, bank: QuestionBank, key: Hashable) -> Any:
+        """
+        Get the value for a key of a bank version, building it on a miss.
+        """
+        cache_key = (bank.version, key)
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                return self._entries[cache_key][0]
+        # Built outside the lock; a concurrent miss builds the same value twice
+        value = self.build(bank, key)
+        size = self.size(value) if self.size is not None else 0
+        with self._lock:
+            if cache_key in self._entries:
+                self._total_size -= self._entries[cache_key][1]
+            self._entries[cache_key] = (value, size)
+            self._total_size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_size is not None and self._total_size > self.max_size)
+            ):
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._total_size -= dropped
+        return value
+
+    def evict(self, version: str) -> None:
+        """
+        Drop every entry of a bank version.
+        """
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == version]:
+                self._total_size -= self._entries.pop(cache_key)[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_size = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "size": self._total_size}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class BankLoader:
+    """
+    Serves the current version of the question bank and reloads it when its source changes.
+
+    A new version's database is built in a background thread, then swapped in
+    atomically; requests never see a partly built bank. Code that grades against the bank holds a lease on one
+    version through snapshot(), so answer key, bank version and derived data
+    stay consistent for the whole request even if a reload lands meanwhile.
+    A replaced version is kept until its last lease is released, then closed.
+    """
+
+    def __init__(self, source: str = BANK_SOURCE, db_dir: str = BANK_DB_DIR, poll: float = BANK_POLL):
+        self.source = source
+        self.db_dir = db_dir
+        self.poll = poll
+        self._current = None
+        self._signature = None
+        # Leases per loaded version; replaced versions are retired until their count reaches 0
+        self._leases = {}
+        self._retired = set()
+        self._caches = []
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self.stats = {"reloads": 0, "failures": 0}
+
+    def add_cache(self, cache: VersionCache) -> None:
+        """
+        Register a cache whose entries for a version are evicted when that version is closed.
+        """
+        with self._lock:
+            if cache not in self._caches:
+                self._caches.append(cache)
+
+    def _close(self, bank: QuestionBank) -> None:
+        bank.close()
+        for cache in list(self._caches):
+            cache.evict(bank.version)
+
+    def current(self) -> QuestionBank:
+        """
+        The live version, loaded on first use, which also starts the watcher.
+        """
+        bank = self._current
+        if bank is None:
+            with self._load_lock:
+                if self._current is None:
+                    self._signature = source_signature(self.source)
+                    bank = open_bank(self.source, self.db_dir)
+                    with self._lock:
+                        self._current = bank
+                    self._start_watcher()
+                bank = self._current
+        return bank
+
+    def acquire(self, version: Optional[str] = None) -> QuestionBank:
+        """
+        Lease a version: the one asked for while it is still loaded, else the live one.
+        Every acquire() must be paired with a release().
+        """
+        self.current()
+        with self._lock:
+            bank = self._current
+            if version is not None and version != bank.version:
+                bank = next((old for old in self._retired if old.version == version), bank)
+            self._leases[bank] = self._leases.get(bank, 0) + 1
+        return bank
+
+    def release(self, bank: QuestionBank) -> None:
+        with self._lock:
+            count = self._leases[bank] - 1
+            if count:
+                self._leases[bank] = count
+                return
+            del self._leases[bank]
+            if bank not in self._retired:
+                return
+            self._retired.remove(bank)
+        self._close(bank)
+
+    @contextlib.contextmanager
+    def snapshot(self, version: Optional[str] = None) -> Iterator[QuestionBank]:
+        """
+        Hold one version of the bank for the duration of a with block.
+        """
+        bank = self.acquire(version)
+        try:
+            yield bank
+        finally:
+            self.release(bank)
+
+    def reload(self) -> bool:
+        """
+        Load the source if it changed and swap it in.
+
+        Returns:
+            bool: True when a new version went live
+        """
+        with self._load_lock:
+            signature = source_signature(self.source)
+            if signature == self._signature:
+                return False
+            version = source_version(self.source)
+            if self._current is not None and version == self._current.version:
+                self._signature = signature
+                return False
+            # A source that fails to load is not retried until it changes again
+            self._signature = signature
+            bank = open_bank(self.source, self.db_dir)
+            with self._lock:
+                old, self._current = self._current, bank
+                self.stats["reloads"] += 1
+                in_use = old in self._leases
+                if in_use:
+                    self._retired.add(old)
+            print(f"Question bank reloaded: {old.version if old else None} -> {bank.version}")
+        if old is not None and not in_use:
+            self._close(old)
+        return True
+
+    def _start_watcher(self) -> None:
+        if self.poll <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, name="soca-bank-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.poll)
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the current version; the next change is tried again
+                self.stats["failures"] += 1
+                print(f"Warning: question bank reload failed, keeping {self._current.version}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            current = self._current
+            stats = dict(self.stats)
+            stats["in_flight"] = {bank.version: count for bank, count in self._leases.items()}
+            stats["retired"] = sorted(bank.version for bank in self._retired)
+        stats["version"] = current.version if current is not None else None
+        return stats
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Bank reload counters and leases in the Prometheus text format.
+        """
+        stats = self.get_stats()
+        lines = [
+            "# HELP soca_question_bank_reloads_total New question bank versions swapped in.",
+            "# TYPE soca_question_bank_reloads_total counter",
+            f"soca_question_bank_reloads_total {stats['reloads']}",
+            "# HELP soca_question_bank_reload_failures_total Question bank reloads that failed.",
+            "# TYPE soca_question_bank_reload_failures_total counter",
+            f"soca_question_bank_reload_failures_total {stats['failures']}",
+            "# HELP soca_question_bank_in_flight Requests holding each question bank version.",
+            "# TYPE soca_question_bank_in_flight gauge",
+        ]
+        lines += [f'soca_question_bank_in_flight{{version="{version}"}} {count}' for version, count in stats["in_flight"].items()]
+        return lines
+
+_loader = None
+_loader_lock = threading.Lock()
+
+def get_bank_loader() -> BankLoader:
+    """
+    Get the shared bank loader, configured from the environment.
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                from metrics import register_collector
+
+                _loader = BankLoader()
+                register_collector(_loader.metrics_lines)
+    return _loader
+
+def get_question_bank() -> QuestionBank:
+    """
+    Get the live version of the question bank, opening it on first use.
+    """
+    return get_bank_loader().current()
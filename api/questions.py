@@ -1,437 +1,49 @@
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import ContextManager, Dict, List, Any, Mapping, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import os
 import random
 
-# Define the order of subjects
-SUBJECT_ORDER = ["Physics", "Chemistry", "Mathematics", "Well-being Assessment", "Time Management"]
+from question_bank import QuestionBank, get_bank_loader, get_question_bank, positional_index
 
-# Sample questions for each subject
-QUESTIONS = {
-    "Physics": [
-        {
-            "question": "A particle moves in a circular path of radius r with uniform speed v. The magnitude of its acceleration is:",
-            "options": {
-                "a": "v/r",
-                "b": "v²/r",
-                "c": "v/r²",
-                "d": "v²/r²"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The SI unit of electric current is:",
-            "options": {
-                "a": "Volt",
-                "b": "Watt",
-                "c": "Ampere",
-                "d": "Ohm"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "A body of mass 2 kg is moving with a velocity of 3 m/s. Its kinetic energy is:",
-            "options": {
-                "a": "6 J",
-                "b": "9 J",
-                "c": "12 J",
-                "d": "18 J"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The refractive index of a medium is 1.5. The speed of light in this medium is:",
-            "options": {
-                "a": "2 × 10⁸ m/s",
-                "b": "1.5 × 10⁸ m/s",
-                "c": "1 × 10⁸ m/s",
-                "d": "0.5 × 10⁸ m/s"
-            },
-            "correct_answer": "a"
-        },
-        {
-            "question": "A spring of force constant k is cut into two equal parts. The force constant of each part is:",
-            "options": {
-                "a": "k/2",
-                "b": "k",
-                "c": "2k",
-                "d": "4k"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "The work done in moving a charge of 2C through a potential difference of 5V is:",
-            "options": {
-                "a": "2.5 J",
-                "b": "5 J",
-                "c": "10 J",
-                "d": "20 J"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "The time period of a simple pendulum depends on:",
-            "options": {
-                "a": "Mass of the bob",
-                "b": "Length of the string",
-                "c": "Amplitude of oscillation",
-                "d": "All of these"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "A body is moving with uniform acceleration. Its velocity after 5 seconds is 25 m/s and after 8 seconds is 34 m/s. The acceleration is:",
-            "options": {
-                "a": "2 m/s²",
-                "b": "3 m/s²",
-                "c": "4 m/s²",
-                "d": "5 m/s²"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The ratio of specific heats (γ) for a monatomic gas is:",
-            "options": {
-                "a": "1.33",
-                "b": "1.40",
-                "c": "1.67",
-                "d": "1.80"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "A ray of light is incident at an angle of 45° on a glass slab. The refractive index of glass is 1.5. The angle of refraction is:",
-            "options": {
-                "a": "30°",
-                "b": "45°",
-                "c": "60°",
-                "d": "90°"
-            },
-            "correct_answer": "a"
-        }
-    ],
-    "Chemistry": [
-        {
-            "question": "Which of the following is a noble gas?",
-            "options": {
-                "a": "Nitrogen",
-                "b": "Helium",
-                "c": "Chlorine",
-                "d": "Oxygen"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The atomic number of Carbon is:",
-            "options": {
-                "a": "4",
-                "b": "6",
-                "c": "8",
-                "d": "10"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "Which of the following is a strong acid?",
-            "options": {
-                "a": "Acetic acid",
-                "b": "Hydrochloric acid",
-                "c": "Carbonic acid",
-                "d": "Citric acid"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The molecular formula of glucose is:",
-            "options": {
-                "a": "C₆H₁₂O₅",
-                "b": "C₆H₁₂O₆",
-                "c": "C₅H₁₀O₅",
-                "d": "C₅H₁₀O₆"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "Which of the following is an example of a redox reaction?",
-            "options": {
-                "a": "NaCl + AgNO₃ → AgCl + NaNO₃",
-                "b": "2H₂ + O₂ → 2H₂O",
-                "c": "HCl + NaOH → NaCl + H₂O",
-                "d": "CaCO₃ → CaO + CO₂"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The pH of a neutral solution at 25°C is:",
-            "options": {
-                "a": "0",
-                "b": "7",
-                "c": "14",
-                "d": "1"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "Which of the following is a greenhouse gas?",
-            "options": {
-                "a": "N₂",
-                "b": "O₂",
-                "c": "CO₂",
-                "d": "H₂"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "The process of conversion of solid directly to gas is called:",
-            "options": {
-                "a": "Sublimation",
-                "b": "Evaporation",
-                "c": "Condensation",
-                "d": "Melting"
-            },
-            "correct_answer": "a"
-        },
-        {
-            "question": "Which of the following is a strong base?",
-            "options": {
-                "a": "NH₃",
-                "b": "NaOH",
-                "c": "CH₃COOH",
-                "d": "H₂O"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The number of electrons in the outermost shell of an atom is called:",
-            "options": {
-                "a": "Atomic number",
-                "b": "Mass number",
-                "c": "Valency",
-                "d": "Atomic mass"
-            },
-            "correct_answer": "c"
-        }
-    ],
-    "Mathematics": [
-        {
-            "question": "If sin θ + cos θ = 1, then the value of sin θ cos θ is:",
-            "options": {
-                "a": "0",
-                "b": "1/2",
-                "c": "1",
-                "d": "2"
-            },
-            "correct_answer": "a"
-        },
-        {
-            "question": "The derivative of x² with respect to x is:",
-            "options": {
-                "a": "x",
-                "b": "2x",
-                "c": "x²",
-                "d": "2x²"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The value of ∫(2x + 3)dx from 0 to 2 is:",
-            "options": {
-                "a": "4",
-                "b": "6",
-                "c": "8",
-                "d": "10"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "If A is a 2×2 matrix with determinant 3, then det(2A) is:",
-            "options": {
-                "a": "3",
-                "b": "6",
-                "c": "9",
-                "d": "12"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "The number of terms in the expansion of (a + b)⁴ is:",
-            "options": {
-                "a": "3",
-                "b": "4",
-                "c": "5",
-                "d": "6"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "The equation of the circle with center (2,3) and radius 4 is:",
-            "options": {
-                "a": "(x-2)² + (y-3)² = 4",
-                "b": "(x-2)² + (y-3)² = 16",
-                "c": "(x+2)² + (y+3)² = 4",
-                "d": "(x+2)² + (y+3)² = 16"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The probability of getting a head when tossing a fair coin is:",
-            "options": {
-                "a": "0.25",
-                "b": "0.5",
-                "c": "0.75",
-                "d": "1"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The value of lim(x→0) sin(x)/x is:",
-            "options": {
-                "a": "0",
-                "b": "1",
-                "c": "∞",
-                "d": "Does not exist"
-            },
-            "correct_answer": "b"
-        },
-        {
-            "question": "The number of ways to arrange 5 different books on a shelf is:",
-            "options": {
-                "a": "5",
-                "b": "25",
-                "c": "120",
-                "d": "625"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "The solution of the equation 2x + 3 = 7 is:",
-            "options": {
-                "a": "x = 1",
-                "b": "x = 2",
-                "c": "x = 3",
-                "d": "x = 4"
-            },
-            "correct_answer": "b"
-        }
-    ],
-    "Well-being Assessment": [
-        {
-            "question": "How would you rate your current stress level?",
-            "options": {
-                "a": "Very High",
-                "b": "High",
-                "c": "Moderate",
-                "d": "Low"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How many hours of sleep do you get on average?",
-            "options": {
-                "a": "Less than 4 hours",
-                "b": "4-6 hours",
-                "c": "6-8 hours",
-                "d": "More than 8 hours"
-            },
-            "correct_answer": "c"
-        },
-        {
-            "question": "How often do you exercise?",
-            "options": {
-                "a": "Never",
-                "b": "1-2 times per week",
-                "c": "3-4 times per week",
-                "d": "Daily"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How do you typically handle academic pressure?",
-            "options": {
-                "a": "Avoid thinking about it",
-                "b": "Get anxious and stressed",
-                "c": "Talk to friends/family",
-                "d": "Use structured coping strategies"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How confident are you in your ability to achieve your JEE goals?",
-            "options": {
-                "a": "Not confident at all",
-                "b": "Slightly confident",
-                "c": "Moderately confident",
-                "d": "Very confident"
-            },
-            "correct_answer": "d"
-        }
-    ],
-    "Time Management": [
-        {
-            "question": "How do you typically plan your study schedule?",
-            "options": {
-                "a": "No planning",
-                "b": "Basic daily list",
-                "c": "Weekly schedule",
-                "d": "Detailed monthly planner"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How do you handle study breaks?",
-            "options": {
-                "a": "No breaks",
-                "b": "Random breaks",
-                "c": "Fixed time breaks",
-                "d": "Pomodoro technique"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How do you prioritize your study topics?",
-            "options": {
-                "a": "No prioritization",
-                "b": "Based on difficulty",
-                "c": "Based on exam weightage",
-                "d": "Based on both difficulty and weightage"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How do you handle unexpected disruptions in your study schedule?",
-            "options": {
-                "a": "Get frustrated and give up",
-                "b": "Skip the disrupted topic",
-                "c": "Try to make up time later",
-                "d": "Have a flexible backup plan"
-            },
-            "correct_answer": "d"
-        },
-        {
-            "question": "How do you review and adjust your study plan?",
-            "options": {
-                "a": "Never review",
-                "b": "Only when problems occur",
-                "c": "Weekly review",
-                "d": "Daily review and adjustment"
-            },
-            "correct_answer": "d"
-        }
-    ]
-}
+# Seeded papers come in this many variants; any seed picks one, so every
+# variant is built and compressed once per bank version and then served from cache
+PAPER_VARIANTS = max(1, int(os.getenv("SOCA_PAPER_VARIANTS", "16")))
 
-def get_questions(subject: str, shuffle: bool = True) -> List[Dict[str, Any]]:
+def bank_snapshot(version: Optional[str] = None) -> ContextManager[QuestionBank]:
+    """
+    Hold one version of the question bank for a block of code.
+    
+    Grade a submission inside one snapshot so its answer key, bank version and
+    seeded paper agree even if a new version of the bank is swapped in
+    meanwhile; the version stays loaded until the block exits.
+    
+    Args:
+        version (Optional[str]): A version to hold if it is still loaded; defaults to the live one
+        
+    Returns:
+        ContextManager[QuestionBank]: Yields the bank version
+    """
+    return get_bank_loader().snapshot(version)
+
+def get_questions(subject: str, shuffle: bool = True, topic: Optional[str] = None,
+                  difficulty: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Retrieve questions for a specific subject.
     
     Args:
         subject (str): The subject name
         shuffle (bool): Whether to shuffle the questions. Defaults to True.
+        topic (Optional[str]): Only questions on this topic
+        difficulty (Optional[str]): Only questions of this difficulty
         
     Returns:
         List[Dict[str, Any]]: List of questions with their options and correct answers
     """
-    questions = QUESTIONS.get(subject, [])
-    # Create a copy of the questions list to avoid modifying the original
-    result_questions = questions.copy()
+    # A fresh list of fresh dicts, read through the (subject, topic, difficulty) indexes
+    with bank_snapshot() as bank:
+        result_questions = bank.questions(subject, topic, difficulty)
     
     if shuffle:
         random.shuffle(result_questions)
@@ -443,18 +55,222 @@ def get_all_subjects() -> List[str]:
     Get a list of all available subjects in the specified order.
     
     Returns:
-        List[str]: List of subject names in the order: Physics, Chemistry, Mathematics, Well-being, Time Management
+        List[str]: List of subject names in bank order: Physics, Chemistry, Mathematics, Well-being, Time Management
     """
-    return SUBJECT_ORDER
+    return list(get_question_bank().subjects())
 
-def get_question_count(subject: str) -> int:
+def get_question_count(subject: str, topic: Optional[str] = None, difficulty: Optional[str] = None) -> int:
     """
     Get the number of questions available for a subject.
     
     Args:
         subject (str): The subject name
+        topic (Optional[str]): Only count questions on this topic
+        difficulty (Optional[str]): Only count questions of this difficulty
         
     Returns:
         int: Number of questions available
     """
-    return len(QUESTIONS.get(subject, [])) 
\ No newline at end of file
+    with bank_snapshot() as bank:
+        return bank.count(subject, topic, difficulty)
+
+def get_all_questions() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the whole bank in bank order.
+    
+    This reads every question into memory; it is meant for tools and
+    benchmarks, not the request path.
+    
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Questions keyed by subject
+    """
+    with bank_snapshot() as bank:
+        return {subject: bank.questions(subject) for subject in bank.subjects()}
+
+def get_answer_key() -> Mapping[str, Mapping[str, Mapping[str, str]]]:
+    """
+    Get the answer key of the question bank.
+    
+    Entries are read from the bank's database on first use and kept in its
+    hot-item cache, so the key costs no memory for questions never graded.
+    This is the live version's key; to grade, use bank_snapshot().answer_key.
+    
+    Returns:
+        Mapping: Read-only answer_key[subject][question_id] = {"correct_answer": ..., "question": ...}
+    """
+    return get_question_bank().answer_key
+
+def get_bank_version() -> str:
+    """
+    Get a content hash of the question bank.
+    
+    Returns:
+        str: Short hex digest of the live version; changes whenever the bank's source changes
+    """
+    return get_question_bank().version
+
+def paper_variant(seed: int) -> int:
+    """
+    The paper variant a client's seed selects.
+    """
+    return seed % PAPER_VARIANTS
+
+def option_order(seed: int, q_id: str, options: Mapping[str, str]) -> Dict[str, str]:
+    """
+    Map the option labels shown for a question on a seeded paper to its option keys in the bank.
+    
+    The order depends only on the seed and the question's stable ID, not the
+    bank version, so an answer maps back the same way on any version that
+    still has the question.
+    
+    Args:
+        seed (int): Paper seed chosen by the client
+        q_id (str): Stable question ID
+        options (Mapping[str, str]): The question's options in the bank
+        
+    Returns:
+        Dict[str, str]: Displayed label -> option key in the bank
+    """
+    labels = sorted(options)
+    order = random.Random(f"{seed}:{q_id}").sample(labels, len(labels))
+    return dict(zip(labels, order))
+
+def option_revision(options: Mapping[str, str]) -> str:
+    """
+    Short fingerprint of a question's options.
+    
+    Seeded papers carry it per question and send it back with the answers, so a
+    question whose options were edited since the paper was fetched is noticed;
+    edits to the question text or the correct answer don't change it.
+    """
+    content = json.dumps(dict(options), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+
+class SeededPaper(NamedTuple):
+    """A shuffled, answer-free paper."""
+    seed: int
+    bank_version: str
+    questions: Mapping[str, Tuple[Dict[str, Any], ...]]
+
+def get_seeded_paper(seed: int, bank: Optional[QuestionBank] = None) -> SeededPaper:
+    """
+    Generate the paper for a seed.
+    
+    Question order and option order are permuted deterministically from the
+    seed's paper_variant(), so the same seed always yields the same paper and
+    no per-student state has to be kept. Options are relabeled in display order; see
+    option_order() for how answers map back. Each question carries its
+    option_revision() as "rev".
+    
+    Args:
+        seed (int): Paper seed chosen by the client
+        bank (Optional[QuestionBank]): Bank version to draw from; defaults to the live one
+        
+    Returns:
+        SeededPaper: Sanitized questions per subject
+    """
+    if bank is not None:
+        return build_seeded_paper(bank, paper_variant(seed))
+    with bank_snapshot() as bank:
+        return build_seeded_paper(bank, paper_variant(seed))
+
+def build_seeded_paper(bank: QuestionBank, seed: int) -> SeededPaper:
+    questions = {}
+    for subject in bank.subjects():
+        shuffled = bank.questions(subject)
+        random.Random(f"{seed}:{subject}").shuffle(shuffled)
+        paper_questions = []
+        for q in shuffled:
+            order = option_order(seed, q["id"], q["options"])
+            paper_questions.append({
+                "id": q["id"],
+                "question": q["question"],
+                "options": {label: q["options"][key] for label, key in order.items()},
+                "rev": option_revision(q["options"]),
+            })
+        questions[subject] = tuple(paper_questions)
+    return SeededPaper(seed=seed, bank_version=bank.version, questions=MappingProxyType(questions))
+
+def normalize_answers(user_answers: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """
+    Normalize a submission so equivalent sheets compare equal.
+    
+    Option letters are trimmed and lower-cased and blank answers are dropped,
+    so they count as unanswered. Subjects are kept even when left empty.
+    
+    Args:
+        user_answers (Dict[str, Dict[str, str]]): Answers keyed by subject and question ID
+        
+    Returns:
+        Dict[str, Dict[str, str]]: Normalized copy of the answers
+    """
+    return {
+        subject: {
+            q_id: ans.strip().lower()
+            for q_id, ans in answers.items()
+            if ans and ans.strip()
+        }
+        for subject, answers in user_answers.items()
+    }
+
+def canonicalize_answers(user_answers: Dict[str, Dict[str, str]], seed: Optional[int],
+                         bank: Optional[QuestionBank] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Normalize answers and map those given on a seeded paper back to the bank's option keys.
+    
+    Answers keyed by stable question ID then grade against get_answer_key() like
+    any other submission, and identical choices hash to the same cache key
+    whatever paper they were given on.
+    
+    Args:
+        user_answers (Dict[str, Dict[str, str]]): Answers keyed by subject and question ID
+        seed (Optional[int]): Seed of the paper the answers were given on, or None if unshuffled
+        bank (Optional[QuestionBank]): Bank version the paper was drawn from; defaults to the live one
+        
+    Returns:
+        Dict[str, Dict[str, str]]: Normalized answers using the bank's option keys
+    """
+    user_answers = normalize_answers(user_answers)
+    if seed is None:
+        return user_answers
+    if bank is None:
+        with bank_snapshot() as bank:
+            return unshuffle_answers(user_answers, paper_variant(seed), bank)
+    return unshuffle_answers(user_answers, paper_variant(seed), bank)
+
+def unshuffle_answers(user_answers: Dict[str, Dict[str, str]], variant: int, bank: QuestionBank) -> Dict[str, Dict[str, str]]:
+    """
+    Map normalized answers given on a paper variant back to the bank's option keys.
+    """
+    canonical = {}
+    for subject, answers in user_answers.items():
+        canonical[subject] = {}
+        for q_id, ans in answers.items():
+            # Seeded answers are keyed by stable ID; anything else is graded as given
+            entry = bank.key_entry(subject, q_id) if positional_index(q_id) is None else None
+            if entry is not None:
+                ans = option_order(variant, q_id, entry["options"]).get(ans, ans)
+            canonical[subject][q_id] = ans
+    return canonical
+
+def changed_answers(user_answers: Dict[str, Dict[str, str]], revisions: Mapping[str, str],
+                    bank: QuestionBank) -> List[str]:
+    """
+    Find the answers on a seeded paper that can't be graded against a bank version.
+    
+    Args:
+        user_answers (Dict[str, Dict[str, str]]): Answers keyed by subject and stable question ID
+        revisions (Mapping[str, str]): The "rev" the paper showed for each answered question
+        bank (QuestionBank): Bank version to grade against
+        
+    Returns:
+        List[str]: IDs of answered questions that are no longer in the bank, or
+        whose options changed (or whose rev is unknown) since the paper was fetched
+    """
+    changed = []
+    for subject, answers in normalize_answers(user_answers).items():
+        for q_id in answers:
+            entry = bank.key_entry(subject, q_id)
+            if entry is None or revisions.get(q_id) != option_revision(entry["options"]):
+                changed.append(q_id)
+    return changed
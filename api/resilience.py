@@ -0,0 +1,363 @@
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from llm_stats import percentile
+
+# Upper bound on one analysis, retries and hedges included
+LLM_DEADLINE = float(os.getenv("SOCA_LLM_DEADLINE", "60"))
+# Extra attempts after a retryable failure, spaced by jittered exponential backoff
+LLM_RETRIES = max(0, int(os.getenv("SOCA_LLM_RETRIES", "2")))
+RETRY_BACKOFF = float(os.getenv("SOCA_LLM_RETRY_BACKOFF", "0.5"))
+RETRY_BACKOFF_MAX = float(os.getenv("SOCA_LLM_RETRY_BACKOFF_MAX", "8"))
+# Send a duplicate request once an attempt has run longer than this
+# percentile of recent successful calls; 0 disables hedging
+HEDGE_PERCENTILE = float(os.getenv("SOCA_LLM_HEDGE_PERCENTILE", "90"))
+HEDGE_MIN_SAMPLES = 20
+# Open the circuit when at least BREAKER_MIN_CALLS calls in the last
+# BREAKER_WINDOW seconds failed at BREAKER_ERROR_RATE or more
+BREAKER_WINDOW = float(os.getenv("SOCA_BREAKER_WINDOW", "30"))
+BREAKER_MIN_CALLS = int(os.getenv("SOCA_BREAKER_MIN_CALLS", "10"))
+BREAKER_ERROR_RATE = float(os.getenv("SOCA_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_COOLDOWN = float(os.getenv("SOCA_BREAKER_COOLDOWN", "15"))
+
+# Rate limiting, upstream 5xx and timeouts are worth another try; bad requests are not
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+class UpstreamError(RuntimeError):
+    """The LLM could not produce a report in time."""
+
+class DeadlineExceeded(UpstreamError):
+    """The request's deadline passed before any attempt succeeded."""
+
+class CircuitOpenError(UpstreamError):
+    """Calls are being rejected while the upstream error rate is too high."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM temporarily unavailable; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+def is_retryable(exc: Exception) -> bool:
+    """
+    True for rate limiting, upstream 5xx, timeouts and connection errors.
+    """
+    # google.api_core errors carry the HTTP status as .code
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS
+    # requests' connection errors and timeouts are OSErrors
+    return isinstance(exc, (TimeoutError, OSError))
+
+def upstream_error_status(exc: Exception) -> Tuple[int, Dict[str, str]]:
+    """
+    HTTP status and headers to answer with when an analysis failed upstream.
+
+    Returns:
+        Tuple[int, Dict[str, str]]: 503 with Retry-After while the circuit is
+        open, 504 past the deadline, 502 for any other upstream failure
+    """
+    if isinstance(exc, CircuitOpenError):
+        return 503, {"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    if isinstance(exc, DeadlineExceeded):
+        return 504, {}
+    return 502, {}
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker.
+
+    closed: calls go through. open: calls fail fast for `cooldown` seconds.
+    half_open: one probe call is let through; its outcome closes or re-opens
+    the circuit.
+
+    allow() hands each call a ticket, the generation it was let through in, to
+    pass back to record(). The generation moves on whenever the circuit opens
+    or a probe is let through, so outcomes of calls from an earlier generation
+    (abandoned hedges, attempts past their deadline) are ignored.
+    """
+
+    def __init__(self, window: float = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 error_rate: float = BREAKER_ERROR_RATE, cooldown: float = BREAKER_COOLDOWN):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._outcomes = deque()
+        self._opened_at = None
+        self._generation = 0
+        # When the half-open probe was let through and its ticket, or None
+        self._probe_at = None
+        self._probe = None
+        self._lock = threading.Lock()
+        self.stats = {"rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> int:
+        """
+        Raise CircuitOpenError unless a call may go through now.
+
+        Returns:
+            int: Ticket to pass to record() with the call's outcome
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == "closed":
+                return self._generation
+            # A probe that never reported back (e.g. never started) is replaced after a cooldown
+            if state == "half_open" and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+                self._generation += 1
+                self._probe_at = now
+                self._probe = self._generation
+                return self._probe
+            self.stats["rejected"] += 1
+            retry_after = max(0.0, self.cooldown - (now - self._opened_at))
+        raise CircuitOpenError(retry_after)
+
+    def record(self, ok: bool, ticket: int) -> None:
+        """
+        Record the outcome of one upstream call.
+
+        Args:
+            ok (bool): Whether the upstream answered
+            ticket (int): What allow() returned when the call was let through
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._opened_at is not None:
+                # Only the current probe decides; stragglers and replaced probes don't count
+                if ticket == self._probe:
+                    self._probe_at = self._probe = None
+                    if ok:
+                        self._opened_at = None
+                        self._outcomes.clear()
+                    else:
+                        self._opened_at = now
+                        self._generation += 1
+                return
+            if ticket != self._generation:
+                # Started before the circuit last opened
+                return
+            self._outcomes.append((now, ok))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, outcome in self._outcomes if not outcome)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._opened_at = now
+                self._generation += 1
+                self.stats["opened"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            calls = [ok for ts, ok in self._outcomes if ts >= now - self.window]
+            return {
+                "state": self._state(now),
+                "window_calls": len(calls),
+                "window_error_rate": (calls.count(False) / len(calls)) if calls else 0.0,
+                **self.stats,
+            }
+
+class LatencyTracker:
+    """
+    Recent successful call latencies, for picking the hedge delay.
+    """
+
+    def __init__(self, max_samples: int = 200):
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            samples = sorted(self._samples)
+        return percentile(samples, pct)
+
+class ResilientCaller:
+    """
+    Runs blocking LLM calls with a deadline, bounded retries, hedging and a circuit breaker.
+
+    Attempts run on their own thread pool so the caller can stop waiting at
+    the deadline. A thread cannot be killed, so each attempt is also handed
+    the time left, which the Gemini client uses as its HTTP timeout.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, max_workers: int):
+        self.breaker = breaker
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="soca-llm-attempt")
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def tracker(self, key) -> LatencyTracker:
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker()
+            return tracker
+
+    def _attempt(self, fn, deadline, tracker, ticket):
+        start = time.monotonic()
+        # Time spent queued for a thread counts against the deadline
+        if start >= deadline:
+            raise DeadlineExceeded("Deadline passed before the attempt started")
+        try:
+            result = fn(deadline - start)
+        except Exception as e:
+            # A non-retryable error (say a 400) still means the upstream answered
+            self.breaker.record(not is_retryable(e), ticket)
+            raise
+        self.breaker.record(True, ticket)
+        tracker.observe(time.monotonic() - start)
+        return result
+
+    def _hedged(self, fn, deadline, tracker, hedge_percentile, ticket):
+        start = time.monotonic()
+        hedge_after = tracker.percentile(hedge_percentile) if hedge_percentile else None
+        primary = self._executor.submit(self._attempt, fn, deadline, tracker, ticket)
+        pending = {primary}
+        hedged = False
+        error = None
+        while pending:
+            now = time.monotonic()
+            wait_for = deadline - now
+            if hedge_after is not None and not hedged:
+                wait_for = min(wait_for, start + hedge_after - now)
+            done, pending = wait(pending, timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self.count("hedge_wins")
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+            now = time.monotonic()
+            if now >= deadline:
+                for other in pending:
+                    other.cancel()
+                self.count("deadline_exceeded")
+                raise DeadlineExceeded(f"No LLM response within {deadline - start:.1f}s")
+            if pending and not hedged and hedge_after is not None and now - start >= hedge_after:
+                hedged = True
+                self.count("hedges")
+                pending.add(self._executor.submit(self._attempt, fn, deadline, tracker, ticket))
+        raise error
+
+    def call(self, fn: Callable[[float], Any], key=None, deadline: float = LLM_DEADLINE,
+             retries: int = LLM_RETRIES, hedge_percentile: float = HEDGE_PERCENTILE) -> Any:
+        """
+        Call fn(timeout) until it succeeds, the retries run out or the deadline passes.
+
+        Args:
+            fn (Callable[[float], Any]): One upstream call, given the seconds it may take
+            key: Calls with the same key share latency history for hedging
+            deadline (float): Seconds from now after which DeadlineExceeded is raised
+            retries (int): Extra attempts after retryable failures
+            hedge_percentile (float): Latency percentile after which a duplicate is sent; 0 disables hedging
+
+        Returns:
+            Any: The first successful result
+        """
+        self.count("calls")
+        deadline_at = time.monotonic() + deadline
+        tracker = self.tracker(key)
+        attempt = 0
+        while True:
+            ticket = self.breaker.allow()
+            try:
+                return self._hedged(fn, deadline_at, tracker, hedge_percentile, ticket)
+            except UpstreamError:
+                raise
+            except Exception as e:
+                if attempt >= retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                if time.monotonic() + delay >= deadline_at:
+                    raise
+                self.count("retries")
+                time.sleep(delay)
+                attempt += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            trackers = dict(self._trackers)
+        stats["hedge_after"] = {
+            "/".join(map(str, key)) if isinstance(key, tuple) else str(key): tracker.percentile(HEDGE_PERCENTILE or 90)
+            for key, tracker in trackers.items()
+        }
+        stats["circuit_breaker"] = self.breaker.get_stats()
+        return stats
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Retry, hedge and breaker counters in the Prometheus text format.
+        """
+        stats = self.get_stats()
+        breaker = stats["circuit_breaker"]
+        lines = []
+        for name, help_text in (
+            ("retries", "LLM attempts retried after a retryable failure."),
+            ("hedges", "Hedged duplicate LLM requests sent."),
+            ("hedge_wins", "Hedged requests that answered first."),
+            ("deadline_exceeded", "Analyses abandoned at their deadline."),
+        ):
+            lines += [
+                f"# HELP soca_llm_{name}_total {help_text}",
+                f"# TYPE soca_llm_{name}_total counter",
+                f"soca_llm_{name}_total {stats[name]}",
+            ]
+        lines += [
+            "# HELP soca_llm_circuit_open 1 while the LLM circuit breaker is rejecting calls.",
+            "# TYPE soca_llm_circuit_open gauge",
+            f"soca_llm_circuit_open {int(breaker['state'] == 'open')}",
+            "# HELP soca_llm_circuit_rejected_total Calls rejected by the open circuit.",
+            "# TYPE soca_llm_circuit_rejected_total counter",
+            f"soca_llm_circuit_rejected_total {breaker['rejected']}",
+        ]
+        return lines
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff before retry number `attempt` (0-based).
+    """
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+
+_resilient_caller = None
+_caller_lock = threading.Lock()
+
+def get_resilient_caller(max_workers: int) -> ResilientCaller:
+    """
+    Get the process-wide caller; it and its circuit breaker are shared by every request.
+    """
+    global _resilient_caller
+    with _caller_lock:
+        if _resilient_caller is None:
+            _resilient_caller = ResilientCaller(CircuitBreaker(), max_workers=max_workers)
+        return _resilient_caller
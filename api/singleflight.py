@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+from metrics import register_collector
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight call.
+
+    The first caller for a key starts the work; callers arriving while it runs
+    wait for the same result (or exception) instead of starting their own.
+    Nothing is kept once the call finishes; caching is the AnalysisCache's job.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn() once per key among concurrent callers.
+
+        The shared call runs as its own task, so a caller that disconnects
+        doesn't cancel it for the others.
+
+        Args:
+            key (Hashable): Calls with equal keys are coalesced
+            fn (Callable[[], Awaitable[Any]]): Starts the work when no call for key is in flight
+
+        Returns:
+            Any: The shared call's result
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            self.stats["leaders"] += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Mark the exception retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict(self.stats)
+        stats["in_flight"] = len(self._flights)
+        return stats
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Coalescing counters in the Prometheus text format.
+        """
+        stats = self.get_stats()
+        return [
+            "# HELP soca_analysis_coalesced_total Analysis requests that waited on an identical in-flight request.",
+            "# TYPE soca_analysis_coalesced_total counter",
+            f"soca_analysis_coalesced_total {stats['coalesced']}",
+            "# HELP soca_analysis_upstream_calls_total Analysis requests that started their own LLM call.",
+            "# TYPE soca_analysis_upstream_calls_total counter",
+            f"soca_analysis_upstream_calls_total {stats['leaders']}",
+            "# HELP soca_analysis_in_flight Distinct analyses currently being generated.",
+            "# TYPE soca_analysis_in_flight gauge",
+            f"soca_analysis_in_flight {stats['in_flight']}",
+        ]
+
+_single_flight = None
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the process-wide coalescer for analysis requests.
+    """
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+        register_collector(_single_flight.metrics_lines)
+    return _single_flight
@@ -1,8 +1,15 @@
+import os
+import sys
+
+# Shares the question bank, grading and model modules in api/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
 import streamlit as st
 import model
 import json
 from typing import Dict, Any
 import questions
+import grading
 import random
 
 # Set page config
@@ -81,21 +88,25 @@ def create_subject_input(subject: str) -> Dict[str, str]:
         with col2:
             answer = st.selectbox(
                 f"Answer",
-                options=["Select an option", "a", "b", "c", "d"],
+                options=["Select an option", *q['options']],
                 key=f"{subject}_a{i}",
                 index=0
             )
             if answer != "Select an option":
-                questions_dict[f"Q{i}"] = answer
+                # Keyed by stable question ID, so the order shown doesn't matter for grading
+                questions_dict[q['id']] = answer
     
     return questions_dict
 
-def calculate_subject_score(user_answers: Dict[str, str], answer_key: Dict[str, str]) -> float:
-    """Calculate score for a subject based on correct answers."""
-    if not user_answers:
-        return 0.0
-    correct = sum(1 for q, a in user_answers.items() if a == answer_key.get(q, {}).get('correct_answer'))
-    return (correct / len(answer_key)) * 100
+def calculate_subject_scores(user_answers: Dict[str, Dict[str, str]], answer_key) -> Dict[str, float]:
+    """Score every subject as the percentage of its questions answered correctly."""
+    # The bank's answer key carries its precompiled grading key
+    result = grading.grade_sheets([user_answers], answer_key)
+    totals = grading.get_compiled_key(answer_key).totals
+    return {
+        subject: (int(correct) / int(total)) * 100 if total else 0.0
+        for subject, correct, total in zip(result.subjects, result.correct[0], totals)
+    }
 
 def main():
     st.title("📚 JEE Aspirant SOCA Analysis")
@@ -163,28 +174,13 @@ def main():
                 st.rerun()
             return
         
-        # Get answer key and calculate scores
-        answer_key = {}
-        subject_scores = {}
+        # Answers are keyed by question ID, so they grade against the bank's answer key
+        answer_key = questions.get_answer_key()
+        subject_scores = calculate_subject_scores(st.session_state.user_answers, answer_key)
         
         # Core subjects for analysis
         core_subjects = ["Physics", "Chemistry", "Mathematics"]
         
-        for subject in subjects:
-            # Get the questions with their full details
-            questions_list = st.session_state.shuffled_questions[subject]
-            answer_key[subject] = {
-                f"Q{i+1}": {
-                    "correct_answer": q["correct_answer"],
-                    "question": q["question"]
-                }
-                for i, q in enumerate(questions_list)
-            }
-            subject_scores[subject] = calculate_subject_score(
-                st.session_state.user_answers.get(subject, {}),
-                answer_key[subject]
-            )
-        
         # Display core subject scores
         st.markdown("### 📊 Core Subject Performance")
         for subject in core_subjects:
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.api import routes
+# backend.api.routes puts the shared api/ modules on sys.path
+from metrics import install_metrics
 import uvicorn
 
 app = FastAPI(title="JEE SOCA Analysis API")
@@ -14,6 +16,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics
+install_metrics(app)
+
 # Include routes
 app.include_router(routes.router, prefix="/api")
 
@@ -0,0 +1,84 @@
+"""
+Per-request answer-key cost: rebuilding it from the question list (the old
+/api/analyze behaviour) versus grading lookups in the served bank version's
+answer key (QuestionBank.answer_key), plus the one-off cost of building and
+precompiling that version.
+
+    python benchmarks/bench_answer_key.py
+"""
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from grading import compile_answer_key
+from question_bank import open_bank
+from questions import get_all_subjects
+
+SUBJECT_ORDER = get_all_subjects()
+
+def make_bank(per_subject):
+    return {
+        subject: [
+            {
+                "id": f"{subject[:3].upper()}-{i}",
+                "question": f"{subject} question {i}",
+                "options": {"a": "1", "b": "2", "c": "3", "d": "4"},
+                "correct_answer": "abcd"[i % 4],
+            }
+            for i in range(per_subject)
+        ]
+        for subject in SUBJECT_ORDER
+    }
+
+def write_source(bank, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for subject, qs in bank.items():
+            for q in qs:
+                f.write(json.dumps({"subject": subject, **q}) + "\n")
+
+def rebuild_answer_key(bank):
+    answer_key = {}
+    for subject in SUBJECT_ORDER:
+        qs = bank.get(subject, []).copy()
+        answer_key[subject] = {}
+        for i, q in enumerate(qs):
+            answer_key[subject][f"Q{i+1}"] = {
+                "correct_answer": q["correct_answer"],
+                "question": q["question"]
+            }
+    return answer_key
+
+def look_up_sheet(answer_key, sheet):
+    # What formatting and instant reports do per graded answer
+    for subject, q_ids in sheet.items():
+        subject_key = answer_key[subject]
+        for q_id in q_ids:
+            subject_key[q_id]["correct_answer"]
+
+def main():
+    print(f"{'items/subject':>14} {'rebuild (us)':>14} {'bank key (us)':>14} {'build once (ms)':>16}")
+    with tempfile.TemporaryDirectory() as directory:
+        for per_subject in (5, 100, 1000, 5000):
+            bank = make_bank(per_subject)
+            runs = max(3, 20000 // per_subject)
+            rebuild = min(timeit.repeat(lambda: rebuild_answer_key(bank), number=runs, repeat=3)) / runs
+            source = os.path.join(directory, f"questions-{per_subject}.jsonl")
+            write_source(bank, source)
+            db_dir = os.path.join(directory, str(per_subject))
+            os.mkdir(db_dir)
+            # Build the database and compile the key, as a new bank version does before going live
+            build = min(timeit.repeat(
+                lambda: compile_answer_key(open_bank(source, db_dir).answer_key), number=1, repeat=1,
+            ))
+            served = open_bank(source, db_dir)
+            # A 30-question sheet per subject, keyed by stable ID
+            sheet = {subject: [q["id"] for q in qs[:30]] for subject, qs in bank.items()}
+            lookup = min(timeit.repeat(lambda: look_up_sheet(served.answer_key, sheet), number=runs, repeat=3)) / runs
+            print(f"{per_subject:>14} {rebuild * 1e6:>14.1f} {lookup * 1e6:>14.1f} {build * 1e3:>16.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Full-prompt response formatting at mock-test sizes: the streaming formatter
+(iter_responses, joined or written to a file) versus the `+=` concatenation
+with per-question answer-key lookups it replaced.
+
+    python benchmarks/bench_formatter.py [questions per subject ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from model import CORE_SUBJECTS, NON_CORE_SUBJECTS, preprocess_responses, write_responses
+
+def concat_formatter(user_answers, answer_key):
+    formatted_responses = """Student Response Analysis:\n\n"""
+    formatted_responses += "--- ACADEMIC PERFORMANCE ---\n"
+    for subject in CORE_SUBJECTS:
+        if subject in user_answers:
+            formatted_responses += f"\nSubject: {subject}\n"
+            for q_no, user_ans in user_answers[subject].items():
+                subject_key = answer_key.get(subject, {})
+                q_data = subject_key.get(q_no, {})
+                correct_ans = q_data.get("correct_answer", "Unknown")
+                question_text = q_data.get("question", "")
+                status = "Correct ✅" if user_ans == correct_ans else "Incorrect ❌"
+                formatted_responses += f"{q_no}. {question_text}\n   Your Answer: ({user_ans}), Correct Answer: ({correct_ans}) - {status}\n"
+    formatted_responses += "\n--- WELL-BEING & TIME MANAGEMENT ---\n"
+    for subject in NON_CORE_SUBJECTS:
+        if subject in user_answers:
+            formatted_responses += f"\nSection: {subject}\n"
+            for q_no, user_ans in user_answers[subject].items():
+                subject_key = answer_key.get(subject, {})
+                q_data = subject_key.get(q_no, {})
+                ideal_ans = q_data.get("correct_answer", "Unknown")
+                question_text = q_data.get("question", "")
+                formatted_responses += f"{q_no}. {question_text}\n   Your Answer: ({user_ans}), Ideal Habit: ({ideal_ans})\n"
+    return formatted_responses
+
+def make_sheet(per_subject, rng):
+    answer_key = {}
+    user_answers = {}
+    for subject in CORE_SUBJECTS + NON_CORE_SUBJECTS:
+        answer_key[subject] = {
+            f"Q{i}": {
+                "question": f"{subject} question {i}: which of the following statements about topic {i % 17} is correct?",
+                "correct_answer": rng.choice("abcd"),
+            }
+            for i in range(1, per_subject + 1)
+        }
+        user_answers[subject] = {q_no: rng.choice("abcd") for q_no in answer_key[subject]}
+    return user_answers, answer_key
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]
+    rng = random.Random(0)
+    print(f"{'q/subject':>9} {'chars':>9} {'+= concat':>11} {'join':>11} {'to file':>11} {'peak +=':>9} {'peak file':>9}")
+    for per_subject in sizes:
+        user_answers, answer_key = make_sheet(per_subject, rng)
+        text = preprocess_responses(user_answers, answer_key)
+        assert text == concat_formatter(user_answers, answer_key)
+        repeat = max(3, 20_000 // per_subject)
+        concat = best_of(lambda: concat_formatter(user_answers, answer_key), repeat)
+        joined = best_of(lambda: preprocess_responses(user_answers, answer_key), repeat)
+        with tempfile.TemporaryFile("w", encoding="utf-8") as file:
+            def to_file():
+                file.seek(0)
+                write_responses(user_answers, answer_key, file)
+            written = best_of(to_file, repeat)
+            file_peak = peak_memory(to_file)
+        concat_peak = peak_memory(lambda: concat_formatter(user_answers, answer_key))
+        print(f"{per_subject:>9} {len(text):>9,} {concat * 1e6:>9.0f}µs {joined * 1e6:>9.0f}µs "
+              f"{written * 1e6:>9.0f}µs {concat_peak / 1024:>7.0f}KB {file_peak / 1024:>7.0f}KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Grading throughput: the vectorized engine on a sheets x questions matrix
+versus the per-answer dict lookups it replaced.
+
+    python benchmarks/bench_grading.py [sheets]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+# Measure on a single core
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+import numpy as np
+
+from grading import encode_responses, get_compiled_key, grade_matrix
+from questions import get_answer_key
+
+def dict_grading(sheets, answer_key):
+    performances = []
+    for user_answers in sheets:
+        subject_performance = {}
+        for subject, questions in user_answers.items():
+            subject_key = answer_key.get(subject, {})
+            correct_count = 0
+            total = 0
+            for q_no, ans in questions.items():
+                total += 1
+                if ans == subject_key.get(q_no, {}).get("correct_answer"):
+                    correct_count += 1
+            subject_performance[subject] = (correct_count / total) * 100 if total else 0
+        performances.append(subject_performance)
+    return performances
+
+def main():
+    n_sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    answer_key = get_answer_key()
+    compiled = get_compiled_key(answer_key)
+    rng = np.random.default_rng(0)
+    # ~20% blanks, the rest spread over a-d
+    matrix = rng.integers(-1, 4, size=(n_sheets, len(compiled.key)), dtype=np.int8)
+
+    grade_matrix(matrix, compiled)
+    start = time.perf_counter()
+    result = grade_matrix(matrix, compiled)
+    vectorized = time.perf_counter() - start
+    print(f"grade_matrix: {n_sheets} sheets x {matrix.shape[1]} questions in {vectorized * 1e3:.1f} ms "
+          f"({n_sheets / vectorized:,.0f} sheets/s)")
+
+    sample = 10_000
+    random.seed(0)
+    sheets = [
+        {
+            subject: {q_id: random.choice("abcd") for q_id in ids if q_id.startswith("Q") and random.random() < 0.8}
+            for subject, ids in answer_key.items()
+        }
+        for _ in range(sample)
+    ]
+    start = time.perf_counter()
+    encode_responses(sheets, compiled)
+    encoding = time.perf_counter() - start
+    start = time.perf_counter()
+    dict_grading(sheets, answer_key)
+    dicts = time.perf_counter() - start
+    print(f"encode_responses: {sample / encoding:,.0f} sheets/s (dict input -> matrix)")
+    print(f"dict lookups:     {sample / dicts:,.0f} sheets/s "
+          f"(~{n_sheets / (sample / dicts) * 1e3:.0f} ms for {n_sheets} sheets)")
+    print(f"mean accuracy per subject: {dict(zip(result.subjects, result.accuracy.mean(axis=0).round(1).tolist()))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Cold-start import cost of the Vercel app, measured with `python -X importtime`
+in fresh interpreters. Exits non-zero when `import index` exceeds the budget or
+when a module that should only load on the first analysis is imported eagerly.
+
+    python benchmarks/bench_import_time.py [--budget-ms 750] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT, "api")
+
+# Only needed once an analysis runs; see model.import_genai() and local_model.import_torch()
+DEFERRED_MODULES = ("google.generativeai", "google.ai.generativelanguage", "google.api_core", "torch", "transformers")
+
+def measure(module):
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        dict: module name -> (self_us, cumulative_us) for every module imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # header line
+        timings[fields[2].strip()] = (self_us, cumulative_us)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="index")
+    parser.add_argument("--budget-ms", type=float, default=750.0)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters; the fastest run is reported")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: timings[args.module][1])
+    total_ms = best[args.module][1] / 1e3
+
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    packages = {}
+    for name, (self_us, _) in best.items():
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + self_us
+    for top, self_us in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {top:24s} {self_us / 1e3:8.1f} ms")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import {args.module} took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    eager = sorted(name for name in best if name.startswith(DEFERRED_MODULES))
+    if eager:
+        failures.append(f"imported at cold start but should be deferred: {', '.join(eager[:5])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Time to build the rule-based instant SOCA report (api/instant_report.py) for
+random answer sheets.
+
+    python benchmarks/bench_instant_report.py [sheets]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from instant_report import build_instant_report
+from llm_stats import summarize
+from questions import get_all_questions, get_answer_key
+
+def make_sheet(rng, bank):
+    return {
+        subject: {q["id"]: rng.choice("abcd") for q in qs if rng.random() < 0.9}
+        for subject, qs in bank.items()
+    }
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(0)
+    answer_key = get_answer_key()
+    bank = get_all_questions()
+    sheets = [make_sheet(rng, bank) for _ in range(n)]
+    timings = []
+    for sheet in sheets:
+        start = time.perf_counter()
+        build_instant_report(sheet, answer_key)
+        timings.append(time.perf_counter() - start)
+    stats = summarize(timings)
+    print(f"{n} reports: p50 {stats['p50'] * 1e3:.3f} ms  p95 {stats['p95'] * 1e3:.3f} ms  "
+          f"p99 {stats['p99'] * 1e3:.3f} ms  max {max(timings) * 1e3:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Tokens/s and peak RSS of the offline backend (api/local_model.py), unquantized
+versus dynamic int8, each measured in a fresh interpreter.
+
+Without --model a tiny randomly initialised T5 checkpoint (and a word-level
+tokenizer trained on a SOCA prompt) is built in a temp directory, so the
+benchmark runs with no network. Pass --model google/flan-t5-large for real numbers.
+Needs torch and transformers.
+
+    python benchmarks/bench_local_model.py [--model PATH_OR_ID] [--threads 4] [--new-tokens 64] [--runs 5]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+def sample_prompt():
+    """
+    The prompt the local backend is sent for a 60%-correct sheet: its short
+    instruction and the compact per-student part.
+    """
+    from local_model import LOCAL_PROMPT_PREFIX
+    from model import PROMPT_PARTS, PROMPT_VARIANTS, calculate_subject_performance
+    from questions import get_all_questions, get_answer_key
+
+    rng = random.Random(0)
+    answer_key = get_answer_key()
+    sheet = {
+        subject: {q["id"]: q["correct_answer"] if rng.random() < 0.6 else rng.choice("abcd") for q in qs}
+        for subject, qs in get_all_questions().items()
+    }
+    preprocess, _ = PROMPT_VARIANTS["compact"]
+    _, build_suffix = PROMPT_PARTS["compact"]
+    return LOCAL_PROMPT_PREFIX + build_suffix(preprocess(sheet, answer_key), calculate_subject_performance(sheet, answer_key))
+
+def make_tiny_checkpoint(path, prompt):
+    """
+    Save a small random T5 and a tokenizer whose vocabulary covers the prompt.
+    """
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+    from transformers import PreTrainedTokenizerFast, T5Config, T5ForConditionalGeneration
+
+    specials = ["<pad>", "</s>", "<unk>"]
+    word_level = Tokenizer(models.WordLevel(unk_token="<unk>"))
+    word_level.pre_tokenizer = pre_tokenizers.Whitespace()
+    word_level.train_from_iterator([prompt], trainers.WordLevelTrainer(special_tokens=specials))
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=word_level, pad_token="<pad>", eos_token="</s>", unk_token="<unk>"
+    )
+    config = T5Config(
+        vocab_size=len(tokenizer), d_model=256, d_kv=32, d_ff=1024, num_layers=4, num_heads=8,
+        pad_token_id=0, eos_token_id=1, decoder_start_token_id=0,
+    )
+    T5ForConditionalGeneration(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def worker(args):
+    from local_model import load_local_model
+
+    prompt = sample_prompt()
+    start = time.perf_counter()
+    model, _, device = load_local_model(args.model, quantize=args.quantize, threads=args.threads)
+    if model is None:
+        raise SystemExit("torch and transformers are required")
+    load_time = time.perf_counter() - start
+    # Fixed-length outputs, so random weights stopping early don't skew tokens/s
+    fixed = {"max_new_tokens": args.new_tokens, "min_new_tokens": args.new_tokens}
+    # generate_batch() directly: one caller gains nothing from the micro-batching window
+    model.generate_batch([prompt], **fixed)
+
+    tokens = 0
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        _, prompt_tokens, output_tokens = model.generate_batch([prompt], **fixed)[0]
+        tokens += output_tokens
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "model": model.model_name,
+        "device": device,
+        "prompt_tokens": prompt_tokens,
+        "load_s": load_time,
+        "seconds_per_report": elapsed / args.runs,
+        "tokens_per_s": tokens / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+def run_worker(args, quantize):
+    command = [
+        sys.executable, os.path.abspath(__file__), "--worker", "--model", args.model,
+        "--threads", str(args.threads), "--new-tokens", str(args.new_tokens), "--runs", str(args.runs),
+    ] + (["--quantize"] if quantize else [])
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Hugging Face ID or checkpoint path; default: a tiny random T5")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads; 0 = torch default")
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--quantize", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.model:
+            args.model = os.path.join(tmp, "tiny-t5")
+            make_tiny_checkpoint(args.model, sample_prompt())
+        results = [run_worker(args, quantize) for quantize in (False, True)]
+
+    print(f"{args.runs} reports of {args.new_tokens} tokens, prompt {results[0]['prompt_tokens']} tokens (truncated)")
+    for result in results:
+        print(f"{result['model']:>40}  {result['tokens_per_s']:8.1f} tokens/s  "
+              f"{result['seconds_per_report'] * 1e3:8.1f} ms/report  peak RSS {result['peak_rss_mb']:7.1f} MB  "
+              f"load {result['load_s']:.2f} s")
+    base, quantized = results
+    print(f"int8: {quantized['tokens_per_s'] / base['tokens_per_s']:.2f}x tokens/s, "
+          f"{quantized['peak_rss_mb'] - base['peak_rss_mb']:+.1f} MB peak RSS")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-request overhead of the metrics middleware: a bare ASGI app called
+directly versus the same app wrapped in MetricsMiddleware.
+
+    python benchmarks/bench_metrics_overhead.py [requests]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from metrics import MetricsMiddleware, render_metrics
+
+class Route:
+    path = "/api/questions/{subject}"
+
+async def bare_app(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def run(app, n):
+    scope = {"type": "http", "method": "GET", "path": "/api/questions/Physics"}
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    wrapped = MetricsMiddleware(bare_app)
+    # Warm up both paths so first-series allocation is not measured
+    asyncio.run(run(bare_app, 1000))
+    asyncio.run(run(wrapped, 1000))
+
+    bare = min(asyncio.run(run(bare_app, n)) for _ in range(3))
+    instrumented = min(asyncio.run(run(wrapped, n)) for _ in range(3))
+    overhead_us = (instrumented - bare) / n * 1e6
+    print(f"{n} requests")
+    print(f"  bare app:        {bare / n * 1e6:7.2f} us/request")
+    print(f"  with metrics:    {instrumented / n * 1e6:7.2f} us/request")
+    print(f"  overhead:        {overhead_us:7.2f} us/request")
+
+    start = time.perf_counter()
+    body = render_metrics()
+    print(f"  scrape render:   {(time.perf_counter() - start) * 1e3:7.2f} ms ({len(body)} bytes)")
+
+if __name__ == "__main__":
+    main()
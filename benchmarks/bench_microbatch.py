@@ -0,0 +1,98 @@
+"""
+Throughput versus latency of local report generation for several
+micro-batching windows (api/microbatch.py), at increasing client concurrency.
+
+By default generation is simulated by a batch cost model: a batch of n
+prompts takes --base-ms + (n - 1) * --per-item-ms, which is how a CPU
+seq2seq generate() scales while its matmuls are under-filled. With --local
+the tiny random T5 from bench_local_model.py (or --model) is run for real;
+that needs torch and transformers.
+
+    python benchmarks/bench_microbatch.py [--windows 0,5,10,25,50] [--concurrency 1,2,4,8,16] [--requests 64]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_stats import summarize
+from microbatch import MicroBatcher
+
+def simulated_batch(base, per_item):
+    def run_batch(group, prompts):
+        time.sleep(base + per_item * (len(prompts) - 1))
+        return [f"report for {prompt}" for prompt in prompts]
+    return run_batch
+
+def measure(generate, concurrency, requests):
+    """
+    Closed loop: `concurrency` clients each send their next request as soon as
+    the previous one returns, until `requests` have been served.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        generate(f"sheet {i}")
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", default="0,5,10,25,50", help="batch windows in ms; 0 = no batching")
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--base-ms", type=float, default=200.0)
+    parser.add_argument("--per-item-ms", type=float, default=25.0)
+    parser.add_argument("--local", action="store_true", help="run the local model instead of the cost model")
+    parser.add_argument("--model", help="checkpoint for --local; default: a tiny random T5")
+    parser.add_argument("--new-tokens", type=int, default=32)
+    args = parser.parse_args()
+    windows = [float(w) for w in args.windows.split(",")]
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.local:
+            from bench_local_model import make_tiny_checkpoint, sample_prompt
+            from local_model import load_local_model
+
+            prompt = sample_prompt()
+            if not args.model:
+                args.model = os.path.join(tmp, "tiny-t5")
+                make_tiny_checkpoint(args.model, prompt)
+            model, _, _ = load_local_model(args.model)
+            if model is None:
+                raise SystemExit("--local needs torch and transformers")
+            fixed = {"max_new_tokens": args.new_tokens, "min_new_tokens": args.new_tokens}
+            run_batch = lambda group, prompts: model.generate_batch([prompt] * len(prompts), **fixed)
+            print(f"{model.model_name}, {args.new_tokens} new tokens per report")
+        else:
+            run_batch = simulated_batch(args.base_ms / 1000, args.per_item_ms / 1000)
+            print(f"cost model: {args.base_ms:.0f} ms + {args.per_item_ms:.0f} ms per extra prompt in a batch")
+
+        print(f"{'window':>8} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'batch':>6}")
+        for window in windows:
+            for concurrency in levels:
+                # A zero window never waits, so every batch holds one request
+                batcher = MicroBatcher(run_batch, window=window / 1000, max_batch=args.max_batch)
+                throughput, stats = measure(batcher.submit, concurrency, args.requests)
+                label = f"{window:.0f} ms" if window else "off"
+                print(f"{label:>8} {concurrency:>7} {throughput:8.2f} {stats['p50'] * 1e3:8.1f} "
+                      f"{stats['p95'] * 1e3:8.1f} {stats['p99'] * 1e3:8.1f} {batcher.get_stats()['mean_batch_size']:6.2f}")
+
+if __name__ == "__main__":
+    main()
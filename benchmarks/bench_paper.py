@@ -0,0 +1,53 @@
+"""
+Question-loading cost for one student: the old per-subject fetches
+(/api/subjects + /api/questions/{subject} for each subject) versus a single
+/api/paper request, with bytes on the wire per encoding.
+
+    python benchmarks/bench_paper.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+import httpx
+
+from index import app
+
+async def fetch_per_subject(client):
+    requests, size = 1, 0
+    response = await client.get("/api/subjects", headers={"Accept-Encoding": "identity"})
+    size += len(response.content)
+    for subject in response.json()["subjects"]:
+        response = await client.get(f"/api/questions/{subject}", headers={"Accept-Encoding": "identity"})
+        requests += 1
+        size += len(response.content)
+    return requests, size
+
+async def fetch_paper(client, encoding):
+    # httpx decodes bodies transparently, so measure the raw stream instead
+    async with client.stream("GET", "/api/paper", headers={"Accept-Encoding": encoding}) as response:
+        size = sum([len(chunk) async for chunk in response.aiter_raw()])
+        return 1, size, response.headers.get("content-encoding", "identity")
+
+async def timed(fn, *args, runs=200):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = await fn(*args)
+    return result, (time.perf_counter() - start) / runs
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (requests, size), elapsed = await timed(fetch_per_subject, client)
+        print(f"{'per-subject fetches':<24} requests={requests} bytes={size:>6} in-process={elapsed * 1e3:.2f} ms")
+        for encoding in ("identity", "gzip", "br"):
+            (requests, size, served), elapsed = await timed(fetch_paper, client, encoding)
+            label = f"/api/paper ({served})"
+            print(f"{label:<24} requests={requests} bytes={size:>6} in-process={elapsed * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
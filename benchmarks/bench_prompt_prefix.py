@@ -0,0 +1,100 @@
+"""
+Input tokens and latency of SOCA reports with the static prompt prefix held in
+Gemini's context cache versus sent in full, against the local stand-in.
+
+Start the stand-in with a per-token prefill cost so uncached prompt tokens
+show up in latency:
+
+    python benchmarks/gemini_standin.py --port 8765 --latency fixed --latency-mean 0.3 --prefill-ms-per-1k 400 &
+    python benchmarks/bench_prompt_prefix.py [--endpoint http://127.0.0.1:8765] [--calls 40] [--variant full]
+
+Add --cache-min-tokens 4096 to the stand-in to see the fallback when the
+prefix is below the API's minimum cacheable size.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+import requests
+
+def make_sheets(n, rng):
+    from questions import get_all_questions
+
+    bank = get_all_questions()
+    return [
+        {subject: {q["id"]: rng.choice("abcd") for q in qs} for subject, qs in bank.items()}
+        for _ in range(n)
+    ]
+
+def standin_counts(endpoint):
+    return requests.get(f"{endpoint}/standin/stats", timeout=5).json()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", default="http://127.0.0.1:8765")
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--variant", choices=["full", "compact"], default="full")
+    args = parser.parse_args()
+
+    os.environ["GOOGLE_API_KEY"] = os.environ.get("GOOGLE_API_KEY", "test")
+    os.environ["GEMINI_API_ENDPOINT"] = args.endpoint
+    # Measure prefill, not hedging or retries
+    os.environ["SOCA_LLM_HEDGE_PERCENTILE"] = "0"
+
+    import model
+    from llm_stats import summarize
+    from questions import get_answer_key
+
+    llm_model, _, _ = model.load_model()
+    answer_key = get_answer_key()
+    sheets = make_sheets(args.calls, random.Random(0))
+    inputs = [
+        (model.format_responses(sheet, answer_key, args.variant), model.calculate_subject_performance(sheet, answer_key))
+        for sheet in sheets
+    ]
+
+    prefix, build_suffix = model.PROMPT_PARTS[args.variant]
+    _, build_prompt = model.PROMPT_VARIANTS[args.variant]
+    start = time.perf_counter()
+    for user_text, performance in inputs:
+        build_prompt(user_text, performance)
+    full_us = (time.perf_counter() - start) / len(inputs) * 1e6
+    start = time.perf_counter()
+    for user_text, performance in inputs:
+        build_suffix(user_text, performance)
+    suffix_us = (time.perf_counter() - start) / len(inputs) * 1e6
+    print(f"{args.variant} prompt: prefix {model.estimate_tokens(prefix)} tokens (est.), "
+          f"build {full_us:.1f} µs full / {suffix_us:.1f} µs suffix only")
+
+    prefix_cache = model.get_prefix_cache()
+    # The stand-in caches prefixes of any size unless started with --cache-min-tokens
+    prefix_cache.min_tokens = 0
+    results = {}
+    for label, enabled in (("full prompt", False), ("cached prefix", True)):
+        prefix_cache.enabled = enabled
+        before = standin_counts(args.endpoint)
+        latencies = []
+        for user_text, performance in inputs:
+            start = time.perf_counter()
+            model.run_soca_analysis(llm_model, user_text, performance, args.variant)
+            latencies.append(time.perf_counter() - start)
+        after = standin_counts(args.endpoint)
+        prompt_tokens = after["prompt_tokens"] - before["prompt_tokens"]
+        cached_tokens = after["cached_tokens"] - before["cached_tokens"]
+        results[label] = stats = summarize(latencies)
+        stats["uncached_tokens"] = (prompt_tokens - cached_tokens) / len(inputs)
+        print(f"{label:>14}: {stats['uncached_tokens']:7.0f} uncached input tokens/call "
+              f"({cached_tokens / len(inputs):.0f} from cache)  p50 {stats['p50'] * 1e3:7.1f} ms  "
+              f"p95 {stats['p95'] * 1e3:7.1f} ms")
+    print("prefix cache:", prefix_cache.get_stats())
+
+    base, cached = results["full prompt"], results["cached prefix"]
+    print(f"savings: {1 - cached['uncached_tokens'] / base['uncached_tokens']:.0%} input tokens, "
+          f"{(base['p50'] - cached['p50']) * 1e3:.1f} ms p50")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Prompt size per prompt variant for a full answer sheet.
+
+Token counts come from Gemini's count_tokens when GOOGLE_API_KEY is set and
+fall back to the ~4 characters/token estimate otherwise.
+
+    python benchmarks/bench_prompt_size.py [accuracy]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from model import PROMPT_VARIANTS, calculate_subject_performance, estimate_tokens, load_model
+from questions import get_all_questions, get_answer_key
+
+def make_sheet(accuracy, rng):
+    sheet = {}
+    for subject, qs in get_all_questions().items():
+        sheet[subject] = {
+            q["id"]: q["correct_answer"] if rng.random() < accuracy else rng.choice("abcd")
+            for q in qs
+        }
+    return sheet
+
+def main():
+    accuracy = float(sys.argv[1]) if len(sys.argv) > 1 else 0.6
+    answer_key = get_answer_key()
+    sheet = make_sheet(accuracy, random.Random(0))
+    subject_performance = calculate_subject_performance(sheet, answer_key)
+    model, _, _ = load_model()
+
+    print(f"sheet: {sum(len(a) for a in sheet.values())} answers, target accuracy {accuracy:.0%}")
+    for variant, (preprocess, build_prompt) in PROMPT_VARIANTS.items():
+        prompt = build_prompt(preprocess(sheet, answer_key), subject_performance)
+        tokens = model.count_tokens(prompt).total_tokens if model else estimate_tokens(prompt)
+        source = "count_tokens" if model else "estimate"
+        print(f"{variant:>8}: {len(prompt):>6} chars  {tokens:>5} tokens ({source})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Import time and memory of the question bank as it grows: the indexed SQLite
+bank (api/question_bank.py) versus the same bank as a Python dict literal,
+each measured in fresh interpreters. The indexed bank's first queries include
+loading the live version; data derived from it (the compiled grading key,
+serialized payloads) is built on first use, so it is not part of these numbers.
+
+    python benchmarks/bench_question_bank.py [total questions ...]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT, "api")
+sys.path.insert(0, API_DIR)
+
+from question_bank import open_bank
+
+SUBJECTS = ["Physics", "Chemistry", "Mathematics", "Well-being Assessment", "Time Management"]
+TOPICS = ["Kinematics", "Optics", "Thermodynamics", "Electrostatics", "Organic", "Calculus", "Algebra", "Probability"]
+
+# Peak RSS of the child itself; ru_maxrss would carry over the parent's peak across fork and exec
+PEAK_RSS = """
+def peak_rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+"""
+
+# Runs in the child: import the bank, serve the usual queries, report time and peak RSS
+INDEXED_CHILD = PEAK_RSS + """
+import time
+start = time.perf_counter()
+import questions
+imported = time.perf_counter() - start
+start = time.perf_counter()
+subjects = questions.get_all_subjects()
+counts = [questions.get_question_count(s) for s in subjects]
+topic = questions.get_questions("Physics", shuffle=False, topic="Optics", difficulty="hard")
+key = questions.get_answer_key()["Physics"]
+hits = sum(key.get(f"Q{i}") is not None for i in range(1, 1001))
+first_queries = time.perf_counter() - start
+print(imported, first_queries, peak_rss_kb())
+"""
+
+LITERAL_CHILD = PEAK_RSS + """
+import time
+start = time.perf_counter()
+import bank_literal
+imported = time.perf_counter() - start
+start = time.perf_counter()
+subjects = list(bank_literal.QUESTIONS)
+counts = [len(bank_literal.QUESTIONS[s]) for s in subjects]
+topic = [q for q in bank_literal.QUESTIONS["Physics"] if q["topic"] == "Optics" and q["difficulty"] == "hard"]
+first_queries = time.perf_counter() - start
+print(imported, first_queries, peak_rss_kb())
+"""
+
+BASELINE_CHILD = PEAK_RSS + """
+print(0, 0, peak_rss_kb())
+"""
+
+def make_question(subject, i, rng):
+    return {
+        "subject": subject,
+        "id": f"{subject[:3].upper()}-{i:05d}",
+        "topic": rng.choice(TOPICS),
+        "difficulty": rng.choice(["easy", "medium", "hard"]),
+        "question": f"{subject} question {i}: which of the following statements about the given setup is correct?",
+        "options": {label: f"Option {label} for question {i}" for label in "abcd"},
+        "correct_answer": rng.choice("abcd"),
+    }
+
+def write_banks(directory, total, rng):
+    """
+    Write the same bank as a JSON-lines source and as a Python module.
+    """
+    per_subject = max(1, total // len(SUBJECTS))
+    bank = {subject: [make_question(subject, i, rng) for i in range(per_subject)] for subject in SUBJECTS}
+    source = os.path.join(directory, "questions.jsonl")
+    with open(source, "w", encoding="utf-8") as f:
+        for qs in bank.values():
+            for q in qs:
+                f.write(json.dumps(q, ensure_ascii=False) + "\n")
+    literal = {subject: [{k: v for k, v in q.items() if k != "subject"} for q in qs] for subject, qs in bank.items()}
+    with open(os.path.join(directory, "bank_literal.py"), "w", encoding="utf-8") as f:
+        f.write(f"QUESTIONS = {literal!r}\n")
+    return source
+
+def run_child(code, env, cwd, runs=3):
+    """
+    Best import time, first-query time and peak RSS (MB) over fresh interpreters.
+    """
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(result.stderr[-2000:])
+        imported, queries, rss_kb = result.stdout.split()[-3:]
+        sample = (float(imported), float(queries), int(rss_kb) / 1024)
+        best = sample if best is None else tuple(min(a, b) for a, b in zip(best, sample))
+    return best
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join([API_DIR, directory]),
+            "SOCA_QUESTION_DB_DIR": directory,
+        }
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        _, _, baseline = run_child(BASELINE_CHILD, env, directory)
+        print(f"interpreter baseline: {baseline:.1f} MB peak RSS")
+        print(f"{'questions':>9} {'build db':>9} | {'import':>8} {'queries':>8} {'RSS':>8} (indexed) | "
+              f"{'import':>8} {'queries':>8} {'RSS':>8} (dict literal)")
+        for total in sizes:
+            source = write_banks(directory, total, rng)
+            start = time.perf_counter()
+            open_bank(source, directory)
+            build = time.perf_counter() - start
+            env["SOCA_QUESTION_BANK"] = source
+            # Compile the literal once so both sides import from warm bytecode
+            subprocess.run([sys.executable, "-c", "import bank_literal"], cwd=directory, env=env, check=True)
+            indexed = run_child(INDEXED_CHILD, env, directory)
+            literal = run_child(LITERAL_CHILD, env, directory)
+            print(f"{total:>9,} {build * 1e3:>7.0f}ms | "
+                  f"{indexed[0] * 1e3:>6.1f}ms {indexed[1] * 1e3:>6.1f}ms {indexed[2]:>6.1f}MB           | "
+                  f"{literal[0] * 1e3:>6.1f}ms {literal[1] * 1e3:>6.1f}ms {literal[2]:>6.1f}MB")
+
+if __name__ == "__main__":
+    main()
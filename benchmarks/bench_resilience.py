@@ -0,0 +1,85 @@
+"""
+Tail latency and failure rate of LLM calls against a flaky upstream, called
+directly versus through the deadline / retry / hedging wrapper.
+
+The fake upstream answers in ~50 ms, but 5% of calls stall for 3 s and 5%
+fail with a 503.
+
+    python benchmarks/bench_resilience.py [calls] [concurrency]
+"""
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+os.environ.setdefault("SOCA_LLM_DEADLINE", "2")
+os.environ.setdefault("SOCA_LLM_RETRY_BACKOFF", "0.05")
+
+from llm_stats import summarize
+from resilience import CircuitBreaker, ResilientCaller
+
+class UpstreamUnavailable(Exception):
+    code = 503
+
+class FlakyUpstream:
+    def __init__(self, seed=0):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, timeout=None):
+        with self._lock:
+            roll = self._rng.random()
+            latency = self._rng.lognormvariate(-3.0, 0.3)
+        if roll < 0.05:
+            raise UpstreamUnavailable("503 Service Unavailable")
+        if roll < 0.10:
+            # The stall ends early only if the client's timeout fires
+            time.sleep(min(3.0, timeout) if timeout else 3.0)
+            if timeout and timeout < 3.0:
+                raise TimeoutError("read timed out")
+        else:
+            time.sleep(latency)
+        return "report"
+
+def run(call, n, concurrency):
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            call()
+            ok = True
+        except Exception:
+            ok = False
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            failures += not ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n)))
+    return summarize(latencies), max(latencies), failures / n
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    upstream = FlakyUpstream()
+    # Never opens here: the point is the retry and hedging behaviour
+    caller = ResilientCaller(CircuitBreaker(error_rate=1.1), max_workers=4 * concurrency)
+
+    for name, call in (
+        ("direct", upstream),
+        ("resilient", lambda: caller.call(upstream, key="bench")),
+    ):
+        stats, worst, failure_rate = run(call, n, concurrency)
+        print(f"{name:10s} p50 {stats['p50'] * 1e3:7.1f} ms  p95 {stats['p95'] * 1e3:7.1f} ms  "
+              f"p99 {stats['p99'] * 1e3:7.1f} ms  max {worst * 1e3:7.1f} ms  failed {failure_rate:6.1%}")
+    print({k: v for k, v in caller.get_stats().items() if k != "circuit_breaker"})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Local stand-in for the Gemini REST API, for load tests without an API key.
+
+Serves generateContent and streamGenerateContent the way the REST transport
+of google-generativeai expects them, with canned SOCA markdown, a configurable
+latency distribution and injected 429/500 errors. cachedContents (context
+caching) is supported too: cached prompt tokens skip the per-token prefill
+time set with --prefill-ms-per-1k. Point the app at it with:
+
+    python benchmarks/gemini_standin.py --port 8765 --latency lognormal --latency-mean 2.0
+    GOOGLE_API_KEY=test GEMINI_API_ENDPOINT=http://127.0.0.1:8765 uvicorn backend.main:app
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import math
+import random
+import re
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SUBJECTS = ["Physics", "Chemistry", "Mathematics", "Well-being Assessment", "Time Management"]
+
+CANNED_REPORT = """## SOCA Analysis
+
+### Strengths
+{strengths}
+
+### Opportunities
+- Revisit the topics with the most incorrect answers and re-attempt them untimed.
+- Turn partially correct topics into strengths with one mixed practice set a day.
+
+### Challenges
+{challenges}
+
+### Action Plan
+1. **Weeks 1-2:** Rebuild fundamentals in the weakest subject using NCERT examples.
+2. **Weeks 3-4:** Alternate timed sectional tests with error-log reviews.
+3. **Daily:** 25-minute focused blocks, with one break for every two blocks.
+4. **Weekly:** One full mock test under exam conditions, reviewed the next day.
+"""
+
+class StandinConfig:
+    """Latency and failure behaviour of the stand-in."""
+
+    def __init__(self, latency="lognormal", latency_mean=1.5, latency_spread=0.5,
+                 ttft_fraction=0.3, chunks=8, error_429=0.0, error_500=0.0, seed=None,
+                 prefill_per_1k=0.0, cache_min_tokens=0):
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_spread = latency_spread
+        self.ttft_fraction = ttft_fraction
+        self.chunks = max(1, chunks)
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.rng = random.Random(seed)
+        # Seconds per 1,000 prompt tokens not served from a context cache
+        self.prefill_per_1k = prefill_per_1k
+        # Smallest prefix cachedContents accepts, like the real API's minimum
+        self.cache_min_tokens = cache_min_tokens
+
+    def sample_latency(self) -> float:
+        """
+        Draw the total generation time of one call, in seconds.
+
+        "lognormal" treats latency_mean as the median and latency_spread as sigma;
+        "normal" and "uniform" use latency_spread as the standard deviation and half-width.
+        """
+        if self.latency == "fixed":
+            value = self.latency_mean
+        elif self.latency == "uniform":
+            value = self.rng.uniform(self.latency_mean - self.latency_spread, self.latency_mean + self.latency_spread)
+        elif self.latency == "normal":
+            value = self.rng.gauss(self.latency_mean, self.latency_spread)
+        else:
+            value = self.rng.lognormvariate(math.log(max(self.latency_mean, 1e-6)), self.latency_spread)
+        return max(0.0, value)
+
+    def sample_error(self):
+        roll = self.rng.random()
+        if roll < self.error_429:
+            return 429
+        if roll < self.error_429 + self.error_500:
+            return 500
+        return None
+
+ERRORS = {
+    400: ("INVALID_ARGUMENT", "Request contains an invalid argument."),
+    404: ("NOT_FOUND", "Requested entity was not found."),
+    429: ("RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."),
+    500: ("INTERNAL", "An internal error has occurred."),
+}
+
+def error_response(code: int, message: str = None) -> JSONResponse:
+    status, default_message = ERRORS.get(code, ("INVALID_ARGUMENT", ""))
+    return JSONResponse({"error": {"code": code, "message": message or default_message, "status": status}}, status_code=code)
+
+def prompt_parts(body):
+    return [part for content in body.get("contents", []) for part in content.get("parts", [])]
+
+def prompt_text(body) -> str:
+    return "".join(part.get("text", "") for part in prompt_parts(body))
+
+def canned_report(prompt: str) -> str:
+    """
+    SOCA markdown mentioning the subjects found in the prompt, weakest first.
+    """
+    scores = {}
+    for subject in SUBJECTS:
+        match = re.search(re.escape(subject) + r"[^\n\d]*?(\d+(?:\.\d+)?)\s*%", prompt)
+        if match:
+            scores[subject] = float(match.group(1))
+    ranked = sorted(scores, key=scores.get) or SUBJECTS[:3]
+    strengths = "\n".join(f"- **{subject}:** consistent accuracy on core concepts." for subject in reversed(ranked[-2:]))
+    challenges = "\n".join(f"- **{subject}:** accuracy is below target; errors cluster in a few topics." for subject in ranked[:2])
+    return CANNED_REPORT.format(strengths=strengths, challenges=challenges)
+
+def candidate(text: str, finish: bool) -> dict:
+    result = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finish:
+        result["finishReason"] = "STOP"
+    return result
+
+def count_tokens(text: str) -> int:
+    return len(text) // 4
+
+def usage(prompt: str, output: str, cached_tokens: int = 0) -> dict:
+    prompt_tokens = count_tokens(prompt)
+    output_tokens = count_tokens(output)
+    result = {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": output_tokens,
+        "totalTokenCount": prompt_tokens + output_tokens,
+    }
+    if cached_tokens:
+        result["cachedContentTokenCount"] = cached_tokens
+    return result
+
+def timestamp(seconds: float) -> str:
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def parse_ttl(ttl) -> float:
+    return float(str(ttl or "3600s").rstrip("s"))
+
+def split_chunks(text: str, n: int):
+    size = max(1, math.ceil(len(text) / n))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def create_app(config: StandinConfig) -> FastAPI:
+    app = FastAPI(title="Gemini stand-in")
+    app.state.counts = {
+        "requests": 0, "streamed": 0, "429": 0, "500": 0,
+        "prompt_tokens": 0, "cached_tokens": 0, "caches_created": 0,
+    }
+    app.state.caches = {}
+    cache_ids = itertools.count(1)
+
+    @app.get("/standin/stats")
+    async def stats():
+        return app.state.counts
+
+    def cache_resource(name, cache):
+        return {
+            "name": name,
+            "model": cache["model"],
+            "displayName": cache["display_name"],
+            "createTime": timestamp(cache["created"]),
+            "updateTime": timestamp(cache["created"]),
+            "expireTime": timestamp(cache["expires"]),
+            "usageMetadata": {"totalTokenCount": count_tokens(cache["text"])},
+        }
+
+    @app.post("/v1beta/cachedContents")
+    async def create_cache(request: Request):
+        body = await request.json()
+        text = prompt_text(body)
+        tokens = count_tokens(text)
+        if tokens < config.cache_min_tokens:
+            return error_response(400, f"Cached content is too small. total_token_count={tokens}, min_total_token_count={config.cache_min_tokens}")
+        name = f"cachedContents/standin-{next(cache_ids)}"
+        now = time.time()
+        app.state.caches[name] = cache = {
+            "model": body.get("model", ""),
+            "display_name": body.get("displayName", ""),
+            "text": text,
+            "created": now,
+            "expires": now + parse_ttl(body.get("ttl")),
+        }
+        app.state.counts["caches_created"] += 1
+        return cache_resource(name, cache)
+
+    @app.get("/v1beta/cachedContents/{cache_id}")
+    async def get_cache(cache_id: str):
+        name = f"cachedContents/{cache_id}"
+        cache = app.state.caches.get(name)
+        if cache is None or cache["expires"] < time.time():
+            return error_response(404)
+        return cache_resource(name, cache)
+
+    @app.post("/v1beta/models/{call}")
+    async def models(call: str, request: Request):
+        model_name, _, method = call.partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return JSONResponse({"error": {"code": 404, "message": f"Unknown method {method}", "status": "NOT_FOUND"}}, status_code=404)
+        counts = app.state.counts
+        counts["requests"] += 1
+        body = await request.json()
+        prompt = prompt_text(body)
+        cached_tokens = 0
+        if body.get("cachedContent"):
+            cache = app.state.caches.get(body["cachedContent"])
+            if cache is None or cache["expires"] < time.time():
+                return error_response(404, f"CachedContent not found (or expired): {body['cachedContent']}")
+            prompt = cache["text"] + prompt
+            cached_tokens = count_tokens(cache["text"])
+        counts["prompt_tokens"] += count_tokens(prompt)
+        counts["cached_tokens"] += cached_tokens
+        # Only prompt tokens outside the context cache are prefilled again
+        latency = config.sample_latency() + config.prefill_per_1k * max(0, count_tokens(prompt) - cached_tokens) / 1000
+
+        error = config.sample_error()
+        if error is not None:
+            counts[str(error)] += 1
+            # Rejected calls fail fast, as quota errors do upstream
+            await asyncio.sleep(min(latency, 0.05))
+            return error_response(error)
+
+        report = canned_report(prompt)
+        if method == "generateContent":
+            await asyncio.sleep(latency)
+            return {
+                "candidates": [candidate(report, finish=True)],
+                "usageMetadata": usage(prompt, report, cached_tokens),
+                "modelVersion": model_name,
+            }
+
+        counts["streamed"] += 1
+        chunks = split_chunks(report, config.chunks)
+        ttft = latency * config.ttft_fraction
+        gap = (latency - ttft) / max(1, len(chunks) - 1)
+
+        async def stream():
+            # The REST transport reads a JSON array of responses incrementally
+            await asyncio.sleep(ttft)
+            for i, text in enumerate(chunks):
+                last = i == len(chunks) - 1
+                message = {"candidates": [candidate(text, finish=last)], "modelVersion": model_name}
+                if last:
+                    message["usageMetadata"] = usage(prompt, report, cached_tokens)
+                yield ("[" if i == 0 else ",\r\n") + json.dumps(message)
+                if not last:
+                    await asyncio.sleep(gap)
+            yield "]"
+
+        return StreamingResponse(stream(), media_type="application/json")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "normal", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=1.5, help="seconds; the median for lognormal")
+    parser.add_argument("--latency-spread", type=float, default=0.5, help="sigma (lognormal/normal) or half-width (uniform)")
+    parser.add_argument("--ttft-fraction", type=float, default=0.3, help="share of the latency spent before the first streamed chunk")
+    parser.add_argument("--chunks", type=int, default=8, help="chunks per streamed response")
+    parser.add_argument("--error-429", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--error-500", type=float, default=0.0, help="fraction of calls answered with 500")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=0.0, help="extra latency per 1,000 uncached prompt tokens")
+    parser.add_argument("--cache-min-tokens", type=int, default=0, help="smallest prefix cachedContents accepts")
+    args = parser.parse_args()
+    config = StandinConfig(
+        latency=args.latency, latency_mean=args.latency_mean, latency_spread=args.latency_spread,
+        ttft_fraction=args.ttft_fraction, chunks=args.chunks,
+        error_429=args.error_429, error_500=args.error_500, seed=args.seed,
+        prefill_per_1k=args.prefill_ms_per_1k / 1000, cache_min_tokens=args.cache_min_tokens,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
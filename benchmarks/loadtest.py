@@ -0,0 +1,160 @@
+"""
+Load test for a running API: question fetches, paper fetches and analyses at
+a fixed concurrency, with throughput and latency percentiles written to JSON
+so runs can be diffed between releases.
+
+Run it against an app pointed at the Gemini stand-in:
+
+    python benchmarks/gemini_standin.py --port 8765 &
+    GOOGLE_API_KEY=test GEMINI_API_ENDPOINT=http://127.0.0.1:8765 uvicorn backend.main:app --port 8000 &
+    python benchmarks/loadtest.py --base-url http://127.0.0.1:8000 --concurrency 32 --requests 500 --out loadtest.json
+
+Analyses use random answer sheets, so they miss the analysis cache unless
+--repeat-sheets is given.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+from llm_stats import percentile
+
+SCENARIOS = ("questions", "paper", "analyze")
+
+def latency_summary(latencies):
+    values = sorted(latencies)
+    if not values:
+        return None
+    return {
+        "p50": percentile(values, 50) * 1e3,
+        "p90": percentile(values, 90) * 1e3,
+        "p95": percentile(values, 95) * 1e3,
+        "p99": percentile(values, 99) * 1e3,
+        "max": values[-1] * 1e3,
+        "mean": sum(values) / len(values) * 1e3,
+    }
+
+def random_sheet(rng, paper):
+    return {
+        subject: {q["id"]: rng.choice(list(q["options"])) for q in questions if rng.random() < 0.9}
+        for subject, questions in paper["questions"].items()
+    }
+
+def make_request(scenario, rng, paper, sheets):
+    """
+    Build (method, path, kwargs) for one request of a scenario.
+    """
+    if scenario == "questions":
+        return "GET", f"/api/questions/{rng.choice(paper['subjects'])}", {}
+    if scenario == "paper":
+        return "GET", "/api/paper", {"params": {"seed": rng.randrange(2 ** 31)}, "headers": {"Accept-Encoding": "br, gzip"}}
+    sheet = rng.choice(sheets) if sheets else random_sheet(rng, paper)
+    return "POST", "/api/analyze", {"json": {"user_answers": sheet}}
+
+async def run_scenario(client, scenario, n_requests, concurrency, rng, paper, sheets):
+    latencies = []
+    statuses = {}
+    errors = 0
+    pending = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in pending:
+            method, path, kwargs = make_request(scenario, rng, paper, sheets)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+                status = str(response.status_code)
+                # /api/analyze reports Gemini failures in the body with a 200
+                failed = scenario == "analyze" and response.json().get("analysis", "").startswith("Error")
+                if response.status_code >= 400 or failed:
+                    errors += 1
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_counts": statuses,
+        "duration_s": duration,
+        "throughput_rps": n_requests / duration if duration else None,
+        "latency_ms": latency_summary(latencies),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args):
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        paper = (await client.get("/api/paper")).json()
+        sheets = [random_sheet(rng, paper) for _ in range(args.repeat_sheets)]
+        results = {}
+        for scenario in args.scenarios:
+            n = args.requests if scenario != "analyze" else args.analyze_requests or args.requests
+            results[scenario] = await run_scenario(client, scenario, n, args.concurrency, rng, paper, sheets)
+            summary = results[scenario]
+            latency = summary["latency_ms"] or {}
+            print(f"{scenario:10s} {summary['throughput_rps']:9.1f} req/s  "
+                  f"p50 {latency.get('p50', 0):8.1f} ms  p99 {latency.get('p99', 0):8.1f} ms  "
+                  f"errors {summary['errors']}")
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "git_revision": git_revision(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--analyze-requests", type=int, default=None, help="requests for the analyze scenario (default: --requests)")
+    parser.add_argument("--repeat-sheets", type=int, default=0, help="reuse this many answer sheets instead of random ones")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="loadtest.json", help="JSON results file")
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args))
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ import QuestionCard from '../components/QuestionCard';
 
 const CORE_SUBJECTS = ["Physics", "Chemistry", "Mathematics"];
 const TIMER_DURATION = 30 * 60; // 30 minutes in seconds
+// Each attempt gets its own shuffled paper; the seed, bank version and question revisions are sent back with the answers for grading
+const newPaperSeed = () => Math.floor(Math.random() * 2 ** 31);
 
 const Test = () => {
     const navigate = useNavigate();
@@ -16,6 +18,8 @@ const Test = () => {
     const [loading, setLoading] = useState(true);
     const [submitting, setSubmitting] = useState(false);
     const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
+    const [seed, setSeed] = useState(newPaperSeed);
+    const [bankVersion, setBankVersion] = useState(null);
 
     // New State for Features
     const [timeLeft, setTimeLeft] = useState(TIMER_DURATION);
@@ -66,14 +70,16 @@ const Test = () => {
 
     const fetchSubjects = async () => {
         try {
-            const response = await axios.get('/api/subjects');
+            // One request for the whole paper: subjects plus all their questions
+            const response = await axios.get('/api/paper', { params: { seed } });
             setSubjects(response.data.subjects);
-            // Fetch questions for the first subject
-            if (response.data.subjects.length > 0) {
-                fetchQuestions(response.data.subjects[0]);
-            }
+            setQuestions(response.data.questions);
+            setBankVersion(response.data.bank_version);
+            // The server maps the seed onto one of a few cached paper variants
+            setSeed(response.data.seed);
         } catch (error) {
             console.error('Error fetching subjects:', error);
+        } finally {
             setLoading(false);
         }
     };
@@ -100,9 +106,9 @@ const Test = () => {
 
     const handleAnswer = (answer) => {
         const currentSubject = subjects[currentSubjectIndex];
-        // Store answer with Q-index format expected by backend (Q1, Q2...)
-        // Note: backend expects 1-based index
-        const questionKey = `Q${currentQuestionIndex + 1}`;
+        // Store answer under the question's stable ID; the backend maps the
+        // shuffled option back using the paper seed
+        const questionKey = questions[currentSubject][currentQuestionIndex].id;
 
         setAnswers(prev => ({
             ...prev,
@@ -162,15 +168,39 @@ const Test = () => {
         }
     };
 
+    // The "rev" of every answered question, so answers still grade if the bank is
+    // updated mid-attempt, as long as those questions' options didn't change
+    const answeredRevisions = () => {
+        const revisions = {};
+        Object.entries(answers).forEach(([subject, subjectAnswers]) => {
+            (questions[subject] || []).forEach(q => {
+                if (q.id in subjectAnswers && q.rev) {
+                    revisions[q.id] = q.rev;
+                }
+            });
+        });
+        return revisions;
+    };
+
     const handleSubmit = async () => {
         setSubmitting(true);
         try {
-            const response = await axios.post('/api/analyze', { user_answers: answers });
+            const response = await axios.post('/api/analyze', {
+                user_answers: answers,
+                seed,
+                bank_version: bankVersion,
+                revisions: answeredRevisions(),
+            });
             // Navigate to analysis page with results
             navigate('/analysis', { state: { results: response.data.analysis } });
         } catch (error) {
             console.error('Error submitting test:', error);
-            alert('Failed to submit test. Please try again.');
+            if (error.response?.status === 409) {
+                // Questions answered on this paper were removed or changed mid-attempt
+                alert('Some questions were changed during your test, so it can no longer be graded. Please start a new attempt.');
+            } else {
+                alert('Failed to submit test. Please try again.');
+            }
         } finally {
             setSubmitting(false);
         }
@@ -232,7 +262,7 @@ const Test = () => {
     const currentSubject = subjects[currentSubjectIndex];
     const currentQuestions = questions[currentSubject] || [];
     const currentQuestion = currentQuestions[currentQuestionIndex];
-    const currentAnswer = answers[currentSubject]?.[`Q${currentQuestionIndex + 1}`];
+    const currentAnswer = answers[currentSubject]?.[currentQuestion?.id];
     const isCore = CORE_SUBJECTS.includes(currentSubject);
 
     return (
@@ -1,11 +1,9 @@
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-import torch
+# The offline flan-t5 backend now lives in api/local_model.py so both FastAPI
+# apps can use it (SOCA_LLM_BACKEND=local). Nothing is loaded at import time;
+# call load_local_model() to get (model, tokenizer, device).
+import os
+import sys
 
-# Load Model & Tokenizer
-model_name = "google/flan-t5-large"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name, device_map="auto")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
 
-# Move to MPS (Apple GPU) for efficiency
-device = "mps" if torch.backends.mps.is_available() else "cpu"
-model.to(device)
+from local_model import LOCAL_MODEL_NAME as model_name, LocalSeq2SeqModel, load_local_model
@@ -0,0 +1,13 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The apps import the shared modules in api/ as top-level modules
+sys.path.insert(0, os.path.join(ROOT, "api"))
+sys.path.insert(0, ROOT)
+
+# Keep tests off the network and off any shared on-disk state
+os.environ["GOOGLE_API_KEY"] = ""
+os.environ["SOCA_CACHE_SIZE"] = "0"
+os.environ.pop("SOCA_CACHE_DB", None)
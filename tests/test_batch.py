@@ -0,0 +1,43 @@
+import asyncio
+
+import batch
+from questions import bank_snapshot
+from resilience import DeadlineExceeded
+
+def run_batch(llm_model, sheets):
+    async def collect():
+        with bank_snapshot() as bank:
+            return {
+                result["sheet_id"]: result
+                async for result in batch.analyze_sheets(llm_model, sheets, bank.answer_key, bank.version)
+            }
+
+    return asyncio.run(collect())
+
+def sheet(sheet_id, answer):
+    return (sheet_id, {"Physics": {"Q1": answer}}, "full", "llm")
+
+def test_missing_model_is_an_error_not_a_report(monkeypatch):
+    monkeypatch.setattr(batch, "INSTANT_FALLBACK", False)
+    result = run_batch(None, [sheet("s1", "a")])["s1"]
+    assert result["status"] == 503
+    assert "analysis" not in result and result["error"]
+
+def test_failed_sheets_carry_an_error_and_the_rest_a_report(monkeypatch):
+    async def analysis(llm_model, user_text, subject_performance, prompt_variant="full"):
+        if failing["calls"] == 0:
+            failing["calls"] += 1
+            raise DeadlineExceeded("past the deadline")
+        return "## SOCA report"
+
+    failing = {"calls": 0}
+    monkeypatch.setattr(batch, "INSTANT_FALLBACK", False)
+    monkeypatch.setattr(batch, "run_soca_analysis_async", analysis)
+    results = run_batch(object(), [sheet("s1", "a"), sheet("s2", "b")])
+    statuses = sorted(result["status"] for result in results.values())
+    assert statuses == [200, 504]
+    for result in results.values():
+        if result["status"] == 200:
+            assert result["analysis"] == "## SOCA report" and result["source"] == "llm"
+        else:
+            assert "analysis" not in result and "past the deadline" in result["error"]
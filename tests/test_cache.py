@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from cache import AnalysisCache
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+
+    async def run():
+        await AnalysisCache(db_path=db_path).set_async("k", "report")
+        fresh = AnalysisCache(db_path=db_path)
+        return await fresh.get_async("k"), await fresh.get_async("missing"), fresh.get_stats()
+
+    value, missing, stats = asyncio.run(run())
+    assert value == "report" and missing is None
+    assert stats["disk_hits"] == 1 and stats["misses"] == 1
+
+def test_disk_io_runs_off_the_event_loop(tmp_path):
+    cache = AnalysisCache(db_path=str(tmp_path / "cache.db"))
+    threads = []
+    for name in ("_get_disk", "_set_disk"):
+        method = getattr(cache, name)
+
+        def recording(*args, method=method):
+            threads.append(threading.current_thread())
+            return method(*args)
+
+        setattr(cache, name, recording)
+
+    async def run():
+        await cache.set_async("k", "report")
+        cache._entries.clear()
+        return await cache.get_async("k")
+
+    assert asyncio.run(run()) == "report"
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+def test_expired_rows_are_purged_through_the_index(tmp_path):
+    cache = AnalysisCache(ttl=60, db_path=str(tmp_path / "cache.db"), purge_interval=0)
+    cache._set_disk("old", "report", 0.0)
+    cache.set("new", "report")
+    assert cache._db.execute("SELECT key FROM analysis_cache").fetchall() == [("new",)]
+    plan = cache._db.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM analysis_cache WHERE created_at < ?", (0,)
+    ).fetchall()
+    assert "analysis_cache_created_at" in str(plan)
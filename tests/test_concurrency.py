@@ -0,0 +1,51 @@
+import asyncio
+import time
+import uuid
+
+import httpx
+
+import endpoints
+import index
+import model
+
+ANALYSIS_TIME = 1.0
+IN_FLIGHT = 4
+# Question fetches must not wait for any in-flight analysis
+FETCH_BUDGET = 0.25
+
+def test_question_fetches_stay_fast_while_analyses_run(monkeypatch):
+    def slow_analysis(llm_model, user_text, subject_performance, prompt_variant="full"):
+        time.sleep(ANALYSIS_TIME)
+        return "## SOCA report"
+
+    monkeypatch.setattr(model, "run_soca_analysis", slow_analysis)
+    monkeypatch.setattr(endpoints, "ml_model", object())
+    monkeypatch.setattr(endpoints, "INSTANT_FALLBACK", False)
+
+    async def run():
+        transport = httpx.ASGITransport(app=index.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            # Distinct sheets, so every analysis is its own LLM call
+            analyses = [
+                asyncio.ensure_future(client.post(
+                    "/api/analyze",
+                    json={"user_answers": {"Physics": {"Q1": "a", f"extra-{uuid.uuid4().hex}": "b"}}, "mode": "llm"},
+                ))
+                for _ in range(IN_FLIGHT)
+            ]
+            await asyncio.sleep(0.2)
+            fetch_times = []
+            for subject in ["Physics", "Chemistry", "Mathematics"]:
+                start = time.perf_counter()
+                response = await client.get(f"/api/questions/{subject}")
+                fetch_times.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                assert response.json()["questions"]
+            still_running = sum(not task.done() for task in analyses)
+            responses = await asyncio.gather(*analyses)
+            return fetch_times, still_running, responses
+
+    fetch_times, still_running, responses = asyncio.run(run())
+    assert still_running == IN_FLIGHT
+    assert all(r.status_code == 200 and r.json()["source"] == "llm" for r in responses)
+    assert max(fetch_times) < FETCH_BUDGET, fetch_times
@@ -0,0 +1,38 @@
+import pytest
+
+from grading import compile_answer_key, grade_sheets
+from questions import bank_snapshot
+
+def test_bank_key_compiles_one_column_per_question():
+    with bank_snapshot() as bank:
+        compiled = compile_answer_key(bank.answer_key)
+        assert compiled.totals.tolist() == [bank.count(subject) for subject in bank.subjects()]
+        assert len(compiled.key) == sum(bank.count(subject) for subject in bank.subjects())
+
+def test_bank_key_grades_its_own_answers_at_100_percent():
+    with bank_snapshot() as bank:
+        by_id = {
+            subject: {q["id"]: q["correct_answer"] for q in bank.questions(subject)}
+            for subject in bank.subjects()
+        }
+        by_position = {
+            subject: {f"Q{i + 1}": q["correct_answer"] for i, q in enumerate(bank.questions(subject))}
+            for subject in bank.subjects()
+        }
+        for sheet in (by_id, by_position):
+            result = grade_sheets([sheet], bank.answer_key)
+            assert result.accuracy[0].tolist() == [100.0] * len(bank.subjects())
+            assert result.correct[0].tolist() == [bank.count(subject) for subject in bank.subjects()]
+
+def test_option_letters_beyond_d_grade():
+    answer_key = {"Physics": {
+        "PHY-1": {"correct_answer": "e", "options": {label: label for label in "abcde"}},
+        "PHY-2": {"correct_answer": "a", "options": {label: label for label in "abcde"}},
+    }}
+    result = grade_sheets([{"Physics": {"PHY-1": "e", "PHY-2": "b"}}], answer_key)
+    assert result.correct[0].tolist() == [1]
+
+def test_answers_outside_the_options_are_rejected():
+    answer_key = {"Physics": {"PHY-1": {"correct_answer": "e", "options": {"a": "1", "b": "2"}}}}
+    with pytest.raises(ValueError):
+        compile_answer_key(answer_key)
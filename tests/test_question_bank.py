@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+
+import pytest
+
+from grading import grade_sheets
+from question_bank import BankLoader, VersionCache
+from questions import canonicalize_answers, changed_answers, get_seeded_paper
+
+SEED = 11
+
+def question(q_id, correct="b", text="Pick one", options=None):
+    return {
+        "subject": "Physics",
+        "id": q_id,
+        "topic": "Kinematics",
+        "question": text,
+        "options": options or {"a": "1", "b": "2", "c": "3", "d": "4"},
+        "correct_answer": correct,
+    }
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "questions.jsonl"
+
+    def write(*questions):
+        path.write_text("".join(json.dumps(q) + "\n" for q in questions))
+
+    write(question("PHY-1"), question("PHY-2", correct="c"), question("PHY-3", correct="a"))
+    return str(path), write
+
+@pytest.fixture
+def loader(source, tmp_path):
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    return BankLoader(source[0], str(db_dir), poll=0)
+
+def correct_paper_answers(bank, seed):
+    """The displayed labels of the right answers on a seeded paper, and each question's rev."""
+    answers, revisions = {}, {}
+    for q in get_seeded_paper(seed, bank).questions["Physics"]:
+        correct = bank.key_entry("Physics", q["id"])["correct_answer"]
+        correct_text = bank.key_entry("Physics", q["id"])["options"][correct]
+        answers[q["id"]] = next(label for label, text in q["options"].items() if text == correct_text)
+        revisions[q["id"]] = q["rev"]
+    return {"Physics": answers}, revisions
+
+def test_a_leased_version_outlives_a_reload(loader, source):
+    old = loader.current()
+    held = loader.acquire(old.version)
+    source[1](question("PHY-1"), question("PHY-2", correct="c"))
+    assert loader.reload()
+    assert loader.current() is not old
+    # Still served by its version while leased, then closed with the last lease
+    assert loader.acquire(old.version) is old
+    loader.release(old)
+    assert loader.get_stats()["retired"] == [old.version]
+    loader.release(held)
+    assert loader.get_stats()["retired"] == []
+    live = loader.acquire(old.version)
+    assert live is loader.current()
+    loader.release(live)
+
+def test_unchanged_source_is_not_reloaded(loader, source):
+    loader.current()
+    source[1](question("PHY-1"), question("PHY-2", correct="c"), question("PHY-3", correct="a"))
+    assert not loader.reload()
+
+def test_closing_a_version_evicts_its_cached_values(loader, source):
+    cache = VersionCache(lambda bank, key: (bank.version, key))
+    loader.add_cache(cache)
+    old = loader.current()
+    cache.get(old, "a")
+    source[1](question("PHY-1"))
+    loader.reload()
+    cache.get(loader.current(), "a")
+    assert len(cache) == 1
+
+def test_seeded_answers_grade_on_a_version_with_a_typo_fix(loader, source):
+    old = loader.current()
+    answers, revisions = correct_paper_answers(old, SEED)
+    source[1](
+        question("PHY-1", text="Pick one."),
+        question("PHY-2", correct="c"),
+        question("PHY-3", correct="a"),
+    )
+    loader.reload()
+    new = loader.current()
+    assert new.version != old.version
+    assert changed_answers(answers, revisions, new) == []
+    graded = grade_sheets([canonicalize_answers(answers, SEED, new)], new.answer_key)
+    assert graded.accuracy[0].tolist() == [100.0]
+
+def test_removed_or_changed_questions_are_reported(loader, source):
+    old = loader.current()
+    answers, revisions = correct_paper_answers(old, SEED)
+    source[1](
+        question("PHY-1", options={"a": "1", "b": "2", "c": "3", "d": "5"}),
+        question("PHY-2", correct="c"),
+    )
+    loader.reload()
+    assert sorted(changed_answers(answers, revisions, loader.current())) == ["PHY-1", "PHY-3"]
+    # Without revisions nothing answered can be checked
+    assert sorted(changed_answers(answers, {}, loader.current())) == ["PHY-1", "PHY-2", "PHY-3"]
+
+def test_version_cache_is_bounded_by_size(loader):
+    cache = VersionCache(lambda bank, key: "x" * key, max_size=10, size=len)
+    bank = loader.current()
+    for key in (4, 4, 5, 3):
+        cache.get(bank, key)
+    assert cache.get_stats() == {"entries": 2, "size": 8}
+
+def test_derived_data_is_built_once_on_first_use(loader):
+    bank = loader.current()
+    builds = []
+
+    def build(bank):
+        builds.append(bank.version)
+        time.sleep(0.05)
+        return len(builds)
+
+    assert "paper" not in bank.derived
+    threads = [threading.Thread(target=bank.derive, args=("paper", build)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == [bank.version] and bank.derive("paper", build) == 1
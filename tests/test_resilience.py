@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from resilience import (
+    HEDGE_MIN_SAMPLES, CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller,
+)
+
+COOLDOWN = 0.05
+
+class Upstream(Exception):
+    def __init__(self, code):
+        super().__init__(f"upstream {code}")
+        self.code = code
+
+def open_breaker():
+    breaker = CircuitBreaker(window=60, min_calls=2, error_rate=0.5, cooldown=COOLDOWN)
+    for _ in range(2):
+        breaker.record(False, breaker.allow())
+    assert breaker.state == "open"
+    return breaker
+
+def test_breaker_opens_and_rejects_until_the_cooldown():
+    breaker = open_breaker()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    time.sleep(COOLDOWN)
+    assert breaker.state == "half_open"
+
+def test_straggler_outcomes_do_not_decide_the_probe():
+    breaker = CircuitBreaker(window=60, min_calls=2, error_rate=0.5, cooldown=COOLDOWN)
+    straggler = breaker.allow()
+    for _ in range(2):
+        breaker.record(False, breaker.allow())
+    time.sleep(COOLDOWN)
+    probe = breaker.allow()
+    # A call let through before the circuit opened finishes first
+    breaker.record(True, straggler)
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record(True, probe)
+    assert breaker.state == "closed"
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = open_breaker()
+    time.sleep(COOLDOWN)
+    probe = breaker.allow()
+    breaker.record(False, probe)
+    assert breaker.state == "open"
+    # The failed probe's hedge reporting late doesn't close it again
+    breaker.record(True, probe)
+    assert breaker.state == "open"
+
+def test_outcomes_from_before_the_circuit_opened_are_ignored_once_closed():
+    breaker = CircuitBreaker(window=60, min_calls=2, error_rate=0.5, cooldown=COOLDOWN)
+    stragglers = [breaker.allow() for _ in range(2)]
+    for _ in range(2):
+        breaker.record(False, breaker.allow())
+    time.sleep(COOLDOWN)
+    breaker.record(True, breaker.allow())
+    for ticket in stragglers:
+        breaker.record(False, ticket)
+    assert breaker.state == "closed"
+    assert breaker.get_stats()["window_calls"] == 0
+
+def make_caller(max_workers=4):
+    return ResilientCaller(CircuitBreaker(window=60, min_calls=100), max_workers=max_workers)
+
+def test_retryable_failures_are_retried():
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise Upstream(503)
+        return "report"
+
+    caller = make_caller()
+    assert caller.call(fn, deadline=5, retries=2, hedge_percentile=0) == "report"
+    assert len(calls) == 3 and caller.stats["retries"] == 2
+
+def test_bad_requests_are_not_retried():
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        raise Upstream(400)
+
+    caller = make_caller()
+    with pytest.raises(Upstream):
+        caller.call(fn, deadline=5, retries=2, hedge_percentile=0)
+    assert len(calls) == 1
+    # The upstream answered, so the breaker counts it as a success
+    assert caller.breaker.get_stats()["window_error_rate"] == 0.0
+
+def test_calls_stop_waiting_at_the_deadline():
+    release = threading.Event()
+
+    def fn(timeout):
+        release.wait(1)
+        return "late"
+
+    caller = make_caller()
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        caller.call(fn, deadline=0.1, retries=0, hedge_percentile=0)
+    release.set()
+    assert time.monotonic() - start < 0.5
+    assert caller.stats["deadline_exceeded"] == 1
+
+def test_slow_attempts_are_hedged():
+    attempts = []
+
+    def fn(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    caller = make_caller()
+    for _ in range(HEDGE_MIN_SAMPLES):
+        caller.tracker("model").observe(0.01)
+    assert caller.call(fn, key="model", deadline=5, retries=0, hedge_percentile=90) == "hedge"
+    assert caller.stats["hedges"] == 1 and caller.stats["hedge_wins"] == 1
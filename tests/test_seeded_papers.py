@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+import httpx
+
+import index
+import payloads
+import questions
+
+SEED = 7
+
+def post_seeded(payload):
+    async def run():
+        transport = httpx.ASGITransport(app=index.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            paper = (await client.get("/api/paper", params={"seed": SEED})).json()
+            question = paper["questions"]["Physics"][0]
+            body = {"user_answers": {"Physics": {question["id"]: "a"}}, "seed": SEED, "mode": "instant"}
+            body.update(payload(paper))
+            return await client.post("/api/analyze", json=body)
+
+    return asyncio.run(run())
+
+def test_seeded_answers_grade_against_the_paper_bank_version():
+    response = post_seeded(lambda paper: {"bank_version": paper["bank_version"]})
+    assert response.status_code == 200
+
+def test_seeded_answers_grade_on_another_version_with_their_revisions():
+    # Option order depends only on the seed and question ID, so an unchanged question still maps back
+    response = post_seeded(lambda paper: {
+        "bank_version": "0" * 16,
+        "revisions": {q["id"]: q["rev"] for q in paper["questions"]["Physics"][:1]},
+    })
+    assert response.status_code == 200
+
+def test_unverifiable_seeded_answers_are_rejected():
+    for payload in (lambda paper: {}, lambda paper: {"bank_version": "0" * 16}):
+        response = post_seeded(payload)
+        assert response.status_code == 409
+        assert "PHY-" in response.json()["detail"]
+
+def test_seeds_share_a_few_cached_paper_variants():
+    first = payloads.get_seeded_paper_payload(SEED)
+    again = payloads.get_seeded_paper_payload(SEED + questions.PAPER_VARIANTS)
+    assert again is first
+    assert json.loads(first.body)["seed"] == questions.paper_variant(SEED)